@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Measures start-up time of the simulator command line entry point and checks it
+against a budget. Run from the repository root:
+
+    python benchmarks/bench_startup.py
+
+Exits with status 1 if the budget is exceeded or if the pure-Python path
+imports NumPy.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Allowed start-up overhead of a small single-scenario run on top of a bare
+# interpreter, in seconds (median over repeats).
+STARTUP_BUDGET_SECONDS = 0.15
+
+SINGLE_RUN = [sys.executable, "-m", "simulator", "run", "--period", "12"]
+BARE_INTERPRETER = [sys.executable, "-c", "pass"]
+NUMPY_CHECK = [
+    sys.executable, "-c",
+    "import io, sys; from simulator.cli import main; "
+    "main(['run', '--period', '12'], out=io.StringIO()); "
+    "sys.exit(1 if 'numpy' in sys.modules else 0)"
+]
+
+
+def median_wall_time(command, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=REPO_ROOT, check=True, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark simulator start-up time.")
+    parser.add_argument("--repeat", type=int, default=15)
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET_SECONDS)
+    args = parser.parse_args()
+
+    bare = median_wall_time(BARE_INTERPRETER, args.repeat)
+    single_run = median_wall_time(SINGLE_RUN, args.repeat)
+    overhead = single_run - bare
+
+    print(f"bare interpreter:      {bare * 1000:8.1f} ms")
+    print(f"single scenario run:   {single_run * 1000:8.1f} ms")
+    print(f"start-up overhead:     {overhead * 1000:8.1f} ms (budget {args.budget * 1000:.0f} ms)")
+
+    failed = False
+    if overhead > args.budget:
+        print("FAIL: start-up overhead exceeds budget")
+        failed = True
+    if subprocess.run(NUMPY_CHECK, cwd=REPO_ROOT).returncode != 0:
+        print("FAIL: pure-Python run imported numpy")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,4 +16,11 @@ class AuditOperation(Operation):
         return base_cost + legal_cost
 
     def compute_revenue(self):
-        return 0.0 
+        return 0.0
+
+    def compute_cost_batch(self, volumes, params):
+        base_cost = super().compute_cost_batch(volumes, params)
+        return base_cost + params.get("legal_cost", 0.0)
+
+    def compute_revenue_batch(self, volumes, params):
+        return 0.0
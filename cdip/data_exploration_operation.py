@@ -17,3 +17,10 @@ class DataExplorationOperation(Operation):
 
     def compute_revenue(self):
         return 0.0  # Exploration does not generate revenue
+
+    def compute_cost_batch(self, volumes, params):
+        base_cost = super().compute_cost_batch(volumes, params)
+        return base_cost + params.get("data_access_cost", 0.0)
+
+    def compute_revenue_batch(self, volumes, params):
+        return 0.0
@@ -21,3 +21,11 @@ class DataPurchaseOperation(Operation):
         base_rev = super().compute_revenue()
         licensing_fees = self.parameters.get("licensing_fees", 0.0)
         return base_rev + licensing_fees
+
+    def compute_cost_batch(self, volumes, params):
+        base_cost = super().compute_cost_batch(volumes, params)
+        return base_cost + params.get("purchase_overhead", 0.0)
+
+    def compute_revenue_batch(self, volumes, params):
+        base_rev = super().compute_revenue_batch(volumes, params)
+        return base_rev + params.get("licensing_fees", 0.0)
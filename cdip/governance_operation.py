@@ -9,11 +9,31 @@ class GovernanceOperation(Operation):
       - governance_cost
       - execution_cost
       - contract_complexity (high)
+      - cost_per_proposal, proposal_count: cost of each proposal and the
+        number of proposals in the step
+      - cost_per_vote, vote_count: cost of each vote cast and the number of
+        votes in the step (both counts are usually schedules set by
+        simulator.governance.attach_governance)
     """
     def compute_cost(self):
         base_cost = super().compute_cost()
         gov_cost = self.parameters.get("governance_cost", 0.0)
-        return base_cost + gov_cost
+        cost_per_proposal = self.parameters.get("cost_per_proposal", 0.0)
+        proposal_count = self.parameters.get("proposal_count", 0.0)
+        cost_per_vote = self.parameters.get("cost_per_vote", 0.0)
+        vote_count = self.parameters.get("vote_count", 0.0)
+        proposal_cost = cost_per_proposal * proposal_count
+        vote_cost = cost_per_vote * vote_count
+        return base_cost + gov_cost + proposal_cost + vote_cost
 
     def compute_revenue(self):
         return 0.0  # Governance generally does not produce direct revenue
+
+    def compute_cost_batch(self, volumes, params):
+        base_cost = super().compute_cost_batch(volumes, params)
+        proposal_cost = params.get("cost_per_proposal", 0.0) * params.get("proposal_count", 0.0)
+        vote_cost = params.get("cost_per_vote", 0.0) * params.get("vote_count", 0.0)
+        return base_cost + params.get("governance_cost", 0.0) + proposal_cost + vote_cost
+
+    def compute_revenue_batch(self, volumes, params):
+        return 0.0
@@ -15,3 +15,9 @@ class PreferenceSettingOperation(Operation):
 
     def compute_revenue(self):
         return 0.0  # No revenue from setting preferences
+
+    def compute_cost_batch(self, volumes, params):
+        return super().compute_cost_batch(volumes, params)
+
+    def compute_revenue_batch(self, volumes, params):
+        return 0.0
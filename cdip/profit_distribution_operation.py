@@ -9,13 +9,26 @@ class ProfitDistributionOperation(Operation):
       - reward_payments
       - execution_cost
       - contract_complexity (medium)
+      - cost_per_transfer: cost of each payout to an owner
+      - transfer_count: number of payouts in the step, usually a schedule set
+        by simulator.distribution.attach_distribution from a DistributionLedger
     """
     def compute_cost(self):
         base_cost = super().compute_cost()
         # e.g., cost for performing distributions
         distribution_admin_cost = self.parameters.get("distribution_admin_cost", 0.0)
-        return base_cost + distribution_admin_cost
+        cost_per_transfer = self.parameters.get("cost_per_transfer", 0.0)
+        transfer_count = self.parameters.get("transfer_count", 0.0)
+        return base_cost + distribution_admin_cost + cost_per_transfer * transfer_count
 
     def compute_revenue(self):
         # Typically not revenue-generating; could be modeled as a negative revenue.
         return 0.0
+
+    def compute_cost_batch(self, volumes, params):
+        base_cost = super().compute_cost_batch(volumes, params)
+        transfer_cost = params.get("cost_per_transfer", 0.0) * params.get("transfer_count", 0.0)
+        return base_cost + params.get("distribution_admin_cost", 0.0) + transfer_cost
+
+    def compute_revenue_batch(self, volumes, params):
+        return 0.0
@@ -30,3 +30,17 @@ class RegistrationOperation(Operation):
         This example simply applies a flat fee per registration.
         """
         return super().compute_revenue()
+
+    def compute_cost_batch(self, volumes, params):
+        """
+        Array form of compute_cost for the vectorized engine: the KYC fee is
+        added for the models whose contract complexity is 'High'.
+        """
+        base_cost = super().compute_cost_batch(volumes, params)
+        return base_cost + params.complexity_is('High') * params.get('kyc_fee', 10.0)
+
+    def compute_revenue_batch(self, volumes, params):
+        """
+        Array form of compute_revenue for the vectorized engine.
+        """
+        return super().compute_revenue_batch(volumes, params)
@@ -5,8 +5,12 @@ Reads a CSV of simulation results from a parameter sweep and performs basic anal
 
 import csv
 import argparse
+import os
 import statistics
 
+from simulator.query import SweepIndex, index_path
+from simulator.utils import parse_value
+
 def analyze_sweep_results(csv_path):
     """
     Loads parameter sweep data from a CSV file and computes aggregate statistics
@@ -49,6 +53,37 @@ def analyze_sweep_results(csv_path):
         print(f"  Total Revenue:  {total_revenue:.2f}")
         print("")
 
+def parse_condition(text):
+    """
+    Parses a --where condition "name=value" or "name=low:high" (either bound
+    may be empty) into (name, condition) for SweepIndex.query.
+    """
+    name, _, spec = text.partition("=")
+    if ":" in spec:
+        low, _, high = spec.partition(":")
+        return name.strip(), (parse_value(low) if low else None, parse_value(high) if high else None)
+    return name.strip(), parse_value(spec)
+
+def analyze_indexed_results(csv_path, conditions):
+    """
+    Uses the sweep index written next to csv_path (see simulator.query) to
+    read only the combinations matching conditions, and prints aggregate
+    statistics with their typed parameter values.
+    """
+    index = SweepIndex.load(csv_path)
+    for entry, results in index.fetch_many(index.query(**conditions)):
+        params = ", ".join(f"{name}={value}" for name, value in entry["params"].items())
+        for model_name, records in results.items():
+            cost_values = [r["costs"] for r in records]
+            revenue_values = [r["revenues"] for r in records]
+
+            print(f"== {params} ({model_name}) ==")
+            print(f"  Avg Cost:       {statistics.mean(cost_values):.2f}")
+            print(f"  Avg Revenue:    {statistics.mean(revenue_values):.2f}")
+            print(f"  Total Cost:     {sum(cost_values):.2f}")
+            print(f"  Total Revenue:  {sum(revenue_values):.2f}")
+            print("")
+
 def main():
     parser = argparse.ArgumentParser(description="Analyze parameter sweep CSV results.")
     parser.add_argument(
@@ -57,8 +92,20 @@ def main():
         default="data/output/parameter_sweep_results.csv",
         help="Path to the CSV file containing parameter sweep results."
     )
+    parser.add_argument(
+        "--where",
+        action="append",
+        metavar="NAME=VALUE|NAME=LOW:HIGH",
+        help="Only analyze combinations matching this parameter condition (repeatable). "
+             "Requires a sweep written with --index."
+    )
     args = parser.parse_args()
-    analyze_sweep_results(args.input_csv)
+    if os.path.exists(index_path(args.input_csv)):
+        analyze_indexed_results(args.input_csv, dict(parse_condition(c) for c in args.where or []))
+    elif args.where:
+        parser.error(f"--where needs the index {index_path(args.input_csv)}; re-run the sweep with --index")
+    else:
+        analyze_sweep_results(args.input_csv)
 
 if __name__ == "__main__":
     main()
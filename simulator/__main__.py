@@ -0,0 +1,8 @@
+# business_model_simulator/simulator/__main__.py
+
+import sys
+
+from .cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
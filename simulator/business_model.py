@@ -22,26 +22,43 @@ class BusinessModel:
         self.transaction_model = transaction_model if transaction_model else TransactionModel()
         self.parameters = parameters if parameters else {}
 
-    def adjust_parameters(self):
+    def resolve_parameters(self, base_parameters):
         """
-        Adjusts the transaction model's parameters based on the
-        business model's specifics. This example merges or overrides
-        the transaction model parameters with any relevant data here.
+        Returns a new dict holding base_parameters with this business model's
+        specifics applied on top. base_parameters itself is left untouched, so
+        resolving the same inputs any number of times gives the same result.
+
+        :param base_parameters: dict, transaction-level parameters to build on
         """
+        resolved = dict(base_parameters)
+
         # Example usage: apply a cost_scaling_factor if present in this business model
         if 'cost_scaling_factor' in self.parameters:
-            original_overhead = self.transaction_model.parameters.get('overhead_rate', 0.0)
-            scaled_overhead = original_overhead + self.parameters['cost_scaling_factor']
-            self.transaction_model.parameters['overhead_rate'] = scaled_overhead
+            original_overhead = resolved.get('overhead_rate', 0.0)
+            resolved['overhead_rate'] = original_overhead + self.parameters['cost_scaling_factor']
 
         # Example usage: if a legal_compliance_fee is defined, add it to overhead_rate as well
         if 'legal_compliance_fee' in self.parameters:
-            overhead_rate = self.transaction_model.parameters.get('overhead_rate', 0.0)
-            overhead_rate += self.parameters['legal_compliance_fee']
-            self.transaction_model.parameters['overhead_rate'] = overhead_rate
+            overhead_rate = resolved.get('overhead_rate', 0.0)
+            resolved['overhead_rate'] = overhead_rate + self.parameters['legal_compliance_fee']
 
         # Merging any remaining parameters that should be directly passed through
         for key, value in self.parameters.items():
             # Only update if not already handled above
             if key not in ('cost_scaling_factor', 'legal_compliance_fee'):
-                self.transaction_model.parameters[key] = value
+                resolved[key] = value
+
+        return resolved
+
+    def adjust_parameters(self):
+        """
+        Adjusts the transaction model's parameters in place based on the
+        business model's specifics.
+
+        Kept for callers that rely on the in-place behaviour; note that calling
+        it repeatedly compounds the overhead adjustments. The Simulator uses
+        resolve_parameters() through a ParameterResolver instead and never
+        modifies the transaction model.
+        """
+        resolved = self.resolve_parameters(self.transaction_model.parameters)
+        self.transaction_model.parameters.update(resolved)
@@ -0,0 +1,357 @@
+# business_model_simulator/simulator/calibration.py
+
+"""
+Calibration of model parameters against observed costs and revenues.
+
+Parameters are fitted by least squares with exact derivatives instead of a
+grid search. Forward-mode dual numbers (Dual) carry the derivative of every
+value with respect to all fitted parameters at once. Because operation and
+transaction model formulas are plain arithmetic, duals flow through a
+BusinessModel unchanged, including custom Operation subclasses, and the
+reference engine returns each step's costs and revenues together with
+their gradients (simulate_with_gradients).
+
+calibrate() minimises the squared differences to the observed series with
+Levenberg-Marquardt steps on that Jacobian, so a fit typically takes a few
+tens of model evaluations. Models are built by a factory, as in parameter
+sweeps: factory(params) receives the fitted parameters (as duals) and any
+fixed ones, e.g. a scenario's ScenarioFactory with "growth_rate" or
+"DataPurchase.licensing_fees".
+
+A parameter that the factory or model converts to a plain number (float(),
+or a schedule, which materialises to floats) loses its derivative;
+simulate_with_gradients() and calibrate() raise ValueError naming it. A
+parameter that no formula reads has a zero derivative, and calibrate()
+rejects it instead of leaving it at its initial value. So does one starting
+on a threshold where its branch is not taken, such as overhead_rate = 0
+(costs use it only when positive).
+"""
+
+import numbers
+
+import numpy as np
+
+from .parameters import ParameterResolver
+from .simulator import iter_model_steps
+
+
+class Dual:
+    """
+    A value with its gradient with respect to the fitted parameters.
+
+    Supports the arithmetic used by the cost and revenue formulas; order
+    comparisons and truth tests use the value only.
+    """
+
+    __slots__ = ("value", "gradient")
+    # Make NumPy scalars defer to the reflected operators below
+    __array_ufunc__ = None
+
+    def __init__(self, value, gradient):
+        """
+        :param value: float
+        :param gradient: float64 array, one derivative per fitted parameter
+        """
+        self.value = float(value)
+        self.gradient = gradient
+
+    @classmethod
+    def variables(cls, values):
+        """
+        Returns one Dual per value, each the independent variable of its own
+        gradient component.
+        """
+        identity = np.eye(len(values))
+        return [cls(value, identity[i]) for i, value in enumerate(values)]
+
+    def __add__(self, other):
+        if isinstance(other, Dual):
+            return Dual(self.value + other.value, self.gradient + other.gradient)
+        if isinstance(other, numbers.Real):
+            return Dual(self.value + other, self.gradient)
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if isinstance(other, Dual):
+            return Dual(self.value - other.value, self.gradient - other.gradient)
+        if isinstance(other, numbers.Real):
+            return Dual(self.value - other, self.gradient)
+        return NotImplemented
+
+    def __rsub__(self, other):
+        if isinstance(other, numbers.Real):
+            return Dual(other - self.value, -self.gradient)
+        return NotImplemented
+
+    def __mul__(self, other):
+        if isinstance(other, Dual):
+            return Dual(self.value * other.value,
+                        self.gradient * other.value + other.gradient * self.value)
+        if isinstance(other, numbers.Real):
+            return Dual(self.value * other, self.gradient * other)
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        if isinstance(other, Dual):
+            return Dual(self.value / other.value,
+                        (self.gradient * other.value - other.gradient * self.value)
+                        / (other.value * other.value))
+        if isinstance(other, numbers.Real):
+            return Dual(self.value / other, self.gradient / other)
+        return NotImplemented
+
+    def __rtruediv__(self, other):
+        if isinstance(other, numbers.Real):
+            return Dual(other / self.value, -other * self.gradient / (self.value * self.value))
+        return NotImplemented
+
+    def __pow__(self, other):
+        if isinstance(other, Dual):
+            value = self.value ** other.value
+            return Dual(value, value * (other.gradient * np.log(self.value)
+                                        + other.value * self.gradient / self.value))
+        if isinstance(other, numbers.Real):
+            if other == 0:
+                return Dual(1.0, np.zeros_like(self.gradient))
+            return Dual(self.value ** other, other * self.value ** (other - 1) * self.gradient)
+        return NotImplemented
+
+    def __rpow__(self, other):
+        if isinstance(other, numbers.Real):
+            value = other ** self.value
+            return Dual(value, value * np.log(other) * self.gradient)
+        return NotImplemented
+
+    def __neg__(self):
+        return Dual(-self.value, -self.gradient)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return -self if self.value < 0 else self
+
+    def __lt__(self, other):
+        return self.value < (other.value if isinstance(other, Dual) else other)
+
+    def __le__(self, other):
+        return self.value <= (other.value if isinstance(other, Dual) else other)
+
+    def __gt__(self, other):
+        return self.value > (other.value if isinstance(other, Dual) else other)
+
+    def __ge__(self, other):
+        return self.value >= (other.value if isinstance(other, Dual) else other)
+
+    def __bool__(self):
+        return bool(self.value)
+
+    def __repr__(self):
+        return f"Dual({self.value!r}, {self.gradient!r})"
+
+
+class SeriesGradients:
+    """
+    Simulated series and their Jacobians from simulate_with_gradients.
+
+    costs and revenues are float64 arrays over steps; cost_jacobian and
+    revenue_jacobian are (steps x parameters) arrays of derivatives, columns
+    in the order of names.
+    """
+
+    def __init__(self, names, costs, revenues, cost_jacobian, revenue_jacobian):
+        self.names = list(names)
+        self.costs = costs
+        self.revenues = revenues
+        self.cost_jacobian = cost_jacobian
+        self.revenue_jacobian = revenue_jacobian
+
+
+def _split(value, size):
+    if isinstance(value, Dual):
+        return value.value, value.gradient
+    return float(value), np.zeros(size)
+
+
+def simulate_with_gradients(factory, parameters, simulation_period, fixed=None,
+                            global_parameters=None):
+    """
+    Runs the model built by factory with the reference engine and returns
+    its series together with their derivatives with respect to parameters.
+
+    :param factory: callable(dict) -> BusinessModel, as for parameter sweeps
+    :param parameters: dict of fitted parameter name -> value
+    :param fixed: optional dict of further parameters passed to the factory
+    :return: SeriesGradients
+    :raises ValueError: if the model converts a parameter to a plain number
+    """
+    names = list(parameters)
+    values = [parameters[name] for name in names]
+    try:
+        return _run_with_gradients(factory, names, values, simulation_period, fixed,
+                                   global_parameters)
+    except TypeError as error:
+        if "Dual" not in str(error):
+            raise
+        # Find the parameters that cannot be carried as duals, one at a time
+        converted = []
+        for position, name in enumerate(names):
+            try:
+                _run_with_gradients(factory, [name], [values[position]], simulation_period,
+                                    dict(fixed or {}, **{n: v for n, v in zip(names, values)
+                                                         if n != name}),
+                                    global_parameters)
+            except TypeError:
+                converted.append(name)
+        raise ValueError(f"The model converts {converted or names} to plain numbers (e.g. with "
+                         f"float() or inside a schedule), so their derivatives are lost") from error
+
+
+def _run_with_gradients(factory, names, values, simulation_period, fixed, global_parameters):
+    duals = dict(zip(names, Dual.variables(values)))
+    business_model = factory(dict(fixed or {}, **duals))
+    resolved = ParameterResolver(max_entries=0).resolve(business_model, global_parameters)
+
+    size = len(names)
+    costs = np.empty(simulation_period)
+    revenues = np.empty(simulation_period)
+    cost_jacobian = np.empty((simulation_period, size))
+    revenue_jacobian = np.empty((simulation_period, size))
+    for step, tx_model in iter_model_steps(resolved, simulation_period):
+        costs[step], cost_jacobian[step] = _split(tx_model.calculate_costs(), size)
+        revenues[step], revenue_jacobian[step] = _split(tx_model.calculate_revenues(), size)
+    return SeriesGradients(names, costs, revenues, cost_jacobian, revenue_jacobian)
+
+
+class CalibrationResult:
+    """
+    Outcome of calibrate.
+
+    Attributes:
+      - parameters: dict of fitted parameter name -> value
+      - standard_errors: dict of name -> asymptotic standard error (NaN when
+        there are no more observations than parameters)
+      - cost: half the sum of squared residuals at the fit
+      - rmse: root mean squared residual
+      - evaluations: model evaluations used (each yields values and Jacobian)
+      - iterations: accepted Levenberg-Marquardt steps
+      - converged: bool, whether a tolerance was met within max_evaluations
+      - fit: SeriesGradients at the fitted parameters
+    """
+
+    def __init__(self, parameters, standard_errors, cost, rmse, evaluations, iterations,
+                 converged, fit):
+        self.parameters = parameters
+        self.standard_errors = standard_errors
+        self.cost = cost
+        self.rmse = rmse
+        self.evaluations = evaluations
+        self.iterations = iterations
+        self.converged = converged
+        self.fit = fit
+
+
+def _observed(series, simulation_period, what):
+    if series is None:
+        return None
+    values = np.asarray(series, dtype=np.float64).reshape(-1)
+    if values.shape[0] != simulation_period:
+        raise ValueError(f"Observed {what} must have one value per step")
+    return values
+
+
+def calibrate(factory, initial, observed_costs=None, observed_revenues=None, fixed=None,
+              global_parameters=None, bounds=None, max_evaluations=50, tolerance=1e-8):
+    """
+    Fits parameters so the simulated costs and revenues match observations.
+
+    :param factory: callable(dict) -> BusinessModel, as for parameter sweeps
+    :param initial: dict of parameter name -> starting value
+    :param observed_costs: optional sequence of costs per step (NaN = missing)
+    :param observed_revenues: optional sequence of revenues per step (NaN = missing)
+    :param fixed: optional dict of parameters passed to the factory unchanged
+    :param bounds: optional dict of name -> (low, high); either may be None
+    :param max_evaluations: int, most model evaluations to spend
+    :param tolerance: float, relative parameter step or cost decrease at which
+        the fit stops
+    :return: CalibrationResult
+    """
+    if observed_costs is None and observed_revenues is None:
+        raise ValueError("Calibration needs observed costs or revenues")
+    names = list(initial)
+    if not names:
+        raise ValueError("Calibration needs at least one parameter to fit")
+    period = len(observed_costs if observed_costs is not None else observed_revenues)
+    targets = [_observed(observed_costs, period, "costs"),
+               _observed(observed_revenues, period, "revenues")]
+
+    low = np.full(len(names), -np.inf)
+    high = np.full(len(names), np.inf)
+    for index, name in enumerate(names):
+        lower, upper = (bounds or {}).get(name, (None, None))
+        low[index] = -np.inf if lower is None else lower
+        high[index] = np.inf if upper is None else upper
+
+    def evaluate(values):
+        series = simulate_with_gradients(factory, dict(zip(names, values.tolist())), period,
+                                         fixed, global_parameters)
+        residuals, rows = [], []
+        for target, simulated, jacobian in (
+                (targets[0], series.costs, series.cost_jacobian),
+                (targets[1], series.revenues, series.revenue_jacobian)):
+            if target is not None:
+                known = ~np.isnan(target)
+                residuals.append(simulated[known] - target[known])
+                rows.append(jacobian[known])
+        residuals = np.concatenate(residuals)
+        return series, residuals, np.concatenate(rows), 0.5 * float(residuals @ residuals)
+
+    values = np.clip(np.array([float(initial[name]) for name in names]), low, high)
+    series, residuals, jacobian, cost = evaluate(values)
+    evaluations = 1
+    insensitive = [name for name, column in zip(names, jacobian.T) if not column.any()]
+    if insensitive:
+        raise ValueError(f"Simulated series do not depend on {insensitive} at their initial "
+                         f"values; the model does not use them, or they start on a threshold "
+                         f"(e.g. overhead_rate = 0)")
+
+    damping, iterations, converged = 1e-3, 0, cost == 0.0
+    while not converged and evaluations < max_evaluations:
+        normal = jacobian.T @ jacobian
+        gradient = jacobian.T @ residuals
+        scale = np.maximum(np.diag(normal), np.finfo(float).tiny)
+        step = np.linalg.lstsq(normal + damping * np.diag(scale), -gradient, rcond=None)[0]
+        trial = np.clip(values + step, low, high)
+        trial_series, trial_residuals, trial_jacobian, trial_cost = evaluate(trial)
+        evaluations += 1
+        if trial_cost < cost:
+            moved = np.abs(trial - values).max()
+            decrease = cost - trial_cost
+            values, series, residuals, jacobian = trial, trial_series, trial_residuals, trial_jacobian
+            cost, iterations = trial_cost, iterations + 1
+            damping = max(damping / 10.0, 1e-12)
+            converged = (moved <= tolerance * (np.abs(values).max() + tolerance)
+                         or decrease <= tolerance * cost or cost == 0.0)
+        else:
+            damping *= 10.0
+            converged = np.abs(trial - values).max() <= tolerance * (np.abs(values).max() + tolerance)
+
+    observations = residuals.shape[0]
+    errors = np.full(len(names), np.nan)
+    if observations > len(names):
+        variance = 2.0 * cost / (observations - len(names))
+        errors = np.sqrt(np.abs(np.diag(variance * np.linalg.pinv(jacobian.T @ jacobian))))
+    return CalibrationResult(
+        parameters=dict(zip(names, values.tolist())),
+        standard_errors=dict(zip(names, errors.tolist())),
+        cost=cost,
+        rmse=float(np.sqrt(2.0 * cost / observations)),
+        evaluations=evaluations,
+        iterations=iterations,
+        converged=bool(converged),
+        fit=series,
+    )
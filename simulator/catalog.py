@@ -0,0 +1,292 @@
+# business_model_simulator/simulator/catalog.py
+
+"""
+Dataset catalog and preference matching that drives exploration, purchase
+and preference-setting volumes.
+
+Datasets and consumers are described by bitsets packed into uint64 arrays:
+
+  - dataset tags: the kinds of data a dataset holds (tag_bits bits)
+  - dataset sharing: the purposes its owner allows, set by the owner's
+    preferences (purpose_bits bits)
+  - consumer needs: the tags a consumer is looking for
+  - consumer purposes: the purposes a consumer needs the data for
+
+A dataset matches a consumer when its sharing covers every purpose of the
+consumer and its tags contain any (mode="any") or all (mode="all") of the
+consumer's needs.
+
+Matching never compares consumers with datasets pair by pair. Datasets are
+counted per (tags, sharing) key with np.bincount into a table of
+2 ** (tag_bits + purpose_bits) cells. That table is turned into subset or
+superset sums over the bits (one vectorized pass per bit), so every
+consumer's match count is a single table lookup. Cost grows linearly with
+datasets and consumers; the table bounds tag_bits + purpose_bits by
+MAX_TABLE_BITS.
+
+catalog_volumes() repeats this per step for datasets listed and consumers
+joined by that step, and attach_catalog() writes the resulting volumes
+into the DataExploration, DataPurchase and PreferenceSetting operations
+as base_transaction_volume schedules.
+"""
+
+import numpy as np
+
+from .parameters import ParameterResolver, check_no_growth
+from .schedules import ArraySchedule
+
+# Largest tag_bits + purpose_bits supported (a 16M-cell count table)
+MAX_TABLE_BITS = 24
+
+MATCH_MODES = ("any", "all")
+
+
+def pack_bits(flags):
+    """
+    Packs a (count x bits) boolean array into one uint64 bitset per row
+    (column i is bit i).
+    """
+    flags = np.asarray(flags, dtype=bool)
+    if flags.shape[-1] > 64:
+        raise ValueError("At most 64 bits can be packed per bitset")
+    weights = np.left_shift(np.uint64(1), np.arange(flags.shape[-1], dtype=np.uint64))
+    return np.bitwise_or.reduce(np.where(flags, weights, np.uint64(0)), axis=-1).astype(np.uint64)
+
+
+def random_bitsets(count, bits, probability, rng):
+    """
+    Returns count uint64 bitsets whose bits are set independently with
+    the given probability (a float or one probability per bit).
+    """
+    return pack_bits(rng.random((count, bits)) < np.asarray(probability))
+
+
+def _check_bits(values, bits, what):
+    values = np.asarray(values, dtype=np.uint64).reshape(-1)
+    if bits < 64 and values.size and (values >> np.uint64(bits)).any():
+        raise ValueError(f"{what} use bits beyond the first {bits}")
+    return values
+
+
+def _sum_over_bits(table, first_bit, bits, superset):
+    """
+    In-place subset (superset=False) or superset sums over table index bits
+    [first_bit, first_bit + bits).
+    """
+    for bit in range(first_bit, first_bit + bits):
+        view = table.reshape(-1, 2, 1 << bit)
+        if superset:
+            view[:, 0, :] += view[:, 1, :]
+        else:
+            view[:, 1, :] += view[:, 0, :]
+
+
+class DatasetCatalog:
+    """
+    Datasets with their tags, sharing preferences and listing steps.
+    """
+
+    def __init__(self, tags, sharing, tag_bits, purpose_bits, listed_step=None):
+        """
+        :param tags: uint64 bitsets of dataset tags, one per dataset
+        :param sharing: uint64 bitsets of the purposes each dataset may be used for
+        :param tag_bits: int, number of tag bits in use
+        :param purpose_bits: int, number of purpose bits in use
+        :param listed_step: optional int array, step from which each dataset
+            is available (default: 0 for all)
+        """
+        if tag_bits + purpose_bits > MAX_TABLE_BITS:
+            raise ValueError(
+                f"tag_bits + purpose_bits is {tag_bits + purpose_bits}; at most "
+                f"{MAX_TABLE_BITS} are supported"
+            )
+        self.tag_bits = tag_bits
+        self.purpose_bits = purpose_bits
+        self.tags = _check_bits(tags, tag_bits, "Dataset tags")
+        self.sharing = _check_bits(sharing, purpose_bits, "Sharing preferences")
+        if self.tags.shape != self.sharing.shape:
+            raise ValueError("tags and sharing must have one entry per dataset")
+        self.listed_step = (np.zeros(self.tags.shape, dtype=np.int64) if listed_step is None
+                            else np.asarray(listed_step, dtype=np.int64).reshape(-1))
+
+    @classmethod
+    def random(cls, count, tag_bits, purpose_bits, tag_probability=0.2,
+               share_probability=0.5, listing_steps=1, seed=None):
+        """
+        Returns a catalog with random tags and sharing preferences, listed
+        uniformly over the first listing_steps steps.
+        """
+        rng = np.random.default_rng(seed)
+        return cls(random_bitsets(count, tag_bits, tag_probability, rng),
+                   random_bitsets(count, purpose_bits, share_probability, rng),
+                   tag_bits, purpose_bits, rng.integers(0, listing_steps, count))
+
+    def __len__(self):
+        return self.tags.shape[0]
+
+    def set_sharing(self, datasets, sharing):
+        """
+        Updates the sharing preferences of the given datasets.
+        """
+        self.sharing[np.asarray(datasets, dtype=np.intp)] = _check_bits(
+            sharing, self.purpose_bits, "Sharing preferences")
+
+    def _keys(self, tags, sharing):
+        return (tags | (sharing << np.uint64(self.tag_bits))).astype(np.intp)
+
+    def match_table(self, mode="any", datasets=None):
+        """
+        Returns the count table for mode over the selected datasets (a boolean
+        mask or index array; default: all). Look consumers up with
+        match_counts(..., table=...).
+        """
+        if mode not in MATCH_MODES:
+            raise ValueError(f"Unknown match mode '{mode}', expected one of {MATCH_MODES}")
+        tags, sharing = self.tags, self.sharing
+        if datasets is not None:
+            tags, sharing = tags[datasets], sharing[datasets]
+        size = 1 << (self.tag_bits + self.purpose_bits)
+        table = np.bincount(self._keys(tags, sharing), minlength=size).astype(np.int64)
+        # "all" counts tag supersets of the needs, "any" counts tag subsets of
+        # the complement; sharing always counts supersets of the purposes
+        _sum_over_bits(table, 0, self.tag_bits, superset=(mode == "all"))
+        _sum_over_bits(table, self.tag_bits, self.purpose_bits, superset=True)
+        return table
+
+    def match_counts(self, needs, purposes, mode="any", table=None):
+        """
+        Returns the number of matching datasets for every consumer.
+
+        :param needs: uint64 bitsets of the tags each consumer looks for
+        :param purposes: uint64 bitsets of each consumer's purposes
+        :param mode: "any" or "all" of the needed tags must be present
+        :param table: optional result of match_table(mode) to reuse
+        :return: int64 array, one count per consumer
+        """
+        needs = _check_bits(needs, self.tag_bits, "Consumer needs")
+        purposes = _check_bits(purposes, self.purpose_bits, "Consumer purposes")
+        if table is None:
+            table = self.match_table(mode)
+        if mode == "all":
+            return table[self._keys(needs, purposes)]
+        all_tags = np.uint64((1 << self.tag_bits) - 1)
+        shared = table[self._keys(np.full_like(needs, all_tags), purposes)]
+        return shared - table[self._keys(~needs & all_tags, purposes)]
+
+
+class ConsumerPopulation:
+    """
+    Data consumers with their needs, purposes and joining steps.
+    """
+
+    def __init__(self, needs, purposes, joined_step=None):
+        """
+        :param needs: uint64 bitsets of the tags each consumer looks for
+        :param purposes: uint64 bitsets of each consumer's purposes
+        :param joined_step: optional int array, step from which each consumer
+            is active (default: 0 for all)
+        """
+        self.needs = np.asarray(needs, dtype=np.uint64).reshape(-1)
+        self.purposes = np.asarray(purposes, dtype=np.uint64).reshape(-1)
+        if self.needs.shape != self.purposes.shape:
+            raise ValueError("needs and purposes must have one entry per consumer")
+        self.joined_step = (np.zeros(self.needs.shape, dtype=np.int64) if joined_step is None
+                            else np.asarray(joined_step, dtype=np.int64).reshape(-1))
+
+    @classmethod
+    def random(cls, count, tag_bits, purpose_bits, need_probability=0.1,
+               purpose_probability=0.2, joining_steps=1, seed=None):
+        """
+        Returns consumers with random needs and purposes, joining uniformly
+        over the first joining_steps steps.
+        """
+        rng = np.random.default_rng(seed)
+        return cls(random_bitsets(count, tag_bits, need_probability, rng),
+                   random_bitsets(count, purpose_bits, purpose_probability, rng),
+                   rng.integers(0, joining_steps, count))
+
+    def __len__(self):
+        return self.needs.shape[0]
+
+
+class CatalogVolumes:
+    """
+    Per-step volumes from catalog_volumes; every attribute is a float64 array
+    over steps.
+
+    Attributes:
+      - exploration: dataset views (each active consumer browses up to
+        browse_limit matching datasets)
+      - purchase: expected purchases (purchase_rate per matched consumer)
+      - preference: datasets listed, each setting its owner's preferences
+      - matched_consumers: active consumers with at least one match
+      - active_consumers: consumers joined by the step
+    """
+
+    def __init__(self, exploration, purchase, preference, matched_consumers, active_consumers):
+        self.exploration = exploration
+        self.purchase = purchase
+        self.preference = preference
+        self.matched_consumers = matched_consumers
+        self.active_consumers = active_consumers
+
+
+def catalog_volumes(catalog, consumers, simulation_period, mode="any", browse_limit=10,
+                    purchase_rate=0.1):
+    """
+    Matches active consumers against listed datasets at every step.
+
+    The count table is built incrementally: each step adds only the datasets
+    listed at that step (the sums over bits are linear), and every active
+    consumer is looked up once per step.
+
+    :param browse_limit: int, most matching datasets a consumer views per step
+    :param purchase_rate: float, expected purchases per matched consumer per step
+    :return: CatalogVolumes
+    """
+    exploration = np.zeros(simulation_period)
+    purchase = np.zeros(simulation_period)
+    matched_consumers = np.zeros(simulation_period)
+    active_consumers = np.zeros(simulation_period)
+    listed = np.clip(catalog.listed_step, 0, None)
+    preference = np.bincount(listed[listed < simulation_period],
+                             minlength=simulation_period)[:simulation_period].astype(np.float64)
+
+    table = None
+    for step in range(simulation_period):
+        new = listed == step
+        if table is None:
+            table = catalog.match_table(mode, datasets=new)
+        elif new.any():
+            table += catalog.match_table(mode, datasets=new)
+        active = consumers.joined_step <= step
+        counts = catalog.match_counts(consumers.needs[active], consumers.purposes[active],
+                                      mode=mode, table=table)
+        matched = np.count_nonzero(counts)
+        exploration[step] = np.minimum(counts, browse_limit).sum()
+        matched_consumers[step] = matched
+        purchase[step] = purchase_rate * matched
+        active_consumers[step] = counts.shape[0]
+    return CatalogVolumes(exploration, purchase, preference, matched_consumers, active_consumers)
+
+
+def attach_catalog(business_model, volumes, exploration="DataExploration",
+                   purchase="DataPurchase", preference="PreferenceSetting",
+                   global_parameters=None):
+    """
+    Sets the base_transaction_volume of the named operations to ArraySchedules
+    of the catalog volumes. Operations that are absent (or named None) are
+    skipped.
+
+    :raises ValueError: if the model (with global_parameters) has a non-zero
+        growth_rate, which would compound volumes that joining and listing
+        steps already model
+    """
+    resolved = ParameterResolver().resolve(business_model, global_parameters)
+    check_no_growth(resolved, len(volumes.exploration), "catalog volumes")
+    schedules = {exploration: volumes.exploration, purchase: volumes.purchase,
+                 preference: volumes.preference}
+    for op in business_model.transaction_model.operations:
+        if op.name in schedules and op.name is not None:
+            op.parameters["base_transaction_volume"] = ArraySchedule(schedules[op.name])
+    return business_model
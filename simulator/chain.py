@@ -0,0 +1,164 @@
+# business_model_simulator/simulator/chain.py
+
+"""
+Chain throughput, congestion and gas prices.
+
+Each operation may declare gas_per_transaction; its gas demand in a step is
+that times its transaction volume. The chain processes at most `capacity`
+gas per step. Demand beyond capacity is carried forward as a backlog, which
+follows the Lindley recursion
+
+    backlog[t] = max(0, backlog[t - 1] + demand[t] - capacity[t])
+
+computed without a loop over steps. With S the cumulative sum of
+demand - capacity, backlog[t] = S[t] + max(initial_backlog, -min(0, S[0..t])),
+a running minimum (np.minimum.accumulate) along the step axis, so whole
+(scenarios x steps) arrays are queued at once.
+
+The gas price paid in a step is the base price path (base_gas_price, a
+number or a schedule) raised by the congestion the backlog represents:
+
+    gas_price[t] = base_gas_price[t] * (1 + congestion_premium * backlog[t] / capacity[t])
+
+attach_chain() computes a model's demand from its operations' volumes and
+stores the resulting price on each gas-using operation as its "gas_price"
+schedule. Operation.compute_cost then charges
+gas_per_transaction * transaction_volume * gas_price with either engine.
+"""
+
+import numpy as np
+
+from .parameters import ParameterResolver
+from .schedules import ArraySchedule, materialize_value
+from .simulator import iter_model_steps
+
+
+def queue_backlog(demand, capacity, initial_backlog=0.0):
+    """
+    Returns the backlog left after each step for demand and capacity arrays
+    broadcasting to (..., steps), e.g. (scenarios x steps).
+    """
+    excess = np.asarray(demand, dtype=np.float64) - np.asarray(capacity, dtype=np.float64)
+    cumulative = np.cumsum(excess, axis=-1)
+    lowest = np.minimum.accumulate(np.minimum(cumulative, 0.0), axis=-1)
+    initial = np.asarray(initial_backlog, dtype=np.float64)
+    if initial.ndim:
+        initial = initial[..., None]
+    return cumulative + np.maximum(initial, -lowest)
+
+
+class ChainState:
+    """
+    Outcome of ChainModel.evaluate; arrays shaped like the demand.
+
+    Attributes:
+      - demand: gas requested in each step
+      - processed: gas processed in each step
+      - backlog: gas still queued after each step
+      - utilization: processed / capacity
+      - gas_price: price paid per unit of gas in each step
+    """
+
+    def __init__(self, demand, processed, backlog, utilization, gas_price):
+        self.demand = demand
+        self.processed = processed
+        self.backlog = backlog
+        self.utilization = utilization
+        self.gas_price = gas_price
+
+
+class ChainModel:
+    """
+    Capacity-constrained chain with a congestion-dependent gas price.
+    """
+
+    def __init__(self, capacity, congestion_premium=1.0, initial_backlog=0.0):
+        """
+        :param capacity: gas processed per step; a number, a Schedule, or an
+            array broadcasting to (..., steps)
+        :param congestion_premium: float, relative price increase per step's
+            worth of capacity queued
+        :param initial_backlog: float, gas queued before the first step
+        """
+        self.capacity = capacity
+        self.congestion_premium = congestion_premium
+        self.initial_backlog = initial_backlog
+
+    @classmethod
+    def from_throughput(cls, transactions_per_second, seconds_per_step, gas_per_transaction,
+                        **kwargs):
+        """
+        Builds a chain whose capacity is a transaction rate limit, e.g.
+        15 TPS of 21000-gas transfers over daily steps.
+        """
+        capacity = transactions_per_second * seconds_per_step * gas_per_transaction
+        return cls(capacity, **kwargs)
+
+    def _capacity(self, steps):
+        if hasattr(self.capacity, "materialize"):
+            return materialize_value(self.capacity, steps)
+        return np.asarray(self.capacity, dtype=np.float64)
+
+    def evaluate(self, demand, base_gas_price):
+        """
+        Queues demand against the capacity and prices every step.
+
+        :param demand: array (..., steps) of gas requested per step
+        :param base_gas_price: number or array broadcasting to demand
+        :return: ChainState
+        """
+        demand = np.asarray(demand, dtype=np.float64)
+        capacity = np.broadcast_to(self._capacity(demand.shape[-1]), demand.shape)
+        if (capacity <= 0).any():
+            raise ValueError("Chain capacity must be positive")
+        backlog = queue_backlog(demand, capacity, self.initial_backlog)
+        previous = np.empty_like(backlog)
+        previous[..., 0] = self.initial_backlog
+        previous[..., 1:] = backlog[..., :-1]
+        processed = previous + demand - backlog
+        gas_price = np.asarray(base_gas_price, dtype=np.float64) * (
+            1.0 + self.congestion_premium * backlog / capacity
+        )
+        return ChainState(demand, processed, backlog, processed / capacity, gas_price)
+
+
+def operation_volumes(business_model, simulation_period, global_parameters=None):
+    """
+    Returns every operation's transaction volume per step as an
+    (operations x steps) array, stepping the model like the reference engine.
+    """
+    resolved = ParameterResolver().resolve(business_model, global_parameters)
+
+    volumes = np.ones((len(resolved.operations), simulation_period))
+    for step, tx_model in iter_model_steps(resolved, simulation_period):
+        for index, op in enumerate(tx_model.operations):
+            volumes[index, step] = op.parameters.get('transaction_volume', 1.0)
+    return volumes
+
+
+def attach_chain(business_model, chain, simulation_period, global_parameters=None,
+                 price_key="base_gas_price"):
+    """
+    Queues the model's gas demand on chain and stores the congested gas price
+    on every operation with a gas_per_transaction as its "gas_price" schedule.
+
+    The base price is the price_key parameter as the model resolves it
+    (global parameters included), a number or a schedule.
+
+    :return: ChainState
+    """
+    resolved = ParameterResolver().resolve(business_model, global_parameters)
+    volumes = operation_volumes(business_model, simulation_period, global_parameters)
+    gas = np.array([
+        materialize_value(params.get('gas_per_transaction', 0.0), simulation_period)
+        for params in resolved.operation_parameters
+    ]).reshape(volumes.shape)
+    base_price = materialize_value(resolved.parameters.get(price_key, 0.0), simulation_period)
+
+    state = chain.evaluate((gas * volumes).sum(axis=0), base_price)
+    schedule = ArraySchedule(state.gas_price)
+    for op, params in zip(business_model.transaction_model.operations,
+                          resolved.operation_parameters):
+        if params.get('gas_per_transaction', 0.0):
+            op.parameters['gas_price'] = schedule
+    return state
@@ -0,0 +1,185 @@
+# business_model_simulator/simulator/checkpoint.py
+
+"""
+Checkpointed, resumable parameter sweeps.
+
+Every completed combination is appended to a JSON-lines sweep log as soon as
+it finishes:
+
+    {"grid_digest": "...", "param_names": [...], "combo_count": 42}       (header)
+    {"ordinal": 0, "combo_key": "...", "params": {...}, "results": {...}}
+    {"ordinal": 1, ...}
+
+and a small manifest (<log>.manifest.json) recording progress is rewritten
+atomically every checkpoint_every combinations. When a sweep is restarted
+with the same log, the grid is re-enumerated in itertools.product order and
+combinations already in the log are replayed from disk instead of being run
+again. A partially written last line (e.g. after the process was killed
+mid-write) is discarded.
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import time
+
+MANIFEST_SUFFIX = ".manifest.json"
+
+
+class CheckpointError(ValueError):
+    """
+    Raised when an existing sweep log does not belong to the requested sweep.
+    """
+
+
+def grid_digest(param_grid, simulation_period):
+    """
+    Returns a SHA-256 digest identifying a sweep grid, used to refuse resuming
+    a log written for a different grid or horizon.
+    """
+    description = json.dumps(
+        {"grid": [[name, list(values)] for name, values in param_grid.items()],
+         "simulation_period": simulation_period},
+        default=repr
+    )
+    return hashlib.sha256(description.encode("utf-8")).hexdigest()
+
+
+def manifest_path(log_path):
+    return log_path + MANIFEST_SUFFIX
+
+
+def read_sweep_log(log_path):
+    """
+    Reads a sweep log and returns (header, entries, valid_size), where entries
+    maps ordinal -> {"ordinal", "combo_key", "params", "results"} and
+    valid_size is the byte length of the intact prefix of the file. A
+    truncated or corrupt trailing line is ignored.
+
+    Returns (None, {}, 0) if the file does not exist or has no complete header.
+    """
+    header = None
+    entries = {}
+    valid_size = 0
+    try:
+        f = open(log_path, "rb")
+    except FileNotFoundError:
+        return None, entries, 0
+
+    with f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            if header is None:
+                header = record
+            else:
+                entries[record["ordinal"]] = record
+            valid_size += len(line)
+    return header, entries, valid_size
+
+
+def _write_manifest(log_path, header, completed, log_size):
+    manifest = {
+        "grid_digest": header["grid_digest"],
+        "combo_count": header["combo_count"],
+        "completed": completed,
+        "log_size": log_size,
+        "updated": time.time(),
+    }
+    target = manifest_path(log_path)
+    temporary = f"{target}.{os.getpid()}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(manifest, f)
+    os.replace(temporary, target)
+
+
+def read_manifest(log_path):
+    """
+    Returns the last checkpoint manifest of a sweep log, or None if there is none.
+    """
+    try:
+        with open(manifest_path(log_path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def iter_checkpointed_sweep(simulator, param_grid, business_model_factory, log_path,
+                            resume=True, checkpoint_every=100):
+    """
+    Runs a parameter sweep like Simulator.iter_parameter_sweep, appending each
+    completed combination to log_path, and yields
+    (ordinal, combo_params, combo_key, run_results) in grid order.
+
+    :param simulator: Simulator providing simulation_period and global_parameters
+    :param param_grid: dict of parameter name -> list of values
+    :param business_model_factory: callable returning a BusinessModel for a dict of parameters
+    :param log_path: str, path of the append-only sweep log
+    :param resume: bool, replay combinations already in an existing log instead
+        of starting over (the log is truncated when False)
+    :param checkpoint_every: int, combinations between fsync + manifest updates
+    :raises CheckpointError: if an existing log was written for another grid
+    """
+    param_names = list(param_grid.keys())
+    combo_count = 1
+    for name in param_names:
+        combo_count *= len(param_grid[name])
+    header = {
+        "grid_digest": grid_digest(param_grid, simulator.simulation_period),
+        "param_names": param_names,
+        "combo_count": combo_count,
+    }
+
+    existing_header, entries, valid_size = (
+        read_sweep_log(log_path) if resume else (None, {}, 0)
+    )
+    if existing_header is not None and existing_header.get("grid_digest") != header["grid_digest"]:
+        raise CheckpointError(
+            f"Sweep log '{log_path}' was written for a different parameter grid; "
+            f"use another path or resume=False"
+        )
+
+    parent = os.path.dirname(log_path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+
+    with open(log_path, "r+b" if existing_header is not None else "wb") as log:
+        if existing_header is None:
+            log.write((json.dumps(header) + "\n").encode("utf-8"))
+        else:
+            # Drop a partially written trailing line before appending
+            log.truncate(valid_size)
+            log.seek(valid_size)
+
+        completed = len(entries)
+        since_checkpoint = 0
+        combos = itertools.product(*(param_grid[name] for name in param_names))
+        for ordinal, combo in enumerate(combos):
+            combo_params = dict(zip(param_names, combo))
+            entry = entries.pop(ordinal, None)
+            if entry is not None:
+                yield ordinal, combo_params, entry["combo_key"], entry["results"]
+                continue
+
+            combo_key, run_results = simulator.run_combination(combo_params, business_model_factory)
+            record = {"ordinal": ordinal, "combo_key": combo_key,
+                      "params": combo_params, "results": run_results}
+            log.write((json.dumps(record, default=repr) + "\n").encode("utf-8"))
+            log.flush()
+            completed += 1
+            since_checkpoint += 1
+            if since_checkpoint >= checkpoint_every:
+                os.fsync(log.fileno())
+                _write_manifest(log_path, header, completed, log.tell())
+                since_checkpoint = 0
+
+            yield ordinal, combo_params, combo_key, run_results
+
+        log.flush()
+        os.fsync(log.fileno())
+        _write_manifest(log_path, header, completed, log.tell())
@@ -0,0 +1,549 @@
+# business_model_simulator/simulator/cli.py
+
+"""
+Command-line entry point for the simulator (python -m simulator).
+
+Only the standard library and the pure-Python core are imported at start-up.
+NumPy-backed modules (the vectorized engine, metrics, .npz output) are
+imported when a command actually selects them, so short single-scenario runs
+start as quickly as the interpreter allows.
+"""
+
+import argparse
+import json
+import sys
+
+from .utils import import_object, parse_grid_values, parse_size, parse_value
+
+DEFAULT_FACTORY = "simulator.sample:create_sample_business_model"
+
+# Sweeps with at most this many (combos x steps) cells use the pure-Python
+# engine under --engine auto; NumPy's import cost outweighs its speed below it.
+SMALL_RUN_CELLS = 20000
+
+
+def _parse_assignments(items, parse):
+    parsed = {}
+    for item in items or []:
+        name, sep, value = item.partition("=")
+        if not sep:
+            raise argparse.ArgumentTypeError(f"Expected NAME=VALUE, got '{item}'")
+        parsed[name.strip()] = parse(value)
+    return parsed
+
+
+def _count_cells(param_grid, simulation_period):
+    combos = 1
+    for values in param_grid.values():
+        combos *= len(values)
+    return combos * simulation_period
+
+
+def choose_engine(engine, param_grid, simulation_period, output_path=None):
+    """
+    Resolves --engine auto to "python" or "vectorized" based on the sweep size
+    and output format.
+    """
+    if engine != "auto":
+        return engine
+    if output_path and output_path.endswith(".npz"):
+        return "vectorized"
+    if _count_cells(param_grid, simulation_period) <= SMALL_RUN_CELLS:
+        return "python"
+    return "vectorized"
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m simulator",
+        description="Run business model simulations and parameter sweeps."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_model_options(sub):
+        sub.add_argument("--scenario", default=None,
+                         help="Scenario file (.json, .toml, .yaml) describing the models and sweep grid.")
+        sub.add_argument("--no-scenario-cache", action="store_true",
+                         help="Do not read or write the compiled scenario cache on disk.")
+        sub.add_argument("--factory", default=DEFAULT_FACTORY,
+                         help="module:callable returning a BusinessModel for a dict of parameters.")
+        sub.add_argument("--period", type=int, default=None,
+                         help="Number of simulation time steps (default: the scenario's, or 10).")
+        sub.add_argument("--global", dest="global_parameters", action="append", metavar="NAME=VALUE",
+                         help="Global parameter applied to every business model (repeatable).")
+
+    def add_common(sub):
+        add_model_options(sub)
+        sub.add_argument("--metrics", default="",
+                         help="Comma-separated metrics to compute, e.g. npv,irr,break_even_step.")
+        sub.add_argument("--discount-rate", type=float, default=0.0,
+                         help="Per-step discount rate for NPV metrics.")
+        sub.add_argument("--output", default=None,
+                         help="Write results to this .csv (or .npz for sweeps) file.")
+
+    run_parser = subparsers.add_parser("run", help="Run a single scenario.")
+    add_common(run_parser)
+    run_parser.add_argument("--param", action="append", metavar="NAME=VALUE",
+                            help="Parameter passed to the factory (repeatable).")
+
+    sweep_parser = subparsers.add_parser("sweep", help="Run a parameter sweep.")
+    add_common(sweep_parser)
+    sweep_parser.add_argument("--grid", action="append", metavar="NAME=SPEC",
+                              help="Sweep axis: NAME=start:stop:step or NAME=a,b,c (repeatable); "
+                                   "replaces the scenario's grid when given.")
+    sweep_parser.add_argument("--engine", choices=("auto", "python", "vectorized"), default="auto",
+                              help="Engine to use; auto picks pure Python for small sweeps.")
+    sweep_parser.add_argument("--checkpoint", default=None, metavar="LOG",
+                              help="Append each finished combination to this sweep log and resume "
+                                   "from it if it exists (python engine).")
+    sweep_parser.add_argument("--restart", action="store_true",
+                              help="With --checkpoint, discard an existing log instead of resuming.")
+    sweep_parser.add_argument("--reduce-axes", action="store_true",
+                              help="Vectorized engine: evaluate costs and revenues only over the "
+                                   "axes they depend on (see simulator.relevance).")
+    sweep_parser.add_argument("--memory-budget", type=parse_size, default=None, metavar="SIZE",
+                              help="Vectorized engine: evaluate the grid in chunks that fit SIZE "
+                                   "(e.g. 512M, 4G) and stream each chunk to the .csv output.")
+    sweep_parser.add_argument("--workers", type=int, default=1,
+                              help="Run the sweep on this many processes writing into shared memory.")
+    sweep_parser.add_argument("--dtype", choices=("float64", "float32"), default="float64",
+                              help="Result storage for the vectorized engine and --workers; "
+                                   "float32 halves memory after checking a sample of the grid "
+                                   "against the float64 reference.")
+    sweep_parser.add_argument("--index", action="store_true",
+                              help="Write typed param_<name> columns and a query index next to "
+                                   "the .csv output (see simulator.query).")
+    sweep_parser.add_argument("--top", type=int, default=10,
+                              help="Number of best combinations to print when --metrics is given.")
+    sweep_parser.add_argument("--summary-only", action="store_true",
+                              help="Keep one summary row per combination (totals, means, npv, "
+                                   "break-even step) instead of every step (see simulator.summary).")
+    sweep_parser.add_argument("--keep-top", type=int, default=None, metavar="K",
+                              help="Keep only the K best combinations by --rank-by; the output "
+                                   "holds their summaries, best first.")
+    sweep_parser.add_argument("--rank-by", default="total_profit",
+                              help="Summary field ranking --keep-top, e.g. total_profit or npv.")
+    sweep_parser.add_argument("--ascending", action="store_true",
+                              help="With --keep-top, smaller --rank-by values are better.")
+    sweep_parser.add_argument("--telemetry", default=None, metavar="PATH",
+                              help="Append JSON-lines progress records (throughput, ETA, memory "
+                                   "high-water mark, per-worker rates) to PATH, or '-' for stderr.")
+    sweep_parser.add_argument("--telemetry-interval", type=float, default=1.0, metavar="SECONDS",
+                              help="Minimum seconds between --telemetry progress records.")
+
+    serve_parser = subparsers.add_parser(
+        "serve", help="Serve what-if queries over HTTP on localhost (see simulator.server).")
+    add_model_options(serve_parser)
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Interface to bind.")
+    serve_parser.add_argument("--port", type=int, default=8765, help="Port to bind (0 picks a free one).")
+    serve_parser.add_argument("--cache-size", type=int, default=1024,
+                              help="Number of evaluated results kept in memory.")
+    serve_parser.add_argument("--verbose", action="store_true", help="Log every request to stderr.")
+
+    diff_parser = subparsers.add_parser(
+        "diff", help="Compare two sweep result files (.csv or .npz; see simulator.diff).")
+    diff_parser.add_argument("first", help="First result file.")
+    diff_parser.add_argument("second", help="Second result file.")
+    diff_parser.add_argument("--rtol", type=float, default=1e-9, help="Relative tolerance.")
+    diff_parser.add_argument("--atol", type=float, default=1e-9, help="Absolute tolerance.")
+    diff_parser.add_argument("--show", type=int, default=10, help="Number of worst differences listed.")
+
+    calibrate_parser = subparsers.add_parser(
+        "calibrate", help="Fit parameters to observed costs and revenues "
+                          "(see simulator.calibration).")
+    add_model_options(calibrate_parser)
+    calibrate_parser.add_argument("--observed", required=True, metavar="CSV",
+                                  help="CSV with a costs and/or revenues column, one row per "
+                                       "step; empty cells are missing observations.")
+    calibrate_parser.add_argument("--fit", action="append", required=True, metavar="NAME=VALUE",
+                                  help="Parameter to fit and its starting value (repeatable).")
+    calibrate_parser.add_argument("--bound", action="append", metavar="NAME=LOW:HIGH",
+                                  help="Bounds of a fitted parameter; either side may be empty.")
+    calibrate_parser.add_argument("--param", action="append", metavar="NAME=VALUE",
+                                  help="Fixed parameter passed to the factory (repeatable).")
+    calibrate_parser.add_argument("--max-evaluations", type=int, default=50,
+                                  help="Most model evaluations to spend.")
+
+    verify_parser = subparsers.add_parser(
+        "verify", help="Check the fast engines against the reference engine on random "
+                       "scenarios (see simulator.equivalence).")
+    verify_parser.add_argument("--seeds", type=int, default=100, help="Number of random scenarios.")
+    verify_parser.add_argument("--start", type=int, default=0, help="First seed.")
+    verify_parser.add_argument("--engines", default=None,
+                               help="Comma-separated engines to check (default: all).")
+    return parser
+
+
+def _metric_names(text):
+    return [name.strip() for name in text.split(",") if name.strip()]
+
+
+def _to_jsonable(value):
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return value
+
+
+def _load_scenario(args):
+    if not args.scenario:
+        return None
+    from .scenario import load_scenario, DEFAULT_CACHE_DIR
+
+    return load_scenario(
+        args.scenario, cache_dir=None if args.no_scenario_cache else DEFAULT_CACHE_DIR
+    )
+
+
+def _build_simulator(args, scenario):
+    from .simulator import Simulator
+
+    global_parameters = dict(scenario.global_parameters) if scenario else {}
+    global_parameters.update(_parse_assignments(args.global_parameters, parse_value))
+    if args.period is not None:
+        period = args.period
+    else:
+        period = scenario.simulation_period if scenario else 10
+    return Simulator(simulation_period=period, global_parameters=global_parameters)
+
+
+def command_run(args, out):
+    from .output import write_sweep_results_to_csv
+
+    scenario = _load_scenario(args)
+    params = _parse_assignments(args.param, parse_value)
+    sim = _build_simulator(args, scenario)
+    if scenario:
+        for name in scenario.model_names:
+            sim.add_business_model(scenario.factory(name)(params))
+    else:
+        sim.add_business_model(import_object(args.factory)(params))
+    metrics = _metric_names(args.metrics)
+    sim.run_simulation(metrics=metrics or None, discount_rate=args.discount_rate)
+
+    if args.output:
+        write_sweep_results_to_csv({"single_run": sim.collect_results()}, args.output)
+
+    summary = {"results": sim.collect_results()}
+    if metrics:
+        summary["metrics"] = {
+            name: {k: _to_jsonable(v) for k, v in values.items()}
+            for name, values in sim.collect_metrics().items()
+        }
+    if not args.output or metrics:
+        json.dump(summary, out)
+        out.write("\n")
+    return 0
+
+
+def _parallel_sweep(args, sim, param_grid, factory, metrics, engine, telemetry):
+    from .output import write_sweep_arrays_to_csv, write_sweep_arrays_to_npz
+
+    with sim.run_parallel_sweep(param_grid, factory, workers=args.workers,
+                                metrics=metrics or None, discount_rate=args.discount_rate,
+                                engine=engine, dtype=args.dtype, telemetry=telemetry) as arrays:
+        if args.output and args.output.endswith(".npz"):
+            write_sweep_arrays_to_npz(arrays, args.output)
+        elif args.index:
+            from .query import write_indexed_sweep_arrays
+            write_indexed_sweep_arrays(arrays, args.output)
+        elif args.output:
+            write_sweep_arrays_to_csv(arrays, args.output)
+        return len(arrays.combos)
+
+
+def _chunked_sweep(args, sim, param_grid, factory, metrics, telemetry):
+    from .output import write_sweep_arrays_to_csv
+
+    if args.output and args.output.endswith(".npz"):
+        raise SystemExit("--memory-budget streams chunks and needs .csv output.")
+    if args.reduce_axes:
+        raise SystemExit("--memory-budget cannot be combined with --reduce-axes.")
+
+    writer = None
+    if args.index:
+        from .query import IndexedSweepWriter
+        writer = IndexedSweepWriter(args.output, list(param_grid.keys()))
+        sink = writer.add_arrays
+    elif args.output:
+        chunks_written = []
+
+        def sink(arrays):
+            write_sweep_arrays_to_csv(arrays, args.output, append=bool(chunks_written))
+            chunks_written.append(len(arrays.combos))
+    else:
+        sink = None
+
+    combo_count = sim.run_chunked_sweep(
+        param_grid, factory, sink=sink, memory_budget=args.memory_budget,
+        metrics=metrics or None, discount_rate=args.discount_rate, dtype=args.dtype,
+        telemetry=telemetry
+    )
+    if writer is not None:
+        writer.close()
+    return combo_count
+
+
+def _summary_sweep(args, sim, param_grid, factory, engine, out, telemetry):
+    from .summary import SUMMARY_FIELDS, write_sweep_summary_to_csv
+
+    if args.checkpoint or args.workers > 1 or args.index or args.metrics:
+        raise SystemExit("--summary-only and --keep-top cannot be combined with "
+                         "--checkpoint, --workers, --index or --metrics.")
+    if args.output and not args.output.endswith(".csv"):
+        raise SystemExit("--summary-only and --keep-top write .csv output.")
+    if args.rank_by not in SUMMARY_FIELDS:
+        raise SystemExit(f"--rank-by must be one of {', '.join(SUMMARY_FIELDS)}.")
+
+    summary = sim.run_summary_sweep(
+        param_grid, factory, keep_summaries=args.summary_only, top_k=args.keep_top,
+        rank_by=args.rank_by, descending=not args.ascending, discount_rate=args.discount_rate,
+        engine=engine, memory_budget=args.memory_budget, dtype=args.dtype, telemetry=telemetry
+    )
+    if args.output:
+        write_sweep_summary_to_csv(summary, args.output, top_only=not args.summary_only)
+    out.write(f"Swept {summary.combo_count} combinations with the {engine} engine.\n")
+    if args.keep_top:
+        out.write(f"Top {args.keep_top} combinations by {args.rank_by}:\n")
+        for row in summary.top_rows():
+            out.write(f"  {row['combo_key']}: {row[args.rank_by]:.4f}\n")
+    return 0
+
+
+def command_sweep(args, out):
+    scenario = _load_scenario(args)
+    factory = scenario.factory() if scenario else import_object(args.factory)
+    if args.grid:
+        param_grid = _parse_assignments(args.grid, parse_grid_values)
+    elif scenario and scenario.param_grid:
+        param_grid = scenario.param_grid
+    else:
+        raise SystemExit("A sweep needs --grid or a scenario with a sweep grid.")
+
+    sim = _build_simulator(args, scenario)
+    if args.checkpoint and args.engine == "vectorized":
+        raise SystemExit("--checkpoint requires --engine python or auto.")
+    if args.memory_budget is not None and (args.checkpoint or args.engine == "python"):
+        raise SystemExit("--memory-budget requires --engine vectorized or auto.")
+    if args.dtype != "float64" and (args.checkpoint or (args.engine == "python" and args.workers <= 1)):
+        raise SystemExit(f"--dtype {args.dtype} requires --engine vectorized or auto, or --workers.")
+    if args.checkpoint:
+        engine = "python"
+    elif args.memory_budget is not None or (args.dtype != "float64" and args.workers <= 1):
+        engine = "vectorized"
+    else:
+        engine = choose_engine(args.engine, param_grid, sim.simulation_period, args.output)
+    metrics = _metric_names(args.metrics)
+    if args.index and not (args.output and args.output.endswith(".csv")):
+        raise SystemExit("--index requires a .csv --output.")
+
+    if args.workers > 1 and (args.checkpoint or args.memory_budget is not None):
+        raise SystemExit("--workers cannot be combined with --checkpoint or --memory-budget.")
+
+    if args.dtype != "float64":
+        from .vectorized import check_precision
+
+        try:
+            error = check_precision(param_grid, factory, sim.simulation_period,
+                                    sim.global_parameters, dtype=args.dtype)
+        except ValueError as exc:
+            raise SystemExit(str(exc))
+        out.write(f"{args.dtype} results are within {error:.3g} (relative) of float64 "
+                  f"on a sample of the grid.\n")
+
+    telemetry = None
+    if args.telemetry:
+        from .telemetry import SweepTelemetry
+        telemetry = SweepTelemetry(sys.stderr if args.telemetry == "-" else args.telemetry,
+                                   interval=args.telemetry_interval, label=args.scenario)
+    try:
+        return _run_sweep(args, sim, param_grid, factory, metrics, engine, out, telemetry)
+    finally:
+        if telemetry is not None:
+            telemetry.close()
+
+
+def _run_sweep(args, sim, param_grid, factory, metrics, engine, out, telemetry):
+    if args.summary_only or args.keep_top:
+        return _summary_sweep(args, sim, param_grid, factory, engine, out, telemetry)
+    if args.workers > 1:
+        combo_count = _parallel_sweep(args, sim, param_grid, factory, metrics, engine, telemetry)
+    elif engine == "vectorized" and args.memory_budget is not None:
+        combo_count = _chunked_sweep(args, sim, param_grid, factory, metrics, telemetry)
+    elif engine == "vectorized":
+        from .output import write_sweep_arrays_to_csv, write_sweep_arrays_to_npz
+
+        arrays = sim.run_vectorized_sweep(
+            param_grid, factory, metrics=metrics or None, discount_rate=args.discount_rate,
+            reduce_axes=args.reduce_axes, dtype=args.dtype, telemetry=telemetry
+        )
+        if args.output and args.output.endswith(".npz"):
+            write_sweep_arrays_to_npz(arrays, args.output)
+        elif args.index:
+            from .query import write_indexed_sweep_arrays
+            write_indexed_sweep_arrays(arrays, args.output)
+        elif args.output:
+            write_sweep_arrays_to_csv(arrays, args.output)
+        combo_count = len(arrays.combos)
+    else:
+        from .output import run_pipelined_sweep, write_sweep_results_to_csv
+
+        if args.output and args.output.endswith(".npz"):
+            raise SystemExit("The .npz output format requires --engine vectorized or auto.")
+        if args.output and not metrics and not args.checkpoint:
+            # Nothing needs the results afterwards, so stream them to disk
+            if args.index:
+                from .query import write_indexed_sweep
+                combo_count = write_indexed_sweep(sim, param_grid, factory, args.output,
+                                                  telemetry=telemetry)
+            else:
+                combo_count = run_pipelined_sweep(sim, param_grid, factory, args.output,
+                                                  telemetry=telemetry)
+        else:
+            results = sim.run_parameter_sweep(
+                param_grid, factory, metrics=metrics or None, discount_rate=args.discount_rate,
+                checkpoint=args.checkpoint, resume=not args.restart, telemetry=telemetry
+            )
+            if args.index:
+                from .query import write_indexed_sweep_results
+                write_indexed_sweep_results(results, param_grid, args.output)
+            elif args.output:
+                write_sweep_results_to_csv(results, args.output)
+            combo_count = len(results)
+
+    out.write(f"Swept {combo_count} combinations with the {engine} engine.\n")
+
+    if metrics:
+        from .metrics import rank_by
+
+        ranked_metric = metrics[0]
+        for model_name, values in sim.sweep_metrics.items():
+            if ranked_metric not in values or values[ranked_metric].ndim != 1:
+                continue
+            out.write(f"Top {args.top} combinations for {model_name} by {ranked_metric}:\n")
+            for index in rank_by(values[ranked_metric], k=args.top):
+                out.write(f"  {sim.sweep_combo_keys[index]}: {values[ranked_metric][index]:.4f}\n")
+    return 0
+
+
+def command_serve(args, out):
+    from .server import WhatIfService, create_server
+
+    scenario = _load_scenario(args)
+    sim = _build_simulator(args, scenario)
+    if scenario:
+        service = WhatIfService.from_scenario(
+            scenario, sim.simulation_period, sim.global_parameters, cache_size=args.cache_size
+        )
+    else:
+        factory = import_object(args.factory)
+        service = WhatIfService({factory({}).name: factory}, sim.simulation_period,
+                                sim.global_parameters, cache_size=args.cache_size)
+    server = create_server(service.warm_up(), args.host, args.port, verbose=args.verbose)
+    out.write(f"Serving {', '.join(service.factories)} on {server.url}\n")
+    out.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+def command_diff(args, out):
+    from .diff import diff_results
+
+    result = diff_results(args.first, args.second, rtol=args.rtol, atol=args.atol, worst=args.show)
+    for line in result.report():
+        out.write(line + "\n")
+    return 0 if result.equal else 1
+
+
+def _read_observed(path):
+    import csv
+
+    series = {"costs": [], "revenues": []}
+    with open(path, newline="") as handle:
+        for row in csv.DictReader(handle):
+            for name, values in series.items():
+                cell = (row.get(name) or "").strip()
+                values.append(float(cell) if cell else float("nan"))
+    return {name: values if any(v == v for v in values) else None
+            for name, values in series.items()}
+
+
+def _parse_bound(text):
+    low, sep, high = text.partition(":")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"Expected LOW:HIGH, got '{text}'")
+    return (float(low) if low.strip() else None, float(high) if high.strip() else None)
+
+
+def command_calibrate(args, out):
+    from .calibration import calibrate
+
+    scenario = _load_scenario(args)
+    factory = scenario.factory() if scenario else import_object(args.factory)
+    sim = _build_simulator(args, scenario)
+    observed = _read_observed(args.observed)
+    if observed["costs"] is None and observed["revenues"] is None:
+        raise SystemExit(f"{args.observed} has no costs or revenues values.")
+    steps = len(observed["costs"] or observed["revenues"])
+    if args.period is not None and args.period != steps:
+        raise SystemExit(f"--period {args.period} does not match the {steps} observed steps.")
+
+    try:
+        result = calibrate(
+            factory, _parse_assignments(args.fit, float), observed["costs"], observed["revenues"],
+            fixed=_parse_assignments(args.param, parse_value),
+            global_parameters=sim.global_parameters,
+            bounds=_parse_assignments(args.bound, _parse_bound),
+            max_evaluations=args.max_evaluations,
+        )
+    except ValueError as error:
+        raise SystemExit(str(error))
+    for name, value in result.parameters.items():
+        out.write(f"{name} = {value:.10g} (standard error {result.standard_errors[name]:.3g})\n")
+    status = "converged" if result.converged else "stopped before converging"
+    out.write(f"RMSE {result.rmse:.6g} after {result.evaluations} evaluations ({status}).\n")
+    return 0 if result.converged else 1
+
+
+def command_verify(args, out):
+    from .equivalence import ENGINES, run_harness
+
+    engines = _metric_names(args.engines) if args.engines else list(ENGINES)
+    unknown = [name for name in engines if name not in ENGINES]
+    if unknown:
+        raise SystemExit(f"Unknown engines {unknown}; expected any of {list(ENGINES)}.")
+    seeds = range(args.start, args.start + args.seeds)
+    failures = run_harness(seeds, engines, raise_on_mismatch=False)
+    for seed, report in failures.items():
+        for engine, mismatches in report.items():
+            out.write(f"seed {seed}: {engine} differs in {len(mismatches)} values, "
+                      f"first {mismatches[0]}\n")
+    out.write(f"Checked {len(seeds)} random scenarios against {', '.join(engines)}: "
+              f"{len(failures)} with differences.\n")
+    return 1 if failures else 0
+
+
+def main(argv=None, out=None):
+    """
+    Runs the command line interface and returns a process exit code.
+
+    :param argv: list of arguments (defaults to sys.argv[1:])
+    :param out: text stream for command output (defaults to sys.stdout)
+    """
+    args = build_parser().parse_args(argv)
+    out = out if out is not None else sys.stdout
+    if args.command == "run":
+        return command_run(args, out)
+    if args.command == "serve":
+        return command_serve(args, out)
+    if args.command == "diff":
+        return command_diff(args, out)
+    if args.command == "verify":
+        return command_verify(args, out)
+    if args.command == "calibrate":
+        return command_calibrate(args, out)
+    return command_sweep(args, out)
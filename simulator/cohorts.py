@@ -0,0 +1,201 @@
+# business_model_simulator/simulator/cohorts.py
+
+"""
+Cohort-based adoption: volumes from user_adoption_rate, churn and activity.
+
+Users join in cohorts, one per step. The step's adoption rate (the business
+model's user_adoption_rate, a number or a schedule) converts that share of
+the remaining potential market:
+
+    remaining[t] = (market_size - initial_users) * prod(1 - adoption_rate[s] for s < t)
+    new_users[t] = adoption_rate[t] * remaining[t]       (+ initial_users at t = 0)
+
+A cohort keeps retention[k] of its users at age k (by default
+(1 - churn_rate) ** k), and each retained user makes activity[op][k]
+transactions of an operation per step. No user is simulated individually.
+Every series is a causal convolution of the new users with a kernel over
+cohort age:
+
+    active_users[t] = sum over c <= t of new_users[c] * retention[t - c]
+    volume[op][t]   = sum over c <= t of new_users[c] * retention[t - c] * activity[op][t - c]
+
+cohort_convolve() evaluates this as a product with an upper-triangular
+(cohort x step) Toeplitz matrix, O(T^2), or through the FFT, O(T log T),
+from FFT_MIN_STEPS steps on. Leading axes (e.g. scenarios) are evaluated
+together.
+
+attach_cohorts() writes the volumes into the model's operations as
+base_transaction_volume schedules, so both engines pick them up.
+CohortFactory wraps a sweep factory so user_adoption_rate and the other
+parameters can be swept.
+"""
+
+import numpy as np
+
+from .parameters import ParameterResolver, check_no_growth
+from .schedules import ArraySchedule, compound_growth, is_schedule
+
+# Steps from which cohort_convolve switches from the triangular matrix to the FFT
+FFT_MIN_STEPS = 256
+
+
+def _over_age(value, simulation_period, what):
+    values = np.asarray(value, dtype=np.float64)
+    if values.ndim == 0:
+        return np.full(simulation_period, float(values))
+    values = values.reshape(-1)[:simulation_period]
+    if values.shape[0] < simulation_period:
+        # Ages beyond the given values keep the last one
+        values = np.concatenate([values, np.full(simulation_period - values.shape[0],
+                                                 values[-1] if values.size else 0.0)])
+    if (values < 0).any():
+        raise ValueError(f"{what} must be non-negative")
+    return values
+
+
+def cohort_convolve(new_users, kernel):
+    """
+    Returns result[..., t] = sum over c <= t of new_users[..., c] * kernel[t - c]
+    for new_users of shape (..., steps) and a kernel over cohort age.
+    """
+    new_users = np.asarray(new_users, dtype=np.float64)
+    steps = new_users.shape[-1]
+    kernel = _over_age(kernel, steps, "Cohort kernels")
+    if steps >= FFT_MIN_STEPS:
+        size = 1 << (2 * steps - 1).bit_length()
+        spectrum = np.fft.rfft(new_users, size, axis=-1) * np.fft.rfft(kernel, size)
+        # Inputs are non-negative; drop the FFT's rounding below zero
+        return np.maximum(np.fft.irfft(spectrum, size, axis=-1)[..., :steps], 0.0)
+    lags = np.arange(steps)[None, :] - np.arange(steps)[:, None]
+    matrix = np.where(lags >= 0, kernel[np.maximum(lags, 0)], 0.0)
+    return new_users @ matrix
+
+
+class CohortVolumes:
+    """
+    Outcome of CohortModel.evaluate; arrays shaped (..., steps).
+
+    Attributes:
+      - new_users: users joining at each step
+      - active_users: retained users at each step
+      - volumes: dict of operation name -> transactions at each step
+    """
+
+    def __init__(self, new_users, active_users, volumes):
+        self.new_users = new_users
+        self.active_users = active_users
+        self.volumes = volumes
+
+
+class CohortModel:
+    """
+    Adoption, retention and per-operation activity of user cohorts.
+    """
+
+    def __init__(self, market_size, churn_rate=0.0, retention=None, activity=None,
+                 default_activity=1.0, initial_users=0.0, adoption_key="user_adoption_rate"):
+        """
+        :param market_size: float, users who could ever adopt
+        :param churn_rate: float (or sequence over cohort age) of the share of
+            a cohort's users lost per step
+        :param retention: optional sequence over cohort age of the share of a
+            cohort still active (retention[0] is normally 1); replaces churn_rate
+        :param activity: optional dict of operation name -> transactions per
+            retained user per step, a float or a sequence over cohort age
+        :param default_activity: float, activity of operations not in activity
+        :param initial_users: float, users present at step 0
+        :param adoption_key: business model parameter holding the adoption rate
+        """
+        if initial_users > market_size:
+            raise ValueError("initial_users cannot exceed market_size")
+        self.market_size = float(market_size)
+        self.churn_rate = churn_rate
+        self.retention = retention
+        self.activity = activity if activity else {}
+        self.default_activity = default_activity
+        self.initial_users = float(initial_users)
+        self.adoption_key = adoption_key
+
+    def retention_curve(self, simulation_period):
+        """
+        Returns the share of a cohort retained at each age.
+        """
+        if self.retention is not None:
+            return _over_age(self.retention, simulation_period, "Retention")
+        churn = _over_age(self.churn_rate, simulation_period, "churn_rate")
+        if (churn > 1).any():
+            raise ValueError("churn_rate must not exceed 1")
+        return compound_growth(-churn)
+
+    def evaluate(self, adoption_rate, simulation_period, operations=None):
+        """
+        Computes new users, active users and operation volumes.
+
+        :param adoption_rate: float, Schedule, or array broadcasting to
+            (..., simulation_period), e.g. one row per scenario
+        :param operations: optional operation names (default: those in activity)
+        :return: CohortVolumes
+        """
+        if is_schedule(adoption_rate):
+            adoption_rate = adoption_rate.materialize(simulation_period)
+        rates = np.asarray(adoption_rate, dtype=np.float64)
+        if rates.ndim == 0 or rates.shape[-1] == 1:
+            rates = np.broadcast_to(rates, rates.shape[:-1] + (simulation_period,))
+        if rates.shape[-1] != simulation_period:
+            raise ValueError("adoption_rate must have one value per step")
+        if ((rates < 0) | (rates > 1)).any():
+            raise ValueError("adoption_rate must lie in [0, 1]")
+
+        remaining = (self.market_size - self.initial_users) * compound_growth(-rates)
+        new_users = rates * remaining
+        new_users[..., 0] += self.initial_users
+
+        retention = self.retention_curve(simulation_period)
+        volumes = {}
+        for name in (self.activity if operations is None else operations):
+            rate = self.activity.get(name, self.default_activity)
+            volumes[name] = cohort_convolve(
+                new_users, retention * _over_age(rate, simulation_period, "Activity rates"))
+        return CohortVolumes(new_users, cohort_convolve(new_users, retention), volumes)
+
+
+def attach_cohorts(business_model, cohorts, simulation_period, global_parameters=None):
+    """
+    Evaluates cohorts with the model's adoption rate (cohorts.adoption_key,
+    as the model resolves it) and sets every operation's
+    base_transaction_volume to an ArraySchedule of its cohort volume.
+
+    :return: CohortVolumes
+    :raises ValueError: if the model has no adoption rate, or a non-zero
+        growth_rate that would compound the cohort volumes
+    """
+    resolved = ParameterResolver().resolve(business_model, global_parameters)
+    check_no_growth(resolved, simulation_period, "cohort volumes")
+    if cohorts.adoption_key not in resolved.parameters:
+        raise ValueError(f"Business model '{business_model.name}' has no "
+                         f"'{cohorts.adoption_key}' parameter")
+    operations = business_model.transaction_model.operations
+    outcome = cohorts.evaluate(resolved.parameters[cohorts.adoption_key], simulation_period,
+                               [op.name for op in operations])
+    for op in operations:
+        op.parameters["base_transaction_volume"] = ArraySchedule(outcome.volumes[op.name])
+    return outcome
+
+
+class CohortFactory:
+    """
+    Picklable sweep factory that builds a model with factory(combo_params)
+    and attaches cohort volumes to it.
+    """
+
+    def __init__(self, factory, cohorts, simulation_period, global_parameters=None):
+        self.factory = factory
+        self.cohorts = cohorts
+        self.simulation_period = simulation_period
+        self.global_parameters = global_parameters
+
+    def __call__(self, combo_params=None):
+        business_model = self.factory(combo_params or {})
+        attach_cohorts(business_model, self.cohorts, self.simulation_period,
+                       self.global_parameters)
+        return business_model
@@ -0,0 +1,197 @@
+# business_model_simulator/simulator/diff.py
+
+"""
+Vectorized comparison of two sweep result files.
+
+load_results() reads a sweep written as step rows (.csv, including indexed
+output) or as arrays (.npz) into (combinations x steps) cost and revenue
+arrays keyed by (combo_key, business_model). diff_results() aligns two such
+tables by key and compares every value at once, reporting rows missing from
+either side, the largest absolute and relative differences and the worst
+offending values. `python -m simulator diff A B` runs it from the command
+line, e.g. to compare an engine's output with the reference engine's.
+"""
+
+import csv
+
+import numpy as np
+
+from .vectorized import combo_key
+
+
+class ResultTable:
+    """
+    Sweep results as (rows x steps) arrays, one row per (combo_key,
+    business_model) key. Steps a file does not contain are NaN.
+    """
+
+    def __init__(self, keys, costs, revenues):
+        """
+        :param keys: list of (combo_key, business_model) tuples, one per row
+        :param costs: float64 array (rows x steps)
+        :param revenues: float64 array (rows x steps)
+        """
+        self.keys = list(keys)
+        self.costs = costs
+        self.revenues = revenues
+
+
+def _load_csv(path):
+    positions = {}
+    rows, steps, costs, revenues = [], [], [], []
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        key_col, name_col = header.index("combo_key"), header.index("business_model")
+        step_col, cost_col, revenue_col = (header.index(c) for c in ("step", "costs", "revenues"))
+        for record in reader:
+            key = (record[key_col], record[name_col])
+            rows.append(positions.setdefault(key, len(positions)))
+            steps.append(record[step_col])
+            costs.append(record[cost_col])
+            revenues.append(record[revenue_col])
+
+    rows = np.array(rows, dtype=np.intp)
+    steps = np.array(steps, dtype=np.intp)
+    shape = (len(positions), int(steps.max()) + 1 if steps.size else 0)
+    table = ResultTable(list(positions), np.full(shape, np.nan), np.full(shape, np.nan))
+    table.costs[rows, steps] = np.array(costs, dtype=np.float64)
+    table.revenues[rows, steps] = np.array(revenues, dtype=np.float64)
+    return table
+
+
+def _load_npz(path):
+    with np.load(path) as data:
+        if "combo_keys" in data.files:
+            keys = list(zip(data["combo_keys"].tolist(), data["model_names"].tolist()))
+            return ResultTable(keys, data["costs"].astype(np.float64),
+                               data["revenues"].astype(np.float64))
+        param_names = [name[len("param_"):] for name in data.files if name.startswith("param_")]
+        columns = [data[f"param_{name}"].tolist() for name in param_names]
+        keys = [
+            (combo_key(param_names, combo), name)
+            for combo, name in zip(zip(*columns), data["model_names"].tolist())
+        ]
+        return ResultTable(keys, data["costs"].astype(np.float64), data["revenues"].astype(np.float64))
+
+
+def load_results(path):
+    """
+    Loads a sweep result file (.csv step rows or .npz arrays) as a ResultTable.
+    Keys of .npz files are read from their combo_keys array, or rebuilt from
+    their param_<name> columns for files written without one.
+    """
+    if path.endswith(".npz"):
+        return _load_npz(path)
+    return _load_csv(path)
+
+
+class ResultDiff:
+    """
+    Outcome of diff_results.
+
+    Attributes:
+      - compared: int, number of values compared
+      - mismatches: int, values outside the tolerance
+      - max_abs, max_rel: largest absolute and relative differences
+      - only_in_a, only_in_b: keys present in one table only
+      - step_counts: (steps in a, steps in b)
+      - worst: list of (output, combo_key, business_model, step, a, b),
+        largest absolute difference first
+    """
+
+    def __init__(self, compared, mismatches, max_abs, max_rel, only_in_a, only_in_b,
+                 step_counts, worst):
+        self.compared = compared
+        self.mismatches = mismatches
+        self.max_abs = max_abs
+        self.max_rel = max_rel
+        self.only_in_a = only_in_a
+        self.only_in_b = only_in_b
+        self.step_counts = step_counts
+        self.worst = worst
+
+    @property
+    def equal(self):
+        return (not self.mismatches and not self.only_in_a and not self.only_in_b
+                and self.step_counts[0] == self.step_counts[1])
+
+    def report(self):
+        """
+        Returns a human-readable summary as a list of lines.
+        """
+        lines = [
+            f"Compared {self.compared} values: {self.mismatches} outside tolerance, "
+            f"max abs diff {self.max_abs:.6g}, max rel diff {self.max_rel:.6g}."
+        ]
+        if self.step_counts[0] != self.step_counts[1]:
+            lines.append(f"Step counts differ: {self.step_counts[0]} vs {self.step_counts[1]}.")
+        for side, keys in (("first", self.only_in_a), ("second", self.only_in_b)):
+            if keys:
+                lines.append(f"{len(keys)} rows only in the {side} file, e.g. {keys[0]}.")
+        for output, key, name, step, a, b in self.worst:
+            lines.append(f"  {output} {key} ({name}) step {step}: {a!r} vs {b!r}")
+        return lines
+
+
+def diff_results(a, b, rtol=1e-9, atol=1e-9, worst=10):
+    """
+    Compares two ResultTables (or paths of result files).
+
+    :param rtol: float, relative tolerance (as numpy.isclose, relative to b)
+    :param atol: float, absolute tolerance
+    :param worst: int, number of largest differences listed
+    :return: ResultDiff
+    """
+    if isinstance(a, str):
+        a = load_results(a)
+    if isinstance(b, str):
+        b = load_results(b)
+
+    index_b = {key: i for i, key in enumerate(b.keys)}
+    common = [(i, index_b[key]) for i, key in enumerate(a.keys) if key in index_b]
+    keys_a = set(a.keys)
+    only_in_a = [key for key in a.keys if key not in index_b]
+    only_in_b = [key for key in b.keys if key not in keys_a]
+
+    rows_a = np.array([i for i, _ in common], dtype=np.intp)
+    rows_b = np.array([j for _, j in common], dtype=np.intp)
+    steps = min(a.costs.shape[1], b.costs.shape[1])
+
+    # (outputs x rows x steps) stacks, compared in one pass
+    values_a = np.stack([a.costs[rows_a, :steps], a.revenues[rows_a, :steps]])
+    values_b = np.stack([b.costs[rows_b, :steps], b.revenues[rows_b, :steps]])
+    bad = ~np.isclose(values_a, values_b, rtol=rtol, atol=atol, equal_nan=True)
+    with np.errstate(invalid="ignore"):
+        difference = np.abs(values_a - values_b)
+        scale = np.maximum(np.abs(values_a), np.abs(values_b))
+        relative = np.divide(difference, scale, out=np.zeros_like(difference), where=scale > 0)
+    # NaN on one side only counts as the largest difference
+    difference = np.where(bad & np.isnan(difference), np.inf, np.nan_to_num(difference))
+    relative = np.where(bad & np.isnan(relative), np.inf, np.nan_to_num(relative))
+
+    worst_entries = []
+    flat = difference.ravel()
+    if worst and flat.size:
+        count = min(worst, flat.size)
+        top = np.argpartition(-flat, count - 1)[:count]
+        top = top[np.argsort(-flat[top], kind="stable")]
+        for position in top:
+            if not bad.ravel()[position]:
+                continue
+            output, row, step = np.unravel_index(position, difference.shape)
+            key = a.keys[rows_a[row]]
+            worst_entries.append((("costs", "revenues")[output], key[0], key[1], int(step),
+                                  float(values_a[output, row, step]),
+                                  float(values_b[output, row, step])))
+
+    return ResultDiff(
+        compared=int(bad.size),
+        mismatches=int(bad.sum()),
+        max_abs=float(difference.max()) if difference.size else 0.0,
+        max_rel=float(relative.max()) if relative.size else 0.0,
+        only_in_a=only_in_a,
+        only_in_b=only_in_b,
+        step_counts=(a.costs.shape[1], b.costs.shape[1]),
+        worst=worst_entries,
+    )
@@ -0,0 +1,207 @@
+# business_model_simulator/simulator/distribution.py
+
+"""
+Pro-rata profit distribution to data owners.
+
+DistributionLedger keeps one contribution weight, one unpaid balance and
+one paid total per owner as float64 arrays. Each step's distributable
+amount (e.g. DataPurchase revenue) is split pro-rata to the weights with a
+single multiply-add over all owners. Balances that reach min_payout are
+paid out in place and counted as transfers. Contributions are accumulated
+with np.bincount, and payouts can be rolled up per group the same way.
+
+Nothing here loops over owners in Python. One step for 10^7 owners is a
+handful of passes over 80 MB arrays, about 0.1-0.2 s on a laptop.
+
+attach_distribution() connects a ledger to a business model. It computes
+the source operation's revenue for every step, runs the ledger over it, and
+gives the target ProfitDistributionOperation the per-step transfer counts as
+an ArraySchedule ("transfer_count"). The operation charges cost_per_transfer
+for each transfer, so distribution costs appear in the simulation's costs
+with either engine.
+"""
+
+import numpy as np
+
+from .parameters import ParameterResolver
+from .schedules import ArraySchedule
+from .simulator import iter_model_steps
+
+
+class DistributionRecord:
+    """
+    Per-step outcome of DistributionLedger.run; every attribute is a float64
+    array over steps.
+
+    Attributes:
+      - amounts: amount distributed at each step
+      - paid: amount transferred to owners at each step
+      - transfers: number of owner transfers at each step
+      - held: total unpaid balance after each step
+    """
+
+    def __init__(self, amounts, paid, transfers, held):
+        self.amounts = amounts
+        self.paid = paid
+        self.transfers = transfers
+        self.held = held
+
+
+class DistributionLedger:
+    """
+    Contribution weights, unpaid balances and paid totals for every data owner.
+    """
+
+    def __init__(self, weights, min_payout=0.0):
+        """
+        :param weights: sequence of non-negative contribution weights, one per owner
+        :param min_payout: float, smallest balance paid out; smaller balances
+            are carried to later steps
+        """
+        self.weights = np.array(weights, dtype=np.float64).reshape(-1)
+        if (self.weights < 0).any():
+            raise ValueError("Contribution weights must be non-negative")
+        self.min_payout = float(min_payout)
+        self.balances = np.zeros_like(self.weights)
+        self.paid = np.zeros_like(self.weights)
+        # Amounts offered while no owner had a positive weight
+        self.undistributed = 0.0
+        # Scratch buffers reused by every step
+        self._shares = np.empty_like(self.weights)
+        self._due = np.empty(self.weights.shape, dtype=bool)
+
+    @classmethod
+    def from_contributions(cls, owners, amounts=None, owner_count=None, min_payout=0.0):
+        """
+        Builds a ledger from contribution events.
+
+        :param owners: int array of owner indices, one per contribution
+        :param amounts: optional array of contribution sizes (default: 1 each)
+        :param owner_count: int, number of owners (default: max(owners) + 1)
+        """
+        ledger = cls(np.zeros(owner_count or 0), min_payout=min_payout)
+        ledger.add_contributions(owners, amounts)
+        return ledger
+
+    @property
+    def owner_count(self):
+        return self.weights.shape[0]
+
+    def add_contributions(self, owners, amounts=None):
+        """
+        Adds contribution events to the owners' weights, growing the ledger if
+        an owner index is beyond the current owner count.
+        """
+        owners = np.asarray(owners, dtype=np.intp)
+        added = np.bincount(owners, weights=amounts, minlength=self.owner_count)
+        if added.shape[0] > self.owner_count:
+            grow = added.shape[0] - self.owner_count
+            self.weights = np.concatenate([self.weights, np.zeros(grow)])
+            self.balances = np.concatenate([self.balances, np.zeros(grow)])
+            self.paid = np.concatenate([self.paid, np.zeros(grow)])
+            self._shares = np.empty_like(self.weights)
+            self._due = np.empty(self.weights.shape, dtype=bool)
+        self.weights += added
+
+    def distribute(self, amount):
+        """
+        Splits amount pro-rata to the weights and pays out every balance that
+        reached min_payout. While no owner has a positive weight, amount is
+        added to self.undistributed instead.
+
+        :return: (transfers, paid), the number of owners paid and the total paid
+        """
+        total_weight = self.weights.sum()
+        if total_weight > 0.0 and amount:
+            np.multiply(self.weights, amount / total_weight, out=self._shares)
+            self.balances += self._shares
+        elif not total_weight > 0.0:
+            self.undistributed += amount
+            return 0, 0.0
+
+        due = np.greater_equal(self.balances, self.min_payout, out=self._due)
+        if self.min_payout <= 0.0:
+            # Zero balances are not transfers
+            due &= self.balances > 0.0
+        transfers = int(np.count_nonzero(due))
+        if not transfers:
+            return 0, 0.0
+        paid = float(self.balances.sum(where=due))
+        np.add(self.paid, self.balances, out=self.paid, where=due)
+        np.copyto(self.balances, 0.0, where=due)
+        return transfers, paid
+
+    def run(self, amounts):
+        """
+        Distributes one amount per step.
+
+        :param amounts: sequence of floats, the distributable amount for each step
+        :return: DistributionRecord
+        """
+        amounts = np.array(amounts, dtype=np.float64).reshape(-1)
+        paid = np.zeros_like(amounts)
+        transfers = np.zeros_like(amounts)
+        held = np.zeros_like(amounts)
+        for step, amount in enumerate(amounts.tolist()):
+            transfers[step], paid[step] = self.distribute(amount)
+            held[step] = self.balances.sum()
+        return DistributionRecord(amounts, paid, transfers, held)
+
+    def payouts_by(self, groups, group_count=None):
+        """
+        Totals the paid amounts per group, e.g. per region or owner tier.
+
+        :param groups: int array assigning each owner to a group
+        :param group_count: int, number of groups (default: max(groups) + 1)
+        :return: float64 array of totals per group
+        """
+        return np.bincount(np.asarray(groups, dtype=np.intp), weights=self.paid,
+                           minlength=group_count or 0)
+
+
+def _find_operation(operations, name):
+    for index, op in enumerate(operations):
+        if op.name == name:
+            return index, op
+    raise ValueError(f"No operation named '{name}'")
+
+
+def operation_revenue_series(business_model, operation_name, simulation_period,
+                             global_parameters=None):
+    """
+    Returns one operation's revenue for every step as a float64 array,
+    stepping the model like the reference engine (schedules and growth
+    included) without running the rest of the simulation.
+    """
+    resolved = ParameterResolver().resolve(business_model, global_parameters)
+    index, _ = _find_operation(resolved.operations, operation_name)
+
+    revenues = np.empty(simulation_period, dtype=np.float64)
+    for step, tx_model in iter_model_steps(resolved, simulation_period):
+        revenues[step] = tx_model.operations[index].compute_revenue()
+    return revenues
+
+
+def attach_distribution(business_model, ledger, simulation_period, source="DataPurchase",
+                        target="ProfitDistribution", revenue_share=1.0, global_parameters=None):
+    """
+    Distributes revenue_share of the source operation's revenue through ledger
+    for every step. The per-step transfer counts are stored on the target
+    operation as its "transfer_count" schedule, so its cost_per_transfer is
+    charged for each transfer.
+
+    Call it from a sweep factory after building the model. The ledger is
+    advanced by simulation_period steps; pass a fresh ledger for each model.
+
+    :param business_model: BusinessModel holding both operations
+    :param ledger: DistributionLedger
+    :param revenue_share: float, fraction of the source revenue distributed
+    :return: DistributionRecord
+    """
+    amounts = revenue_share * operation_revenue_series(
+        business_model, source, simulation_period, global_parameters
+    )
+    record = ledger.run(amounts)
+    _, operation = _find_operation(business_model.transaction_model.operations, target)
+    operation.parameters["transfer_count"] = ArraySchedule(record.transfers)
+    return record
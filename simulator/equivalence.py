@@ -0,0 +1,313 @@
+# business_model_simulator/simulator/equivalence.py
+
+"""
+Differential testing of the fast engines against the reference engine.
+
+random_scenario() generates a randomised scenario document: operations drawn
+from the base Operation and the shipped subclasses (including the cdip
+operations' custom cost/revenue rules), optional schedules, business model
+overhead adjustments, overhead/tax rates on either side of the "> 0"
+thresholds in TransactionModel, and a sweep grid over transaction, business
+model and operation parameters.
+
+check_scenario() sweeps one document with Simulator.run_parameter_sweep (the
+reference) and with each fast engine in ENGINES, and reports every value
+that differs by more than the engine's tolerance. run_harness() does this
+over many seeds; `python -m simulator verify --seeds 200` runs it from the
+command line. check_sweep() and assert_sweep_equivalent() do the same for
+any grid and factory.
+"""
+
+import random
+
+import numpy as np
+
+from .scenario import compile_scenario
+from .simulator import Simulator
+from .utils import import_object
+from .vectorized import ERROR_BOUNDS
+
+# Operation classes drawn by random_scenario, with the extra parameters
+# their custom rules read. None is the base Operation.
+OPERATION_CLASSES = {
+    None: (),
+    "example.example_operation.RegistrationOperation": ("kyc_fee",),
+    "cdip.registration_operation.RegistrationOperation": ("administrative_cost",),
+    "cdip.preference_setting_operation.PreferenceSettingOperation": (),
+    "cdip.data_exploration_operation.DataExplorationOperation": ("data_access_cost",),
+    "cdip.data_purchase_opertation.DataPurchaseOperation": ("licensing_fees", "purchase_overhead"),
+    "cdip.profit_distribution_operation.ProfitDistributionOperation": (
+        "distribution_admin_cost", "cost_per_transfer", "transfer_count",
+    ),
+    "cdip.audit_operation.AuditOperation": ("legal_cost",),
+    "cdip.governance_operation.GovernanceOperation": (
+        "governance_cost", "cost_per_proposal", "proposal_count", "cost_per_vote", "vote_count",
+    ),
+}
+
+BASE_OPERATION_PARAMETERS = (
+    "base_transaction_volume", "direct_cost", "variable_cost", "base_revenue", "revenue_per_unit",
+    "gas_per_transaction", "gas_price",
+)
+
+COMPLEXITIES = ("High", "Medium", "Low", None)
+
+# Relative tolerance per engine (values are also compared with DEFAULT_ATOL)
+DEFAULT_RTOL = 1e-9
+DEFAULT_ATOL = 1e-9
+ENGINE_RTOL = {"float32": ERROR_BOUNDS["float32"]}
+
+
+class EquivalenceError(AssertionError):
+    """
+    Raised by run_harness when a fast engine disagrees with the reference.
+    """
+
+
+def _available_classes():
+    available = []
+    for path in OPERATION_CLASSES:
+        try:
+            if path is not None:
+                import_object(path)
+        except ImportError:
+            continue
+        available.append(path)
+    return available
+
+
+def _random_value(rng, simulation_period, low, high, schedule_probability=0.2):
+    value = round(rng.uniform(low, high), 4)
+    if rng.random() >= schedule_probability or simulation_period < 2:
+        return value
+    kind = rng.choice(("piecewise", "interpolated", "array"))
+    if kind == "array":
+        return {"schedule": "array",
+                "values": [round(rng.uniform(low, high), 4) for _ in range(simulation_period)]}
+    steps = sorted(rng.sample(range(simulation_period), min(3, simulation_period)))
+    points = {str(step): round(rng.uniform(low, high), 4) for step in steps}
+    if kind == "piecewise":
+        return {"schedule": "piecewise", "breakpoints": points}
+    return {"schedule": "interpolated", "points": points}
+
+
+def random_scenario(seed, max_operations=5, max_axes=3, max_axis_values=3, max_period=16):
+    """
+    Returns a random scenario document (see simulator.scenario) with a sweep
+    grid. The same seed always gives the same document.
+    """
+    rng = random.Random(seed)
+    simulation_period = rng.randint(1, max_period)
+    classes = _available_classes()
+
+    operations = []
+    for index in range(rng.randint(1, max_operations)):
+        path = rng.choice(classes)
+        keys = list(BASE_OPERATION_PARAMETERS) + list(OPERATION_CLASSES[path])
+        parameters = {
+            key: _random_value(rng, simulation_period, 0.0, 50.0 if key != "variable_cost" else 2.0)
+            for key in rng.sample(keys, rng.randint(0, len(keys)))
+        }
+        operation = {"name": f"Op{index}", "parameters": parameters,
+                     "contract_complexity": rng.choice(COMPLEXITIES)}
+        if path is not None:
+            operation["class"] = path
+        operations.append(operation)
+
+    tm_parameters = {}
+    if rng.random() < 0.8:
+        tm_parameters["growth_rate"] = _random_value(rng, simulation_period, -0.1, 0.3)
+    for key, low, high in (("overhead_rate", -0.05, 0.2), ("revenue_tax_rate", -0.05, 0.3),
+                           ("revenue_factor", 0.5, 1.5)):
+        if rng.random() < 0.6:
+            tm_parameters[key] = _random_value(rng, simulation_period, low, high, 0.1)
+
+    bm_parameters = {}
+    for key in ("cost_scaling_factor", "legal_compliance_fee"):
+        if rng.random() < 0.3:
+            bm_parameters[key] = round(rng.uniform(0.0, 0.1), 4)
+
+    # Sweep axes: transaction-level rates, business model adjustments and
+    # operation parameters
+    candidates = ["growth_rate", "overhead_rate", "revenue_tax_rate", "revenue_factor",
+                  "business_model.legal_compliance_fee"]
+    for operation in operations:
+        keys = list(BASE_OPERATION_PARAMETERS) + list(OPERATION_CLASSES[operation.get("class")])
+        candidates.extend(f"{operation['name']}.{key}" for key in keys)
+    grid = {}
+    for axis in rng.sample(candidates, rng.randint(1, max_axes)):
+        low, high = (-0.05, 0.3) if "." not in axis or axis.startswith("business_model") else (0.0, 40.0)
+        grid[axis] = sorted({round(rng.uniform(low, high), 4)
+                             for _ in range(rng.randint(1, max_axis_values))})
+
+    return {
+        "simulation_period": simulation_period,
+        "global_parameters": {"base_gas_price": round(rng.uniform(0.0, 1.0), 4)},
+        "business_models": [{
+            "name": f"Random{seed}",
+            "parameters": bm_parameters,
+            "transaction_model": {"parameters": tm_parameters, "operations": operations},
+        }],
+        "sweep": {"grid": grid},
+    }
+
+
+def _sweep_arrays(arrays):
+    return list(arrays.model_names), np.array(arrays.costs, dtype=np.float64), \
+        np.array(arrays.revenues, dtype=np.float64)
+
+
+def _vectorized(param_grid, factory, simulation_period, global_parameters):
+    from .vectorized import run_vectorized_sweep
+    return _sweep_arrays(run_vectorized_sweep(param_grid, factory, simulation_period, global_parameters))
+
+
+def _float32(param_grid, factory, simulation_period, global_parameters):
+    from .vectorized import run_vectorized_sweep
+    return _sweep_arrays(run_vectorized_sweep(param_grid, factory, simulation_period,
+                                              global_parameters, dtype="float32"))
+
+
+def _reduced(param_grid, factory, simulation_period, global_parameters):
+    from .vectorized import run_vectorized_sweep
+    return _sweep_arrays(run_vectorized_sweep(param_grid, factory, simulation_period,
+                                              global_parameters, reduce_axes=True))
+
+
+def _chunked(param_grid, factory, simulation_period, global_parameters):
+    from .vectorized import iter_vectorized_sweep
+    names, costs, revenues = [], [], []
+    for chunk in iter_vectorized_sweep(param_grid, factory, simulation_period, global_parameters,
+                                       chunk_size=2):
+        names.extend(chunk.model_names)
+        costs.append(chunk.costs)
+        revenues.append(chunk.revenues)
+    return names, np.concatenate(costs), np.concatenate(revenues)
+
+
+def _parallel(param_grid, factory, simulation_period, global_parameters):
+    from .parallel import run_parallel_sweep
+    with run_parallel_sweep(param_grid, factory, simulation_period, global_parameters,
+                            workers=2, engine="vectorized") as arrays:
+        return _sweep_arrays(arrays)
+
+
+# Fast engines checked against the reference: name -> callable(param_grid,
+# factory, simulation_period, global_parameters) returning (model_names,
+# costs, revenues) in grid order
+ENGINES = {
+    "vectorized": _vectorized,
+    "float32": _float32,
+    "reduced": _reduced,
+    "chunked": _chunked,
+    "parallel": _parallel,
+}
+
+
+def reference_sweep(param_grid, factory, simulation_period, global_parameters):
+    """
+    Runs the reference engine and returns (model_names, costs, revenues) in
+    grid order, like the ENGINES callables.
+    """
+    results = Simulator(simulation_period, global_parameters).run_parameter_sweep(param_grid, factory)
+    names, costs, revenues = [], [], []
+    for run_results in results.values():
+        ((name, records),) = run_results.items()
+        names.append(name)
+        costs.append([r["costs"] for r in records])
+        revenues.append([r["revenues"] for r in records])
+    shape = (len(names), simulation_period)
+    return (names, np.array(costs, dtype=np.float64).reshape(shape),
+            np.array(revenues, dtype=np.float64).reshape(shape))
+
+
+def compare_series(reference, candidate, rtol=DEFAULT_RTOL, atol=DEFAULT_ATOL):
+    """
+    Compares (model_names, costs, revenues) triples and returns a list of
+    mismatch descriptions: (output, combination, step, expected, actual).
+    """
+    ref_names, *ref_series = reference
+    names, *series = candidate
+    mismatches = []
+    if list(ref_names) != list(names):
+        mismatches.append(("business_model", None, None, list(ref_names), list(names)))
+    for output, expected, actual in zip(("costs", "revenues"), ref_series, series):
+        if expected.shape != actual.shape:
+            mismatches.append((output, None, None, expected.shape, actual.shape))
+            continue
+        bad = ~np.isclose(actual, expected, rtol=rtol, atol=atol, equal_nan=True)
+        for combo, step in zip(*np.nonzero(bad)):
+            mismatches.append((output, int(combo), int(step),
+                               float(expected[combo, step]), float(actual[combo, step])))
+    return mismatches
+
+
+def check_sweep(param_grid, factory, simulation_period, global_parameters=None, engines=None):
+    """
+    Sweeps param_grid with the reference engine and each fast engine.
+
+    :param engines: iterable of ENGINES names (default: all)
+    :return: (reference, report): the reference (model_names, costs, revenues)
+        and a dict of engine name -> list of mismatches (see compare_series)
+    """
+    args = (param_grid, factory, simulation_period, global_parameters)
+    reference = reference_sweep(*args)
+    report = {}
+    for name in engines or ENGINES:
+        report[name] = compare_series(reference, ENGINES[name](*args),
+                                      rtol=ENGINE_RTOL.get(name, DEFAULT_RTOL))
+    return reference, report
+
+
+def assert_sweep_equivalent(param_grid, factory, simulation_period, global_parameters=None,
+                            engines=None):
+    """
+    Like check_sweep, but raises on any disagreement; for tests of models
+    built by subsystems (catalogs, chains, cohorts, ...).
+
+    :return: the reference (model_names, costs, revenues)
+    :raises EquivalenceError: if an engine disagrees with the reference
+    """
+    reference, report = check_sweep(param_grid, factory, simulation_period, global_parameters,
+                                    engines)
+    for engine, found in report.items():
+        if found:
+            raise EquivalenceError(f"Engine '{engine}' disagrees with the reference: "
+                                   f"{len(found)} values, first {found[0]}")
+    return reference
+
+
+def check_scenario(document, engines=None):
+    """
+    Sweeps a scenario document with the reference engine and each fast engine.
+
+    :param engines: iterable of ENGINES names (default: all)
+    :return: dict of engine name -> list of mismatches (see compare_series)
+    """
+    scenario = compile_scenario(document)
+    return check_sweep(scenario.param_grid, scenario.factory(), scenario.simulation_period,
+                       dict(scenario.global_parameters), engines)[1]
+
+
+def run_harness(seeds, engines=None, raise_on_mismatch=True):
+    """
+    Checks random_scenario(seed) for every seed.
+
+    :param seeds: iterable of ints
+    :param engines: iterable of ENGINES names (default: all)
+    :return: dict of seed -> {engine: mismatches} for the seeds that disagreed
+    :raises EquivalenceError: on the first disagreement, if raise_on_mismatch
+    """
+    failures = {}
+    for seed in seeds:
+        report = {name: found for name, found in check_scenario(random_scenario(seed), engines).items()
+                  if found}
+        if report and raise_on_mismatch:
+            engine, found = next(iter(report.items()))
+            raise EquivalenceError(
+                f"Engine '{engine}' disagrees with the reference for random_scenario({seed}): "
+                f"{len(found)} values, first {found[0]}"
+            )
+        if report:
+            failures[seed] = report
+    return failures
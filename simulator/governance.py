@@ -0,0 +1,247 @@
+# business_model_simulator/simulator/governance.py
+
+"""
+Token-weighted governance: proposals, turnout, quorum and outcomes.
+
+HolderPopulation keeps every holder's token balance, turnout probability
+(chance of voting on a proposal) and support probability (chance of voting
+for it, given a vote) as arrays. simulate_governance() draws a Poisson
+number of proposals per step and the votes on each of them. A proposal
+passes when the tokens voting reach `quorum` of the supply and the tokens
+voting for it reach `approval_threshold` of the tokens voting.
+
+Votes are sampled without a Python loop over holders or proposals:
+
+  - method="exact" draws one uniform per holder and proposal, in blocks of
+    proposals sized to EXACT_BLOCK_CELLS, and reduces each block with a
+    matrix-vector product against the balances.
+  - method="approximate" (default) samples the `whales` largest holders
+    exactly and replaces everyone else by the bivariate normal distribution
+    of their total (for, against) weight. Its mean and covariance are
+    computed once, so each extra proposal costs O(whales). Token
+    distributions are heavy-tailed, so the largest holders, where a normal
+    approximation would be poor, are the ones sampled exactly.
+
+attach_governance() feeds an outcome back into a model: the Governance
+operation is charged cost_per_proposal and cost_per_vote through its
+proposal_count and vote_count schedules, and passed proposals can move
+other parameters (e.g. fees) from the following step onwards.
+"""
+
+import numpy as np
+
+from .parameters import ParameterResolver
+from .schedules import ArraySchedule, is_schedule, materialize_value
+
+# Uniform draws per block of the exact method (float32, 64 MB)
+EXACT_BLOCK_CELLS = 1 << 24
+
+SAMPLING_METHODS = ("approximate", "exact")
+
+
+class HolderPopulation:
+    """
+    Token holders with their balances, turnout and support probabilities.
+    """
+
+    def __init__(self, balances, turnout, support=0.5):
+        """
+        :param balances: sequence of non-negative token balances, one per holder
+        :param turnout: probability each holder votes on a proposal (array or float)
+        :param support: probability a voting holder votes for (array or float)
+        """
+        self.balances = np.array(balances, dtype=np.float64).reshape(-1)
+        shape = self.balances.shape
+        self.turnout = np.broadcast_to(np.asarray(turnout, dtype=np.float64), shape).copy()
+        self.support = np.broadcast_to(np.asarray(support, dtype=np.float64), shape).copy()
+        for name, values in (("turnout", self.turnout), ("support", self.support)):
+            if ((values < 0) | (values > 1)).any():
+                raise ValueError(f"{name} probabilities must lie in [0, 1]")
+        if (self.balances < 0).any():
+            raise ValueError("Balances must be non-negative")
+
+    @classmethod
+    def random(cls, count, pareto_shape=1.2, turnout=(0.5, 8.0), support=(4.0, 4.0), seed=None):
+        """
+        Returns holders with Pareto-distributed balances and Beta-distributed
+        turnout and support probabilities, given as (a, b) pairs.
+        """
+        rng = np.random.default_rng(seed)
+        return cls(rng.pareto(pareto_shape, count) + 1.0, rng.beta(*turnout, count),
+                   rng.beta(*support, count))
+
+    def __len__(self):
+        return self.balances.shape[0]
+
+    @property
+    def supply(self):
+        return float(self.balances.sum())
+
+
+class GovernanceOutcome:
+    """
+    Result of simulate_governance.
+
+    Per-step float64 arrays:
+      - proposals: proposals voted on
+      - passed: proposals passed
+      - votes: votes cast (holders, not tokens)
+      - turnout: mean fraction of the supply voting (NaN without proposals)
+
+    Per-proposal arrays: proposal_step, votes_for, votes_against (token
+    weights) and approved (bool).
+    """
+
+    def __init__(self, simulation_period, proposal_step, votes_for, votes_against, vote_counts,
+                 approved, supply):
+        self.proposal_step = proposal_step
+        self.votes_for = votes_for
+        self.votes_against = votes_against
+        self.approved = approved
+
+        def per_step(weights):
+            return np.bincount(proposal_step, weights=weights, minlength=simulation_period)
+
+        self.proposals = per_step(None).astype(np.float64)
+        self.passed = per_step(approved.astype(np.float64))
+        self.votes = per_step(vote_counts)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.turnout = per_step((votes_for + votes_against) / supply) / self.proposals
+
+    def parameter_path(self, initial, change, relative=True):
+        """
+        Returns a parameter's value per step when every passed proposal
+        changes it from the next step on, by a factor (1 + change) if
+        relative, else by adding change.
+        """
+        enacted = np.concatenate([[0.0], np.cumsum(self.passed)[:-1]])
+        if relative:
+            return initial * (1.0 + change) ** enacted
+        return initial + change * enacted
+
+
+def _sample_exact(holders, count, rng):
+    balances, turnout = holders.balances, holders.turnout
+    votes_for_probability = turnout * holders.support
+    votes_for = np.empty(count)
+    votes_against = np.empty(count)
+    vote_counts = np.empty(count)
+    block = max(1, EXACT_BLOCK_CELLS // max(len(holders), 1))
+    for start in range(0, count, block):
+        stop = min(start + block, count)
+        draws = rng.random((stop - start, len(holders)), dtype=np.float32)
+        voting = draws < turnout
+        in_favour = draws < votes_for_probability
+        votes_for[start:stop] = in_favour @ balances
+        votes_against[start:stop] = voting @ balances - votes_for[start:stop]
+        vote_counts[start:stop] = np.count_nonzero(voting, axis=1)
+    return votes_for, votes_against, vote_counts
+
+
+def _sample_approximate(holders, count, whales, rng):
+    order = np.argsort(holders.balances)[::-1]
+    top, rest = order[:whales], order[whales:]
+    top_holders = HolderPopulation(holders.balances[top], holders.turnout[top], holders.support[top])
+    votes_for, votes_against, vote_counts = _sample_exact(top_holders, count, rng)
+
+    if rest.size:
+        balances = holders.balances[rest]
+        p_for = holders.turnout[rest] * holders.support[rest]
+        p_against = holders.turnout[rest] - p_for
+        squared = balances * balances
+        mean = np.array([balances @ p_for, balances @ p_against])
+        covariance = np.array([
+            [squared @ (p_for * (1.0 - p_for)), -squared @ (p_for * p_against)],
+            [-squared @ (p_for * p_against), squared @ (p_against * (1.0 - p_against))],
+        ])
+        weights = rng.multivariate_normal(mean, covariance, size=count, method="eigh")
+        np.maximum(weights, 0.0, out=weights)
+        # Scale (for, against) together so the pair never exceeds the tokens held
+        total = weights.sum(axis=1)
+        weights *= (balances.sum() / np.maximum(total, balances.sum()))[:, None]
+        votes_for += weights[:, 0]
+        votes_against += weights[:, 1]
+
+        turnout = holders.turnout[rest]
+        count_mean, count_sd = turnout.sum(), np.sqrt((turnout * (1.0 - turnout)).sum())
+        vote_counts += np.clip(np.rint(rng.normal(count_mean, count_sd, count)), 0, rest.size)
+    return votes_for, votes_against, vote_counts
+
+
+def simulate_governance(holders, simulation_period, proposal_rate=1.0, quorum=0.04,
+                        approval_threshold=0.5, method="approximate", whales=256, seed=None):
+    """
+    Simulates proposals and token-weighted votes over simulation_period steps.
+
+    :param holders: HolderPopulation
+    :param proposal_rate: mean proposals per step (float, Schedule or array)
+    :param quorum: float, fraction of the supply that must vote
+    :param approval_threshold: float, fraction of the voting tokens that must vote for
+    :param method: "approximate" or "exact" (see the module docstring)
+    :param whales: int, largest holders sampled exactly by the approximate method
+    :param seed: optional seed for numpy.random.default_rng
+    :return: GovernanceOutcome
+    """
+    if method not in SAMPLING_METHODS:
+        raise ValueError(f"Unknown sampling method '{method}', expected one of {SAMPLING_METHODS}")
+    rng = np.random.default_rng(seed)
+    if is_schedule(proposal_rate):
+        rates = proposal_rate.materialize(simulation_period)
+    else:
+        rates = np.broadcast_to(np.asarray(proposal_rate, dtype=np.float64), (simulation_period,))
+    proposal_step = np.repeat(np.arange(simulation_period), rng.poisson(rates))
+    count = proposal_step.shape[0]
+
+    if method == "exact":
+        votes_for, votes_against, vote_counts = _sample_exact(holders, count, rng)
+    else:
+        votes_for, votes_against, vote_counts = _sample_approximate(holders, count, whales, rng)
+
+    supply = holders.supply
+    voting = votes_for + votes_against
+    approved = (voting >= quorum * supply) & (votes_for >= approval_threshold * voting) & (voting > 0)
+    return GovernanceOutcome(simulation_period, proposal_step, votes_for, votes_against,
+                             vote_counts, approved, supply)
+
+
+def attach_governance(business_model, outcome, operation="Governance", adjustments=None,
+                      global_parameters=None):
+    """
+    Stores the outcome's proposal and vote counts on the governance operation
+    ("proposal_count" and "vote_count" schedules) and applies parameter
+    adjustments for passed proposals.
+
+    :param adjustments: optional dict of "Operation.parameter" (or a
+        transaction-level parameter name) -> relative change per passed
+        proposal, e.g. {"DataPurchase.licensing_fees": -0.05}; the parameter's
+        current value (a number or a schedule) is the starting point
+    :param global_parameters: optional dict of the global parameters the
+        model will run with. A transaction-level adjustment starts from the
+        value the model resolves (transaction model, then global, then business
+        model parameters) and is written to the business model's parameters,
+        the layer that wins.
+    :return: business_model
+    """
+    operations = {op.name: op for op in business_model.transaction_model.operations}
+    if operation not in operations:
+        raise ValueError(f"No operation named '{operation}'")
+    operations[operation].parameters["proposal_count"] = ArraySchedule(outcome.proposals)
+    operations[operation].parameters["vote_count"] = ArraySchedule(outcome.votes)
+
+    resolved = None
+    for path, change in (adjustments or {}).items():
+        name, _, key = path.rpartition(".")
+        if name and name not in operations:
+            raise ValueError(f"No operation named '{name}'")
+        if name:
+            parameters = operations[name].parameters
+            current = parameters.get(key, 0.0)
+        else:
+            if resolved is None:
+                resolved = ParameterResolver(max_entries=0).resolve(business_model,
+                                                                    global_parameters)
+            parameters = business_model.parameters
+            current = resolved.parameters.get(key, 0.0)
+        initial = materialize_value(current, outcome.proposals.shape[0])
+        parameters[key] = ArraySchedule(outcome.parameter_path(initial, change))
+    return business_model
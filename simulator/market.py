@@ -0,0 +1,219 @@
+# business_model_simulator/simulator/market.py
+
+"""
+Competing business models sharing one demand pool.
+
+In market mode the models registered on a Simulator (or built per sweep
+combination by a market factory) split a common pool of users each step.
+Each model's utility is
+
+    utility[m, t] = quality_sensitivity * quality[m, t] - price_sensitivity * price[m, t]
+
+read from its market_price and market_quality parameters (numbers or
+schedules). Shares follow a logit rule across the models, optionally
+against an outside option that keeps some users out of the market:
+
+    share[m, t] = exp(utility[m, t]) / (sum over k of exp(utility[k, t]) + exp(outside_utility))
+
+A model's users in a step are share * pool. Its operations' volumes are
+base_transaction_volume * users, i.e. base_transaction_volume is read as
+volume per user, and the pool's growth replaces the models' own growth_rate.
+The users are passed to each model as a run-local "growth_factor" schedule,
+so the registered models are never modified, and both engines evaluate
+coupled models unchanged.
+
+Shares are computed as array operations over (combinations x models x
+steps), so a sweep over many competing models is allocated and then
+evaluated in one batch (see run_market_sweep).
+"""
+
+import itertools
+
+import numpy as np
+
+from .parameters import ParameterResolver
+from .schedules import ArraySchedule, compound_growth, is_schedule, materialize_value
+from .simulator import run_resolved_model
+from .vectorized import combo_key, evaluate_models
+
+
+def logit_shares(utilities, outside_utility=None, axis=-2):
+    """
+    Returns logit market shares of utilities along axis (the models axis),
+    computed stably by subtracting the largest utility.
+
+    :param outside_utility: optional float (or array broadcasting against
+        the utilities without the models axis) of the outside option
+    """
+    utilities = np.asarray(utilities, dtype=np.float64)
+    highest = utilities.max(axis=axis, keepdims=True)
+    if outside_utility is not None:
+        outside = np.asarray(outside_utility, dtype=np.float64)
+        if outside.ndim:
+            outside = np.expand_dims(outside, axis)
+        highest = np.maximum(highest, outside)
+    weights = np.exp(utilities - highest)
+    total = weights.sum(axis=axis, keepdims=True)
+    if outside_utility is not None:
+        total = total + np.exp(outside - highest)
+    return weights / total
+
+
+class Market:
+    """
+    Demand pool and the price/quality rule that divides it between models.
+    """
+
+    def __init__(self, size, growth_rate=0.0, price_sensitivity=1.0, quality_sensitivity=1.0,
+                 outside_utility=None, price_key="market_price", quality_key="market_quality"):
+        """
+        :param size: users in the pool at step 0 (float or Schedule of the
+            pool per step, in which case growth_rate is ignored)
+        :param growth_rate: per-step pool growth (float or Schedule)
+        :param price_sensitivity: float, utility lost per unit of price
+        :param quality_sensitivity: float, utility gained per unit of quality
+        :param outside_utility: optional float, utility of not joining any model
+        :param price_key: model parameter holding its price
+        :param quality_key: model parameter holding its quality
+        """
+        self.size = size
+        self.growth_rate = growth_rate
+        self.price_sensitivity = price_sensitivity
+        self.quality_sensitivity = quality_sensitivity
+        self.outside_utility = outside_utility
+        self.price_key = price_key
+        self.quality_key = quality_key
+
+    def pool(self, simulation_period):
+        """
+        Returns the users in the pool for every step.
+        """
+        if is_schedule(self.size):
+            return self.size.materialize(simulation_period)
+        growth = materialize_value(self.growth_rate, simulation_period)
+        return float(self.size) * compound_growth(growth)
+
+    def allocate(self, prices, qualities):
+        """
+        Divides the pool between models.
+
+        :param prices: array (..., models, steps)
+        :param qualities: array (..., models, steps)
+        :return: (shares, users), arrays shaped like prices
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        utilities = (self.quality_sensitivity * np.asarray(qualities, dtype=np.float64)
+                     - self.price_sensitivity * prices)
+        shares = logit_shares(utilities, self.outside_utility)
+        return shares, shares * self.pool(prices.shape[-1])
+
+    def _attributes(self, resolved_models, simulation_period):
+        def series(key):
+            return np.array([
+                materialize_value(resolved.parameters.get(key, 0.0), simulation_period)
+                for resolved in resolved_models
+            ]).reshape(len(resolved_models), simulation_period)
+        return series(self.price_key), series(self.quality_key)
+
+
+def _couple(business_models, users, global_parameters, resolver):
+    return [
+        resolver.resolve(model, dict(global_parameters or {}, growth_factor=ArraySchedule(row)))
+        for model, row in zip(business_models, users)
+    ]
+
+
+class MarketResults:
+    """
+    Outcome of run_market: arrays (models x steps) in the order the models
+    were given.
+    """
+
+    def __init__(self, model_names, shares, users, costs, revenues):
+        self.model_names = list(model_names)
+        self.shares = shares
+        self.users = users
+        self.costs = costs
+        self.revenues = revenues
+
+
+def run_market(business_models, market, simulation_period, global_parameters=None,
+               engine="python"):
+    """
+    Runs competing business models over one shared demand pool.
+
+    :param engine: "python" (reference engine per model) or "vectorized"
+    :return: MarketResults
+    """
+    if engine not in ("python", "vectorized"):
+        raise ValueError(f"Unknown engine '{engine}', expected 'python' or 'vectorized'")
+    business_models = list(business_models)
+    resolver = ParameterResolver(max_entries=0)
+    resolved = [resolver.resolve(model, global_parameters) for model in business_models]
+    shares, users = market.allocate(*market._attributes(resolved, simulation_period))
+    coupled = _couple(business_models, users, global_parameters, resolver)
+
+    if engine == "vectorized":
+        costs, revenues = evaluate_models(coupled, simulation_period)
+    else:
+        shape = (len(coupled), simulation_period)
+        costs, revenues = np.zeros(shape), np.zeros(shape)
+        for row, model in enumerate(coupled):
+            records = run_resolved_model(model, simulation_period)
+            costs[row] = [r["costs"] for r in records]
+            revenues[row] = [r["revenues"] for r in records]
+    return MarketResults([model.name for model in business_models], shares, users, costs, revenues)
+
+
+class MarketSweepArrays:
+    """
+    Results of run_market_sweep: shares, users, costs and revenues as
+    (combos x models x steps) arrays.
+    """
+
+    def __init__(self, param_names, combos, model_names, shares, users, costs, revenues):
+        self.param_names = list(param_names)
+        self.combos = list(combos)
+        self.model_names = list(model_names)
+        self.shares = shares
+        self.users = users
+        self.costs = costs
+        self.revenues = revenues
+
+    @property
+    def combo_keys(self):
+        return [combo_key(self.param_names, combo) for combo in self.combos]
+
+
+def run_market_sweep(param_grid, market_factory, market, simulation_period,
+                     global_parameters=None, dtype=np.float64):
+    """
+    Sweeps competing models: market_factory(combo_params) returns the list of
+    business models competing in that combination (the same number, in the
+    same roles, for every combination). Shares for the whole grid are
+    allocated in one array operation and every coupled model is evaluated in
+    one vectorized batch.
+
+    :return: MarketSweepArrays
+    """
+    param_names = list(param_grid.keys())
+    combos = list(itertools.product(*(param_grid[name] for name in param_names)))
+    resolver = ParameterResolver(max_entries=0)
+    competitors = [list(market_factory(dict(zip(param_names, combo)))) for combo in combos]
+    counts = {len(models) for models in competitors}
+    if len(counts) > 1:
+        raise ValueError("market_factory must return the same number of models for every combination")
+    model_count = counts.pop() if counts else 0
+
+    flat = [model for models in competitors for model in models]
+    resolved = [resolver.resolve(model, global_parameters) for model in flat]
+    shape = (len(combos), model_count, simulation_period)
+    prices, qualities = (values.reshape(shape)
+                         for values in market._attributes(resolved, simulation_period))
+    shares, users = market.allocate(prices, qualities)
+
+    coupled = _couple(flat, users.reshape(-1, simulation_period), global_parameters, resolver)
+    costs, revenues = evaluate_models(coupled, simulation_period, dtype)
+    names = [model.name for model in competitors[0]] if competitors else []
+    return MarketSweepArrays(param_names, combos, names, shares, users,
+                             costs.reshape(shape), revenues.reshape(shape))
@@ -0,0 +1,211 @@
+# business_model_simulator/simulator/metrics.py
+
+import numpy as np
+
+# Per-step series metrics (same shape as the costs/revenues input)
+SERIES_METRICS = ("profit", "cumulative_profit", "discounted_cumulative_profit")
+
+# Per-run summary metrics (one value per run / sweep combination)
+SUMMARY_METRICS = (
+    "total_costs",
+    "total_revenues",
+    "total_profit",
+    "npv",
+    "irr",
+    "payback_period",
+    "break_even_step",
+)
+
+AVAILABLE_METRICS = SERIES_METRICS + SUMMARY_METRICS
+
+# Sentinel for first-crossing metrics that never occur within the horizon
+NEVER = -1
+
+
+def discount_factors(simulation_period, discount_rate):
+    """
+    Returns the per-step discount factors 1 / (1 + discount_rate) ** step.
+    Step 0 is undiscounted.
+    """
+    return (1.0 + discount_rate) ** -np.arange(simulation_period, dtype=np.float64)
+
+
+def first_crossing(values, threshold=0.0):
+    """
+    Returns the index of the first step where values >= threshold along the
+    last axis, or NEVER where that does not happen.
+    """
+    mask = values >= threshold
+    first = mask.argmax(axis=-1)
+    return np.where(mask.any(axis=-1), first, NEVER)
+
+
+def internal_rate_of_return(profit, low=-0.99, high=10.0, iterations=100):
+    """
+    Vectorized IRR: the per-step rate at which the NPV of profit is zero,
+    found by simultaneous bisection over every row of profit.
+
+    Rows whose NPV does not strictly change sign on [low, high] (e.g.
+    all-positive, all-negative or all-zero cash flows) get NaN.
+    """
+    profit = np.asarray(profit, dtype=np.float64)
+    steps = np.arange(profit.shape[-1], dtype=np.float64)
+
+    def npv_at(rates):
+        factors = (1.0 + rates[..., None]) ** -steps
+        return np.sum(profit * factors, axis=-1)
+
+    batch_shape = profit.shape[:-1]
+    lo = np.full(batch_shape, low)
+    hi = np.full(batch_shape, high)
+    f_lo = npv_at(lo)
+    f_hi = npv_at(hi)
+    valid = np.sign(f_lo) * np.sign(f_hi) < 0
+
+    for _ in range(iterations):
+        mid = 0.5 * (lo + hi)
+        f_mid = npv_at(mid)
+        go_low = np.sign(f_mid) == np.sign(f_lo)
+        lo = np.where(go_low, mid, lo)
+        f_lo = np.where(go_low, f_mid, f_lo)
+        hi = np.where(go_low, hi, mid)
+
+    return np.where(valid, 0.5 * (lo + hi), np.nan)
+
+
+def _float_array(values):
+    values = np.asarray(values)
+    if values.dtype not in (np.float32, np.float64):
+        values = values.astype(np.float64)
+    return values
+
+
+def compute_metrics(costs, revenues, metrics=None, discount_rate=0.0):
+    """
+    Computes cash-flow metrics from cost and revenue series using vectorized
+    cumulative operations.
+
+    costs and revenues may be 1-D (a single run, one value per step) or N-D
+    with steps on the last axis (e.g. combos x steps for a whole sweep), in
+    which case every summary metric is returned per row.
+
+    :param costs: array-like of per-step costs
+    :param revenues: array-like of per-step revenues
+    :param metrics: iterable of metric names from AVAILABLE_METRICS; defaults to all
+    :param discount_rate: float, per-step discount rate used for npv and
+        discounted_cumulative_profit
+    :return: dict of metric name -> numpy array (or scalar for 1-D input)
+    """
+    selected = AVAILABLE_METRICS if metrics is None else tuple(metrics)
+    unknown = [m for m in selected if m not in AVAILABLE_METRICS]
+    if unknown:
+        raise ValueError(f"Unknown metrics {unknown}; expected any of {AVAILABLE_METRICS}")
+
+    # float32 series (see vectorized.run_vectorized_sweep) are read as they
+    # are; profit and every sum below accumulate in float64
+    costs = _float_array(costs)
+    revenues = _float_array(revenues)
+    profit = np.subtract(revenues, costs, dtype=np.float64)
+    simulation_period = profit.shape[-1]
+
+    computed = {}
+    cumulative = None
+    factors = None
+
+    for name in selected:
+        if name == "profit":
+            value = profit
+        elif name in ("cumulative_profit", "payback_period"):
+            if cumulative is None:
+                cumulative = np.cumsum(profit, axis=-1)
+            value = cumulative if name == "cumulative_profit" else first_crossing(cumulative)
+        elif name in ("npv", "discounted_cumulative_profit"):
+            if factors is None:
+                factors = discount_factors(simulation_period, discount_rate)
+            if name == "npv":
+                value = profit @ factors
+            else:
+                value = np.cumsum(profit * factors, axis=-1)
+        elif name == "total_costs":
+            value = costs.sum(axis=-1, dtype=np.float64)
+        elif name == "total_revenues":
+            value = revenues.sum(axis=-1, dtype=np.float64)
+        elif name == "total_profit":
+            value = profit.sum(axis=-1)
+        elif name == "irr":
+            value = internal_rate_of_return(profit)
+        else:  # break_even_step
+            value = first_crossing(profit)
+
+        if np.ndim(value) == 0:
+            value = value.item()
+        computed[name] = value
+
+    return computed
+
+
+class SweepSeries:
+    """
+    Per-model (combos x steps) cost and revenue arrays for a sweep, filled one
+    combination at a time as each run completes, so metrics can be computed
+    without a second pass over the sweep results.
+
+    Combinations that did not produce a given model keep NaN series, so their
+    summary metrics are NaN (and first-crossing metrics NEVER) rather than
+    values computed from made-up zeros.
+    """
+
+    def __init__(self, combo_count, simulation_period, dtype=np.float64):
+        """
+        :param combo_count: int, number of combinations in the sweep
+        :param simulation_period: int, number of time steps
+        :param dtype: float dtype of the stored series
+        """
+        self.shape = (combo_count, simulation_period)
+        self.dtype = dtype
+        self.series = {}
+
+    def add(self, index, run_results):
+        """
+        Records the results of combination index.
+
+        :param run_results: dict of model name -> list of {"step", "costs", "revenues"}
+        """
+        for name, records in run_results.items():
+            if name not in self.series:
+                self.series[name] = (np.full(self.shape, np.nan, dtype=self.dtype),
+                                     np.full(self.shape, np.nan, dtype=self.dtype))
+            costs, revenues = self.series[name]
+            costs[index, :len(records)] = [r["costs"] for r in records]
+            revenues[index, :len(records)] = [r["revenues"] for r in records]
+
+    def add_rows(self, name, rows, costs, revenues):
+        """
+        Records already-evaluated rows for one model, e.g. from the vectorized engine.
+
+        :param rows: index array or boolean mask selecting the combinations
+        """
+        if name not in self.series:
+            self.series[name] = (np.full(self.shape, np.nan, dtype=self.dtype),
+                                 np.full(self.shape, np.nan, dtype=self.dtype))
+        self.series[name][0][rows] = costs
+        self.series[name][1][rows] = revenues
+
+
+def rank_by(metric_values, k=None, descending=True):
+    """
+    Returns the indices of the k best entries of a per-combo metric array,
+    best first, without fully sorting when k is small. NaN values rank last.
+
+    :param metric_values: 1-D array, e.g. compute_metrics(...)["npv"] for a sweep
+    :param k: int, number of entries to return; defaults to all
+    :param descending: bool, True if larger values are better
+    """
+    values = np.asarray(metric_values, dtype=np.float64)
+    keyed = -values if descending else values
+    keyed = np.where(np.isnan(keyed), np.inf, keyed)
+
+    if k is None or k >= len(keyed):
+        return np.argsort(keyed, kind="stable")
+    top = np.argpartition(keyed, k - 1)[:k]
+    return top[np.argsort(keyed[top], kind="stable")]
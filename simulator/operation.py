@@ -17,6 +17,8 @@ class Operation:
               - transaction_volume: float or int, used in cost/revenue calculations
               - base_revenue: float, flat revenue
               - revenue_per_unit: float, revenue per transaction unit
+              - gas_per_transaction: float, gas used on chain per transaction unit
+              - gas_price: float, price per unit of gas (see simulator.chain)
         :param contract_complexity: an optional complexity indicator (e.g. 'High', 'Medium', 'Low')
             that may be used in cost calculations.
         """
@@ -37,7 +39,8 @@ class Operation:
         Returns the total cost of this operation.
         
         This base implementation uses a simple formula:
-          total_cost = (direct_cost + variable_part) * complexity_multiplier
+          total_cost = (direct_cost + variable_part) * complexity_multiplier + gas_part
+        where gas_part = gas_per_transaction * transaction_volume * gas_price.
           
         Subclasses can override this method to handle custom logic.
         """
@@ -50,9 +53,9 @@ class Operation:
             1.0
         )
         variable_part = variable_cost * volume
-        total_cost = (direct_cost + variable_part) * complexity_multiplier
-
-        return total_cost
+        gas_part = (self.parameters.get('gas_per_transaction', 0.0) * volume
+                    * self.parameters.get('gas_price', 0.0))
+        return (direct_cost + variable_part) * complexity_multiplier + gas_part
 
     def compute_revenue(self):
         """
@@ -69,3 +72,31 @@ class Operation:
 
         total_revenue = base_revenue + (revenue_per_unit * volume)
         return total_revenue
+
+    def compute_cost_batch(self, volumes, params):
+        """
+        Array form of compute_cost, called by the vectorized engine once for a
+        whole batch of models (scenarios) and steps.
+
+        Read parameters from params, not self.parameters: one call covers
+        every model in the batch, and self is only the first model's operation.
+
+        :param volumes: array (models x steps) of transaction volumes
+        :param params: simulator.vectorized.BatchParameters; params.get(key, default)
+            returns a parameter over the batch as an array that broadcasts
+            against volumes
+        :return: array (or scalar) broadcastable to volumes.shape
+
+        A subclass that overrides compute_cost should override this method with
+        the same logic. Until it does, the engine calls compute_cost per model
+        and step instead.
+        """
+        variable_part = params.get('variable_cost', 0.0) * volumes
+        gas_part = params.get('gas_per_transaction', 0.0) * volumes * params.get('gas_price', 0.0)
+        return (params.get('direct_cost', 0.0) + variable_part) * params.complexity_multiplier + gas_part
+
+    def compute_revenue_batch(self, volumes, params):
+        """
+        Array form of compute_revenue; see compute_cost_batch.
+        """
+        return params.get('base_revenue', 0.0) + params.get('revenue_per_unit', 0.0) * volumes
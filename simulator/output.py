@@ -0,0 +1,256 @@
+# business_model_simulator/simulator/output.py
+
+import csv
+import os
+import queue
+import threading
+
+SWEEP_FIELDNAMES = ["combo_key", "business_model", "step", "costs", "revenues"]
+
+# Marker telling the writer thread that no more rows will arrive
+_STOP = object()
+
+
+def _ensure_parent_dir(path):
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+
+
+def series_rows(values):
+    """
+    Returns a (combos x steps) array as nested lists for CSV writing. float32
+    values are written in their shortest form ("0.1"), since converting them
+    to Python floats would print float64 noise ("0.10000000149011612").
+    """
+    if values.dtype.itemsize < 8:
+        return values.astype(str).tolist()
+    return values.tolist()
+
+
+def write_sweep_results_to_csv(sweep_results, csv_path):
+    """
+    Writes the sweep results dictionary to a CSV file.
+    The dictionary is expected to look like:
+    {
+      "GR=0.00_OH=0.00_RF=1.00": {
+         "ParameterSweepModel": [
+           {"step": 0, "costs": X, "revenues": Y}, ...
+         ]
+      },
+      ...
+    }
+    """
+    _ensure_parent_dir(csv_path)
+
+    with open(csv_path, mode="w", newline="") as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=SWEEP_FIELDNAMES)
+        writer.writeheader()
+
+        for combo_key, model_dict in sweep_results.items():
+            for model_name, step_list in model_dict.items():
+                for record in step_list:
+                    writer.writerow({
+                        "combo_key": combo_key,
+                        "business_model": model_name,
+                        "step": record["step"],
+                        "costs": record["costs"],
+                        "revenues": record["revenues"]
+                    })
+
+
+def write_sweep_arrays_to_csv(sweep_arrays, csv_path, append=False):
+    """
+    Writes a vectorized.SweepArrays result to a CSV file with the same columns
+    as write_sweep_results_to_csv, without building the per-step dicts.
+
+    :param append: bool, append rows to an existing file without a header
+        (e.g. for the chunks of Simulator.run_chunked_sweep)
+    """
+    _ensure_parent_dir(csv_path)
+
+    with open(csv_path, mode="a" if append else "w", newline="") as csv_file:
+        writer = csv.writer(csv_file)
+        if not append:
+            writer.writerow(SWEEP_FIELDNAMES)
+        steps = range(sweep_arrays.costs.shape[1])
+        for key, name, cost_row, revenue_row in zip(
+            sweep_arrays.combo_keys,
+            sweep_arrays.model_names,
+            series_rows(sweep_arrays.costs),
+            series_rows(sweep_arrays.revenues)
+        ):
+            writer.writerows(
+                (key, name, step, c, r) for step, c, r in zip(steps, cost_row, revenue_row)
+            )
+
+
+def write_sweep_arrays_to_npz(sweep_arrays, npz_path):
+    """
+    Writes a vectorized.SweepArrays result to a compressed NumPy .npz file:
+    costs and revenues as (combos x steps) arrays, plus one array per swept
+    parameter holding that parameter's value for each combination and the
+    combinations' combo_key strings, exactly as the CSV writers spell them
+    (a parameter column may store an int grid value such as 0 as 0.0).
+    """
+    import numpy as np
+
+    _ensure_parent_dir(npz_path)
+    columns = {
+        f"param_{name}": np.array([combo[i] for combo in sweep_arrays.combos])
+        for i, name in enumerate(sweep_arrays.param_names)
+    }
+    np.savez_compressed(
+        npz_path,
+        costs=sweep_arrays.costs,
+        revenues=sweep_arrays.revenues,
+        model_names=np.array(sweep_arrays.model_names),
+        combo_keys=np.array(sweep_arrays.combo_keys),
+        **columns
+    )
+
+
+def sweep_rows(combo_key, run_results):
+    """
+    Flattens one combination's {model_name: [records]} results into CSV row
+    tuples in SWEEP_FIELDNAMES order.
+    """
+    return [
+        (combo_key, model_name, record["step"], record["costs"], record["revenues"])
+        for model_name, step_list in run_results.items()
+        for record in step_list
+    ]
+
+
+class BackgroundCSVWriter:
+    """
+    Writes CSV rows on a dedicated thread so that the sweep keeps computing
+    while the disk is busy.
+
+    Producers hand over lists of rows with submit(). Rows travel through a
+    bounded queue: when the writer falls behind, submit() blocks, which keeps
+    memory bounded (backpressure). The writer thread batches rows into large
+    writerows() calls on a file opened with a large buffer.
+
+    Use as a context manager; leaving the block flushes and closes the file and
+    re-raises any error raised on the writer thread.
+    """
+
+    def __init__(self, csv_path, fieldnames=SWEEP_FIELDNAMES, max_pending=64,
+                 batch_rows=8192, buffer_size=1 << 20, join_timeout=300.0):
+        """
+        :param csv_path: str, output file path
+        :param fieldnames: list of column names written as the header row
+        :param max_pending: int, maximum number of submitted row lists waiting
+            in the queue before submit() blocks
+        :param batch_rows: int, rows accumulated before each writerows() call
+        :param buffer_size: int, file buffer size in bytes
+        :param join_timeout: float, seconds close() waits for the writer thread
+        """
+        _ensure_parent_dir(csv_path)
+        self.csv_path = csv_path
+        self.fieldnames = list(fieldnames)
+        self.batch_rows = batch_rows
+        self.join_timeout = join_timeout
+        self.rows_written = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._error = None
+        self._closed = False
+        self._file = open(csv_path, mode="w", newline="", buffering=buffer_size)
+        self._thread = threading.Thread(target=self._run, name="sweep-csv-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, rows):
+        """
+        Queues a list of row tuples for writing. Blocks while the queue is full.
+        """
+        if self._error is not None:
+            raise self._error
+        if rows:
+            self._queue.put(rows)
+
+    def _run(self):
+        stop_seen = False
+        try:
+            writer = csv.writer(self._file)
+            writer.writerow(self.fieldnames)
+            pending = []
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    stop_seen = True
+                    break
+                pending.extend(item)
+                # Write when the batch is full, or when producers are slower
+                # than the disk so rows do not sit in memory unnecessarily
+                if len(pending) >= self.batch_rows or self._queue.empty():
+                    writer.writerows(pending)
+                    self.rows_written += len(pending)
+                    pending = []
+            if pending:
+                writer.writerows(pending)
+                self.rows_written += len(pending)
+        except BaseException as exc:
+            self._error = exc
+            # Keep draining so that blocked producers are released, unless
+            # close() has already signalled that nothing more will arrive
+            while not stop_seen:
+                stop_seen = self._queue.get() is _STOP
+        finally:
+            self._file.close()
+
+    def close(self, raise_errors=True):
+        """
+        Flushes all queued rows, closes the file and joins the writer thread.
+
+        :param raise_errors: bool, re-raise an error from the writer thread
+        :raises RuntimeError: if the writer thread does not finish within
+            join_timeout seconds
+        """
+        if not self._closed:
+            self._closed = True
+            self._queue.put(_STOP)
+            self._thread.join(self.join_timeout)
+            if self._thread.is_alive():
+                raise RuntimeError(
+                    f"CSV writer thread for {self.csv_path} did not finish "
+                    f"within {self.join_timeout} seconds"
+                )
+        if raise_errors and self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        # A producer error takes precedence over any writer error
+        self.close(raise_errors=exc_type is None)
+        return False
+
+
+def run_pipelined_sweep(simulator, param_grid, business_model_factory, csv_path,
+                        max_pending=64, batch_rows=8192, combo_key=None, telemetry=None):
+    """
+    Runs simulator's parameter sweep while a BackgroundCSVWriter writes each
+    combination's rows as soon as they are produced. Results are never
+    accumulated in memory, and wall time approaches max(compute, I/O)
+    instead of their sum.
+
+    :param simulator: Simulator providing simulation_period and global_parameters
+    :param param_grid: dict, parameter name -> list of values
+    :param business_model_factory: callable(combo_params) -> BusinessModel
+    :param csv_path: str, output CSV path (same columns as write_sweep_results_to_csv)
+    :param combo_key: optional callable(combo_params) -> str overriding the
+        default "name=value_name=value" key written to the combo_key column
+    :param telemetry: optional simulator.telemetry.SweepTelemetry receiving progress
+    :return: int, number of combinations run
+    """
+    combos = 0
+    with BackgroundCSVWriter(csv_path, max_pending=max_pending, batch_rows=batch_rows) as writer:
+        for combo_params, key, run_results in simulator.iter_parameter_sweep(
+                param_grid, business_model_factory, telemetry=telemetry):
+            if combo_key is not None:
+                key = combo_key(combo_params)
+            writer.submit(sweep_rows(key, run_results))
+            combos += 1
+    return combos
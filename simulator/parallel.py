@@ -0,0 +1,198 @@
+# business_model_simulator/simulator/parallel.py
+
+"""
+Multi-process parameter sweeps with shared-memory result buffers.
+
+The parent allocates the (combos x steps) cost and revenue arrays in
+multiprocessing.shared_memory. Workers are given ranges of combination
+ordinals, build and run those combinations, and write each series straight
+into the shared arrays at its ordinal. The parent only receives a small
+completion notice per range (its bounds and the model names), never the
+per-step results, and reads the finished arrays in place without copying.
+
+The business model factory is sent to every worker, so it must be picklable
+when the platform starts workers with "spawn" (e.g. a module-level function
+or scenario.ScenarioFactory).
+"""
+
+import itertools
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .simulator import Simulator
+from .telemetry import peak_rss_bytes
+from .vectorized import SweepArrays, _evaluate_combos, combo_at, result_dtype
+
+# State of a worker process, set once by _init_worker
+_worker = {}
+
+
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 always registers attached blocks with the resource
+        # tracker shared with the parent, which owns and unlinks them; skip
+        # the registration in this worker process
+        from multiprocessing import resource_tracker
+        register = resource_tracker.register
+        resource_tracker.register = lambda *args, **kwargs: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+def _init_worker(cost_name, revenue_name, shape, dtype, param_grid, business_model_factory,
+                 simulation_period, global_parameters, engine):
+    cost_block = _attach(cost_name)
+    revenue_block = _attach(revenue_name)
+    _worker.update(
+        blocks=(cost_block, revenue_block),
+        costs=np.ndarray(shape, dtype=dtype, buffer=cost_block.buf),
+        revenues=np.ndarray(shape, dtype=dtype, buffer=revenue_block.buf),
+        param_grid=param_grid,
+        factory=business_model_factory,
+        simulator=Simulator(simulation_period, global_parameters),
+        engine=engine,
+    )
+
+
+def _run_range(bounds):
+    """
+    Runs combinations [start, stop) and writes their series into the shared
+    arrays. Returns the completion notice (start, stop, names, pid, peak),
+    where names is a run-length encoded list of (model_name, count) and peak
+    the worker's memory high-water mark in bytes (or None).
+    """
+    start, stop = bounds
+    param_grid = _worker["param_grid"]
+    param_names = list(param_grid.keys())
+    costs, revenues = _worker["costs"], _worker["revenues"]
+    factory = _worker["factory"]
+    sim = _worker["simulator"]
+
+    if _worker["engine"] == "vectorized":
+        combos = [combo_at(param_grid, ordinal) for ordinal in range(start, stop)]
+        arrays = _evaluate_combos(param_names, combos, factory, sim.simulation_period,
+                                  sim.global_parameters, dtype=costs.dtype)
+        costs[start:stop] = arrays.costs
+        revenues[start:stop] = arrays.revenues
+        names = arrays.model_names
+    else:
+        names = []
+        for ordinal in range(start, stop):
+            combo_params = dict(zip(param_names, combo_at(param_grid, ordinal)))
+            _, run_results = sim.run_combination(combo_params, factory)
+            ((name, records),) = run_results.items()
+            costs[ordinal] = [r["costs"] for r in records]
+            revenues[ordinal] = [r["revenues"] for r in records]
+            names.append(name)
+
+    encoded = [(name, len(list(group))) for name, group in itertools.groupby(names)]
+    return start, stop, encoded, os.getpid(), peak_rss_bytes()
+
+
+class SharedSweepArrays(SweepArrays):
+    """
+    SweepArrays whose costs and revenues live in shared memory blocks owned
+    by this object. Call release() (or use it as a context manager) when done;
+    the arrays must not be used afterwards. Copy them with np.array(...) to
+    keep results beyond that point.
+    """
+
+    def __init__(self, param_names, combos, model_names, blocks, shape, dtype=np.float64):
+        self._blocks = blocks
+        costs = np.ndarray(shape, dtype=dtype, buffer=blocks[0].buf)
+        revenues = np.ndarray(shape, dtype=dtype, buffer=blocks[1].buf)
+        super().__init__(param_names, combos, model_names, costs, revenues)
+
+    def release(self):
+        """
+        Drops the array views and frees the shared memory blocks.
+        """
+        self.costs = self.revenues = None
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.release()
+        return False
+
+
+def _allocate(shape, dtype):
+    size = max(int(np.prod(shape)) * dtype.itemsize, 1)
+    return shared_memory.SharedMemory(create=True, size=size)
+
+
+def run_parallel_sweep(param_grid, business_model_factory, simulation_period,
+                       global_parameters=None, workers=None, chunk_size=None,
+                       engine="python", mp_context=None, dtype=np.float64, telemetry=None):
+    """
+    Runs a parameter sweep across worker processes that write results into
+    shared memory.
+
+    :param param_grid: dict of parameter name -> list of values
+    :param business_model_factory: picklable callable returning one BusinessModel
+        for a dict of parameters
+    :param simulation_period: int, number of time steps
+    :param global_parameters: dict of global parameters
+    :param workers: int, number of processes (default: os.cpu_count())
+    :param chunk_size: int, combinations per task (default: about four tasks per worker)
+    :param engine: "python" (reference engine per combination) or "vectorized"
+        (each task evaluated as one batch)
+    :param mp_context: optional multiprocessing context, e.g. get_context("spawn")
+    :param dtype: "float64" or "float32", dtype of the shared result arrays
+    :param telemetry: optional simulator.telemetry.SweepTelemetry, advanced
+        per completion notice and credited to the worker process that sent it
+    :return: SharedSweepArrays
+    """
+    if engine not in ("python", "vectorized"):
+        raise ValueError(f"Unknown engine '{engine}', expected 'python' or 'vectorized'")
+    param_names = list(param_grid.keys())
+    total = 1
+    for name in param_names:
+        total *= len(param_grid[name])
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, -(-total // (workers * 4)))
+    shape = (total, simulation_period)
+    dtype = result_dtype(dtype)
+
+    blocks = (_allocate(shape, dtype), _allocate(shape, dtype))
+    try:
+        names = [None] * total
+        context = mp_context or multiprocessing.get_context()
+        tasks = [(start, min(start + chunk_size, total)) for start in range(0, total, chunk_size)]
+        initargs = (blocks[0].name, blocks[1].name, shape, dtype, param_grid, business_model_factory,
+                    simulation_period, global_parameters, engine)
+        if telemetry is not None:
+            telemetry.start(total)
+        with context.Pool(workers, initializer=_init_worker, initargs=initargs) as pool:
+            for start, stop, encoded, pid, peak in pool.imap_unordered(_run_range, tasks):
+                position = start
+                for name, count in encoded:
+                    names[position:position + count] = [name] * count
+                    position += count
+                if telemetry is not None:
+                    telemetry.advance(stop - start, worker=pid, max_rss_bytes=peak)
+        if telemetry is not None:
+            telemetry.finish()
+    except BaseException:
+        if telemetry is not None:
+            telemetry.finish()
+        for block in blocks:
+            block.close()
+            block.unlink()
+        raise
+
+    combos = list(itertools.product(*(param_grid[name] for name in param_names)))
+    return SharedSweepArrays(param_names, combos, names, blocks, shape, dtype)
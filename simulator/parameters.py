@@ -0,0 +1,260 @@
+# business_model_simulator/simulator/parameters.py
+
+import copy
+from collections import OrderedDict
+from types import MappingProxyType
+
+from .schedules import compound_growth, is_schedule, materialize_schedules
+
+
+def freeze(value):
+    """
+    Returns a hashable representation of a parameter value so that parameter
+    dictionaries can be compared and used as cache keys. Dicts are frozen
+    independently of insertion order; lists/tuples keep their order.
+    """
+    if isinstance(value, dict):
+        return ("dict", tuple(sorted(
+            ((repr(k), freeze(v)) for k, v in value.items()),
+            key=lambda item: item[0]
+        )))
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, tuple(freeze(v) for v in value))
+    if isinstance(value, (set, frozenset)):
+        return ("set", tuple(sorted(repr(v) for v in value)))
+    if hasattr(value, "fingerprint"):
+        return value.fingerprint()
+    if hasattr(value, "tobytes") and hasattr(value, "dtype"):
+        return ("ndarray", value.dtype.str, value.shape, value.tobytes())
+    try:
+        hash(value)
+    except TypeError:
+        return ("id", id(value))
+    return value
+
+
+class ResolvedModel:
+    """
+    Immutable, fully merged view of a BusinessModel's parameters for a single run.
+
+    Layering (later layers win):
+      transaction model parameters -> global parameters -> business model adjustments
+    which preserves the precedence of the original in-place merge. Operation
+    parameters form the innermost layer and are kept per operation.
+
+    None of the input objects are modified; instantiate() hands out run-local
+    working copies for the engine to use. Scheduled parameters are materialised
+    into arrays once per simulation_period (see schedules()).
+    """
+
+    def __init__(self, name, transaction_model, parameters, operations):
+        """
+        :param name: str, name of the resolved business model
+        :param transaction_model: the original TransactionModel (never mutated)
+        :param parameters: dict, merged transaction-level parameters
+        :param operations: list of the original Operation instances
+        """
+        self.name = name
+        self.parameters = MappingProxyType(dict(parameters))
+        self.operations = tuple(operations)
+        self.operation_parameters = tuple(
+            MappingProxyType(dict(op.parameters)) for op in operations
+        )
+        self._transaction_model = transaction_model
+        self._schedules = {}
+
+    @property
+    def transaction_model(self):
+        """
+        The original TransactionModel this view was resolved from. Engines use
+        it to inspect the model's class; it must not be modified.
+        """
+        return self._transaction_model
+
+    def schedules(self, simulation_period):
+        """
+        Returns the materialised schedules for simulation_period as a tuple
+        (parameter_arrays, operation_arrays), where parameter_arrays maps
+        transaction-level parameter names to arrays and operation_arrays holds
+        one such dict per operation. Computed once per period and cached.
+
+        A scheduled growth_rate also yields a derived 'growth_factor' array
+        holding the compounded growth up to each step (see
+        schedules.compound_growth), which TransactionModel.update_for_time_step
+        uses in place of (1 + growth_rate) ** step.
+        """
+        cached = self._schedules.get(simulation_period)
+        if cached is None:
+            parameter_arrays = materialize_schedules(self.parameters, simulation_period)
+            if 'growth_rate' in parameter_arrays and 'growth_factor' not in self.parameters:
+                growth_factor = compound_growth(parameter_arrays['growth_rate'])
+                growth_factor.setflags(write=False)
+                parameter_arrays['growth_factor'] = growth_factor
+            cached = (
+                parameter_arrays,
+                tuple(
+                    materialize_schedules(params, simulation_period)
+                    for params in self.operation_parameters
+                ),
+            )
+            self._schedules[simulation_period] = cached
+        return cached
+
+    def has_schedules(self):
+        """
+        Returns True if any transaction-level or operation parameter is scheduled.
+        """
+        return any(is_schedule(v) for v in self.parameters.values()) or any(
+            is_schedule(v) for params in self.operation_parameters for v in params.values()
+        )
+
+    def stepper(self, simulation_period):
+        """
+        Returns a callable apply(working_model, step) that writes the scheduled
+        values for step into a working model returned by instantiate().
+        """
+        parameter_arrays, operation_arrays = self.schedules(simulation_period)
+        parameter_values = {k: v.tolist() for k, v in parameter_arrays.items()}
+        operation_values = [
+            {k: v.tolist() for k, v in arrays.items()} for arrays in operation_arrays
+        ]
+
+        def apply(working_model, step):
+            params = working_model.parameters
+            for key, values in parameter_values.items():
+                params[key] = values[step]
+            for op, values_by_key in zip(working_model.operations, operation_values):
+                for key, values in values_by_key.items():
+                    op.parameters[key] = values[step]
+
+        return apply
+
+    def instantiate(self):
+        """
+        Returns a working copy of the transaction model whose operations and
+        parameter dicts are private to the caller. The engine may update these
+        freely (e.g. 'transaction_volume' per time step).
+
+        Operations and the transaction model are copied with copy.copy, and
+        every dict, list or set attribute (such as _complexity_multipliers) is
+        copied as well, so updating those on the working copy does not reach
+        the originals. Other mutable state (e.g. NumPy arrays or helper
+        objects held by a subclass) is still shared; subclasses that mutate
+        such state during a run should define __copy__ to copy it.
+        """
+        working_ops = []
+        for op, params in zip(self.operations, self.operation_parameters):
+            working_op = _working_copy(op)
+            working_op.parameters = dict(params)
+            working_ops.append(working_op)
+
+        working_model = _working_copy(self._transaction_model)
+        working_model.operations = working_ops
+        working_model.parameters = dict(self.parameters)
+        return working_model
+
+
+def check_no_growth(resolved, simulation_period, source):
+    """
+    Raises ValueError if the resolved growth_rate would compound volumes that
+    source (e.g. a subsystem writing base_transaction_volume schedules)
+    already models. An explicit growth_factor replaces growth_rate and is
+    accepted.
+
+    :param resolved: ResolvedModel
+    :param source: str naming the volumes, for the error message
+    """
+    if 'growth_factor' in resolved.parameters:
+        return
+    growth_rate = resolved.parameters.get('growth_rate', 0.0)
+    if is_schedule(growth_rate):
+        growth_rate = resolved.schedules(simulation_period)[0]['growth_rate']
+        if not growth_rate.any():
+            return
+    elif not growth_rate:
+        return
+    raise ValueError(f"Business model '{resolved.name}' has a non-zero growth_rate, which would "
+                     f"compound the {source}; set it to 0")
+
+
+def _working_copy(obj):
+    """
+    Shallow copy of obj whose dict/list/set attributes are also copied.
+    """
+    working = copy.copy(obj)
+    attributes = getattr(working, "__dict__", None)
+    if attributes is not None:
+        for name, value in list(attributes.items()):
+            if isinstance(value, (dict, list, set)):
+                attributes[name] = copy.copy(value)
+    return working
+
+
+class ParameterResolver:
+    """
+    Resolves global, business model, transaction model and operation parameters
+    into a ResolvedModel, caching the result so repeated runs over unchanged
+    inputs skip the merge entirely.
+    """
+
+    def __init__(self, max_entries=256):
+        """
+        :param max_entries: int, maximum number of resolved views kept in the cache
+        """
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+
+    def fingerprint(self, business_model, global_parameters=None):
+        """
+        Returns a hashable key describing every input that feeds the resolved view.
+        Object identities are included so that a cached view is never shared
+        between distinct models that merely look alike.
+        """
+        tx_model = business_model.transaction_model
+        op_keys = tuple(
+            (id(op), type(op), op.name, op.contract_complexity, freeze(op.parameters))
+            for op in tx_model.operations
+        )
+        return (
+            id(business_model),
+            business_model.name,
+            freeze(business_model.parameters),
+            id(tx_model),
+            type(tx_model),
+            freeze(tx_model.parameters),
+            freeze(global_parameters or {}),
+            op_keys,
+        )
+
+    def resolve(self, business_model, global_parameters=None):
+        """
+        Returns the ResolvedModel for business_model under global_parameters.
+        """
+        key = self.fingerprint(business_model, global_parameters)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+
+        tx_model = business_model.transaction_model
+        merged = dict(tx_model.parameters)
+        merged.update(global_parameters or {})
+        merged = business_model.resolve_parameters(merged)
+
+        resolved = ResolvedModel(
+            name=business_model.name,
+            transaction_model=tx_model,
+            parameters=merged,
+            operations=tx_model.operations,
+        )
+
+        self._cache[key] = resolved
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return resolved
+
+    def clear(self):
+        """
+        Drops all cached resolved views.
+        """
+        self._cache.clear()
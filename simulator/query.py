@@ -0,0 +1,380 @@
+# business_model_simulator/simulator/query.py
+
+"""
+Indexed sweep results.
+
+IndexedSweepWriter writes sweep results as CSV with one typed column per
+swept parameter (param_<name>) next to the usual combo_key, business_model,
+step, costs and revenues columns, and records a sidecar index
+(<csv>.index.json) holding each combination's parameter values and the byte
+range of its rows.
+
+SweepIndex loads the sidecar and answers queries such as
+
+    index = SweepIndex.load("sweep.csv")
+    for entry in index.query(growth_rate=(0.05, 0.1), overhead_rate=0.02):
+        results = index.fetch(entry)
+
+using per-parameter sorted value lists, so matching combinations are found
+without reading the CSV, and only their rows are read (by seeking to the
+recorded offset).
+"""
+
+import bisect
+import csv
+import io
+import itertools
+import json
+import math
+import os
+
+from .output import SWEEP_FIELDNAMES, _ensure_parent_dir, series_rows
+
+INDEX_SUFFIX = ".index.json"
+INDEX_VERSION = 1
+
+# Relative tolerance for equality conditions on float parameters, so that
+# overhead_rate=0.06 matches a grid value computed as 3 * 0.02
+FLOAT_MATCH_TOLERANCE = 1e-9
+
+_TYPES = {bool: "bool", int: "int", float: "float", str: "str"}
+
+
+def index_path(csv_path):
+    return csv_path + INDEX_SUFFIX
+
+
+def param_column(name):
+    """
+    Returns the CSV column name holding swept parameter name.
+    """
+    return f"param_{name}"
+
+
+def indexed_fieldnames(param_names):
+    """
+    Returns the CSV header of an indexed sweep file.
+    """
+    return SWEEP_FIELDNAMES[:1] + [param_column(name) for name in param_names] + SWEEP_FIELDNAMES[1:]
+
+
+def _type_name(value):
+    for python_type, name in _TYPES.items():
+        if type(value) is python_type:
+            return name
+    # NumPy scalars and other numbers are stored as floats
+    if isinstance(value, (int, float)) or hasattr(value, "item"):
+        return "float"
+    return "str"
+
+
+def _merge_types(current, new):
+    # An axis mixing ints and floats (e.g. --grid rate=0,0.1) is a float axis;
+    # any other mix is kept as text
+    if current is None or current == new:
+        return new
+    if {current, new} == {"int", "float"}:
+        return "float"
+    return "str"
+
+
+def _plain(value, type_name):
+    if type_name == "str":
+        return str(value)
+    if type_name == "float":
+        return float(value)
+    return value
+
+
+class IndexedSweepWriter:
+    """
+    Writes sweep results with typed parameter columns and a byte-offset index.
+
+    Use as a context manager; the index is written when the block exits
+    without an error.
+    """
+
+    def __init__(self, csv_path, param_names, buffer_size=1 << 20):
+        """
+        :param csv_path: str, output CSV path; the index is written next to it
+        :param param_names: list of swept parameter names, in grid order
+        :param buffer_size: int, file buffer size in bytes
+        """
+        _ensure_parent_dir(csv_path)
+        self.csv_path = csv_path
+        self.param_names = list(param_names)
+        self.param_types = {}
+        self.entries = []
+        self._file = open(csv_path, "wb", buffering=buffer_size)
+        self._offset = 0
+        self._write_rows([indexed_fieldnames(self.param_names)])
+
+    def _write_rows(self, rows):
+        text = io.StringIO()
+        csv.writer(text).writerows(rows)
+        data = text.getvalue().encode("utf-8")
+        self._file.write(data)
+        start = self._offset
+        self._offset += len(data)
+        return start, len(data)
+
+    def add(self, combo_params, combo_key, run_results):
+        """
+        Appends one combination's results.
+
+        :param combo_params: dict of parameter name -> value
+        :param combo_key: str, key written to the combo_key column
+        :param run_results: dict of model name -> list of {"step", "costs", "revenues"}
+        """
+        values = []
+        for name in self.param_names:
+            value = combo_params[name]
+            self.param_types[name] = _merge_types(self.param_types.get(name), _type_name(value))
+            values.append(value)
+
+        rows = [
+            (combo_key, *values, model_name, record["step"], record["costs"], record["revenues"])
+            for model_name, step_list in run_results.items()
+            for record in step_list
+        ]
+        offset, length = self._write_rows(rows)
+        self.entries.append({
+            "combo_key": combo_key,
+            "params": values,
+            "offset": offset,
+            "length": length,
+            "rows": len(rows),
+        })
+
+    def add_arrays(self, sweep_arrays):
+        """
+        Appends every combination of a vectorized.SweepArrays result (or one
+        chunk of a chunked sweep).
+        """
+        steps = range(sweep_arrays.costs.shape[1])
+        for index, (key, name, cost_row, revenue_row) in enumerate(zip(
+            sweep_arrays.combo_keys,
+            sweep_arrays.model_names,
+            series_rows(sweep_arrays.costs),
+            series_rows(sweep_arrays.revenues)
+        )):
+            records = [
+                {"step": step, "costs": c, "revenues": r}
+                for step, c, r in zip(steps, cost_row, revenue_row)
+            ]
+            self.add(sweep_arrays.combo_params(index), key, {name: records})
+
+    def close(self):
+        """
+        Closes the CSV file and writes the index atomically.
+        """
+        if self._file.closed:
+            return
+        self._file.close()
+        for entry in self.entries:
+            entry["params"] = [
+                _plain(value, self.param_types.get(name, "str"))
+                for name, value in zip(self.param_names, entry["params"])
+            ]
+        document = {
+            "version": INDEX_VERSION,
+            "csv_size": self._offset,
+            "param_names": self.param_names,
+            "param_types": [self.param_types.get(name, "str") for name in self.param_names],
+            "entries": self.entries,
+        }
+        target = index_path(self.csv_path)
+        temporary = f"{target}.{os.getpid()}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(document, f)
+        os.replace(temporary, target)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+        return False
+
+
+def write_indexed_sweep(simulator, param_grid, business_model_factory, csv_path, combo_key=None,
+                        telemetry=None):
+    """
+    Runs simulator's parameter sweep and writes each combination with
+    IndexedSweepWriter as it completes.
+
+    :param combo_key: optional callable(combo_params) -> str overriding the default key
+    :param telemetry: optional simulator.telemetry.SweepTelemetry receiving progress
+    :return: int, number of combinations run
+    """
+    combos = 0
+    with IndexedSweepWriter(csv_path, list(param_grid.keys())) as writer:
+        for combo_params, key, run_results in simulator.iter_parameter_sweep(
+                param_grid, business_model_factory, telemetry=telemetry):
+            if combo_key is not None:
+                key = combo_key(combo_params)
+            writer.add(combo_params, key, run_results)
+            combos += 1
+    return combos
+
+
+def write_indexed_sweep_results(sweep_results, param_grid, csv_path):
+    """
+    Writes the dict returned by Simulator.run_parameter_sweep with
+    IndexedSweepWriter. Combinations are matched to param_grid by position,
+    since the sweep keeps itertools.product order.
+    """
+    param_names = list(param_grid.keys())
+    combos = itertools.product(*(param_grid[name] for name in param_names))
+    with IndexedSweepWriter(csv_path, param_names) as writer:
+        for combo, (key, run_results) in zip(combos, sweep_results.items()):
+            writer.add(dict(zip(param_names, combo)), key, run_results)
+
+
+def write_indexed_sweep_arrays(sweep_arrays, csv_path):
+    """
+    Writes a vectorized.SweepArrays result with IndexedSweepWriter.
+    """
+    with IndexedSweepWriter(csv_path, sweep_arrays.param_names) as writer:
+        writer.add_arrays(sweep_arrays)
+
+
+class SweepIndex:
+    """
+    Query interface over an indexed sweep CSV.
+    """
+
+    def __init__(self, csv_path, document):
+        """
+        :param csv_path: str, path of the indexed CSV
+        :param document: dict, the parsed index sidecar
+        """
+        if document.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported sweep index version {document.get('version')}")
+        self.csv_path = csv_path
+        self.param_names = list(document["param_names"])
+        self.param_types = dict(zip(self.param_names, document["param_types"]))
+        self.entries = document["entries"]
+        for entry in self.entries:
+            entry["params"] = dict(zip(self.param_names, entry["params"]))
+
+        # Per parameter: distinct values in sorted order, and the entry
+        # positions holding each value
+        self._values = {}
+        self._postings = {}
+        for name in self.param_names:
+            postings = {}
+            for position, entry in enumerate(self.entries):
+                postings.setdefault(entry["params"][name], []).append(position)
+            self._values[name] = sorted(postings, key=_sort_key)
+            self._postings[name] = postings
+
+    @classmethod
+    def load(cls, csv_path):
+        """
+        Loads the index written next to csv_path.
+
+        :raises FileNotFoundError: if the CSV has no index
+        """
+        with open(index_path(csv_path)) as f:
+            return cls(csv_path, json.load(f))
+
+    def values(self, name):
+        """
+        Returns the distinct values of parameter name, sorted.
+        """
+        return list(self._values[name])
+
+    def _matching_values(self, name, condition):
+        values = self._values[name]
+        if isinstance(condition, tuple):
+            low, high = condition
+            if self.param_types[name] == "float":
+                # Inclusive within the same tolerance as equality, so a bound
+                # of 0.15 keeps a grid value of 0.15000000000000002
+                low, high = _widen(low, -1.0), _widen(high, 1.0)
+            keys = [_sort_key(v) for v in values]
+            start = 0 if low is None else bisect.bisect_left(keys, _sort_key(low))
+            stop = len(values) if high is None else bisect.bisect_right(keys, _sort_key(high))
+            return values[start:stop]
+        if isinstance(condition, (list, set, frozenset)):
+            matches = []
+            for option in condition:
+                matches.extend(self._matching_values(name, option))
+            return matches
+        if self.param_types[name] == "float" and isinstance(condition, (int, float)):
+            return [v for v in values
+                    if math.isclose(v, condition, rel_tol=FLOAT_MATCH_TOLERANCE, abs_tol=1e-12)]
+        return [condition] if condition in self._postings[name] else []
+
+    def query(self, **conditions):
+        """
+        Returns the index entries ({"combo_key", "params", "offset", "length",
+        "rows"}) matching every condition, in file order.
+
+        Each condition is a value (equality; floats match within
+        FLOAT_MATCH_TOLERANCE), a (low, high) tuple for an inclusive range
+        (either bound may be None; float bounds are widened by the same
+        tolerance), or a list/set of accepted values.
+
+        :raises KeyError: for a parameter that was not swept
+        """
+        selected = None
+        for name, condition in conditions.items():
+            if name not in self._postings:
+                raise KeyError(f"'{name}' is not a swept parameter; expected one of {self.param_names}")
+            positions = set()
+            for value in self._matching_values(name, condition):
+                positions.update(self._postings[name][value])
+            selected = positions if selected is None else selected & positions
+            if not selected:
+                return []
+        if selected is None:
+            return list(self.entries)
+        return [self.entries[position] for position in sorted(selected)]
+
+    def fetch(self, entry):
+        """
+        Reads one combination's rows from the CSV and returns them as
+        {model_name: [{"step", "costs", "revenues"}, ...]}.
+        """
+        with open(self.csv_path, "rb") as f:
+            return self._read_entry(f, entry)
+
+    def fetch_many(self, entries):
+        """
+        Yields (entry, results) for each entry, reading the CSV with one
+        open file handle.
+        """
+        with open(self.csv_path, "rb") as f:
+            for entry in entries:
+                yield entry, self._read_entry(f, entry)
+
+    def _read_entry(self, f, entry):
+        f.seek(entry["offset"])
+        text = f.read(entry["length"]).decode("utf-8")
+        first_metric = 1 + len(self.param_names)
+        results = {}
+        for row in csv.reader(io.StringIO(text)):
+            results.setdefault(row[first_metric], []).append({
+                "step": int(row[first_metric + 1]),
+                "costs": float(row[first_metric + 2]),
+                "revenues": float(row[first_metric + 3]),
+            })
+        return results
+
+
+def _widen(bound, direction):
+    if not isinstance(bound, (int, float)) or isinstance(bound, bool):
+        return bound
+    return bound + direction * max(abs(bound) * FLOAT_MATCH_TOLERANCE, 1e-12)
+
+
+def _sort_key(value):
+    # Orders numbers numerically and everything else after them as text
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (0, value, "")
+    return (1, 0, str(value))
@@ -0,0 +1,202 @@
+# business_model_simulator/simulator/relevance.py
+
+"""
+Parameter relevance analysis for sweeps.
+
+Many sweep axes cannot affect one of the outputs: revenue_factor and
+revenue_tax_rate never touch costs, overhead_rate never touches revenues,
+and an operation's direct_cost only feeds costs. analyse_relevance() finds
+out which outputs each axis can change by probing the factory: it builds the
+model with one axis varied at a time, resolves it, and maps the resolved
+inputs that changed onto the outputs that read them (a static table for the
+base TransactionModel and Operation formulas; any input change seen by a
+class that overrides a formula counts for that formula's output).
+
+run_reduced_sweep() then evaluates costs only over the axes costs depend
+on and revenues only over their axes, and broadcasts both back to the full
+grid, so a grid shrinks by the size of every irrelevant axis.
+
+Probing assumes the factory maps each axis to model inputs independently of
+the other axes' values (true for factories that simply place parameters, such
+as scenario.ScenarioFactory); each axis is probed against two base points to
+catch the common exceptions. Use the plain sweep for factories with
+arbitrary branching on combinations of parameters.
+"""
+
+import itertools
+
+from .operation import Operation
+from .parameters import ParameterResolver, freeze
+from .transaction_model import TransactionModel
+
+OUTPUTS = ("costs", "revenues")
+
+# Transaction-level parameters read by the base TransactionModel formulas
+TRANSACTION_DEPENDENCIES = {
+    "growth_rate": {"costs", "revenues"},
+    "growth_factor": {"costs", "revenues"},
+    "overhead_rate": {"costs"},
+    "revenue_factor": {"revenues"},
+    "revenue_tax_rate": {"revenues"},
+}
+
+# Operation parameters read by the base Operation formulas
+OPERATION_DEPENDENCIES = {
+    "base_transaction_volume": {"costs", "revenues"},
+    "direct_cost": {"costs"},
+    "variable_cost": {"costs"},
+    "base_revenue": {"revenues"},
+    "revenue_per_unit": {"revenues"},
+    "gas_per_transaction": {"costs"},
+    "gas_price": {"costs"},
+}
+
+_TRANSACTION_FORMULAS = ("update_for_time_step", "calculate_costs", "calculate_revenues")
+
+
+def _overrides(cls, base, names):
+    return any(getattr(cls, name) is not getattr(base, name) for name in names)
+
+
+def _operation_signature(op):
+    return (type(op), op.name, op.contract_complexity,
+            freeze(getattr(op, "_complexity_multipliers", None)))
+
+
+def _changed_keys(before, after):
+    return {
+        key for key in set(before) | set(after)
+        if freeze(before.get(key)) != freeze(after.get(key))
+    }
+
+
+def affected_outputs(before, after):
+    """
+    Returns the set of outputs ("costs", "revenues") that can differ between
+    two ResolvedModels, plus "name" if the model name differs.
+    """
+    if before.name != after.name:
+        return set(OUTPUTS) | {"name"}
+    if (type(before.transaction_model) is not type(after.transaction_model)
+            or len(before.operations) != len(after.operations)):
+        return set(OUTPUTS)
+    if any(_operation_signature(a) != _operation_signature(b)
+           for a, b in zip(before.operations, after.operations)):
+        return set(OUTPUTS)
+
+    changed_tm = _changed_keys(before.parameters, after.parameters)
+    changed_ops = [
+        _changed_keys(a, b) for a, b in zip(before.operation_parameters, after.operation_parameters)
+    ]
+    if _overrides(type(after.transaction_model), TransactionModel, _TRANSACTION_FORMULAS):
+        # Custom transaction logic may read any parameter
+        return set(OUTPUTS) if changed_tm or any(changed_ops) else set()
+
+    outputs = set()
+    for key in changed_tm:
+        outputs |= TRANSACTION_DEPENDENCIES.get(key, set())
+    volume_changed = bool(changed_tm & {"growth_rate", "growth_factor"})
+
+    for op, changed in zip(after.operations, changed_ops):
+        for key in changed:
+            outputs |= OPERATION_DEPENDENCIES.get(key, set())
+        # Overridden formulas may read any of the operation's parameters
+        if changed or volume_changed:
+            if type(op).compute_cost is not Operation.compute_cost:
+                outputs.add("costs")
+            if type(op).compute_revenue is not Operation.compute_revenue:
+                outputs.add("revenues")
+    return outputs
+
+
+def analyse_relevance(param_grid, business_model_factory, global_parameters=None):
+    """
+    Returns {axis: frozenset of outputs it can change} for a sweep grid.
+    The sets may also contain "name" for axes that change the model name.
+
+    :param param_grid: dict of parameter name -> list of values
+    :param business_model_factory: callable returning a BusinessModel for a dict of parameters
+    :param global_parameters: dict of global parameters applied to every model
+    """
+    param_names = list(param_grid.keys())
+    resolver = ParameterResolver(max_entries=0)
+
+    def resolve(combo_params):
+        return resolver.resolve(business_model_factory(combo_params), global_parameters)
+
+    base_points = [
+        {name: param_grid[name][0] for name in param_names},
+        {name: param_grid[name][-1] for name in param_names},
+    ]
+    relevance = {}
+    for name in param_names:
+        outputs = set()
+        for base in base_points:
+            reference = resolve(base)
+            for value in param_grid[name]:
+                if outputs >= set(OUTPUTS):
+                    break
+                if value == base[name]:
+                    continue
+                outputs |= affected_outputs(reference, resolve(dict(base, **{name: value})))
+        relevance[name] = frozenset(outputs)
+    return relevance
+
+
+def _sub_grid_series(param_grid, relevant_axes, business_model_factory, simulation_period,
+                     global_parameters, output_index, dtype):
+    import numpy as np
+    from .vectorized import evaluate_models
+
+    param_names = list(param_grid.keys())
+    resolver = ParameterResolver(max_entries=0)
+    base = {name: param_grid[name][0] for name in param_names}
+    axes = [name for name in param_names if name in relevant_axes]
+    resolved_models = [
+        resolver.resolve(business_model_factory(dict(base, **dict(zip(axes, combo)))), global_parameters)
+        for combo in itertools.product(*(param_grid[name] for name in axes))
+    ]
+    series = evaluate_models(resolved_models, simulation_period, dtype)[output_index]
+
+    # Axes that were not evaluated become size-1 dimensions and broadcast
+    grid_shape = [len(param_grid[name]) if name in relevant_axes else 1 for name in param_names]
+    full_shape = [len(param_grid[name]) for name in param_names]
+    series = series.reshape(grid_shape + [simulation_period])
+    return np.broadcast_to(series, full_shape + [simulation_period]).reshape(-1, simulation_period)
+
+
+def run_reduced_sweep(param_grid, business_model_factory, simulation_period,
+                      global_parameters=None, relevance=None, dtype="float64"):
+    """
+    Equivalent of vectorized.run_vectorized_sweep that evaluates costs and
+    revenues only over the axes each depends on (see analyse_relevance) and
+    broadcasts them over the rest of the grid.
+
+    :param relevance: optional precomputed result of analyse_relevance
+    :param dtype: "float64" or "float32", dtype of the results
+    :return: vectorized.SweepArrays
+    """
+    from .vectorized import SweepArrays
+
+    if relevance is None:
+        relevance = analyse_relevance(param_grid, business_model_factory, global_parameters)
+    param_names = list(param_grid.keys())
+    combos = list(itertools.product(*(param_grid[name] for name in param_names)))
+
+    cost_axes = {name for name in param_names if "costs" in relevance[name]}
+    revenue_axes = {name for name in param_names if "revenues" in relevance[name]}
+    costs = _sub_grid_series(param_grid, cost_axes, business_model_factory, simulation_period,
+                             global_parameters, 0, dtype)
+    revenues = _sub_grid_series(param_grid, revenue_axes, business_model_factory, simulation_period,
+                                global_parameters, 1, dtype)
+
+    # Model names only need the factory, evaluated over the axes that change them
+    name_axes = [name for name in param_names if "name" in relevance[name]]
+    base = {name: param_grid[name][0] for name in param_names}
+    names = {
+        combo: business_model_factory(dict(base, **dict(zip(name_axes, combo)))).name
+        for combo in itertools.product(*(param_grid[name] for name in name_axes))
+    }
+    positions = [param_names.index(name) for name in name_axes]
+    model_names = [names[tuple(combo[p] for p in positions)] for combo in combos]
+    return SweepArrays(param_names, combos, model_names, costs, revenues)
@@ -0,0 +1,50 @@
+# business_model_simulator/simulator/sample.py
+
+from .business_model import BusinessModel
+from .transaction_model import TransactionModel
+from .operation import Operation
+
+
+def create_sample_business_model(combo_params):
+    """
+    Factory function that creates a new BusinessModel (and underlying
+    TransactionModel/Operations) for the given parameter combination.
+
+    Used as the default --factory of the command line interface and by the
+    example scripts. Recognised parameters: growth_rate, overhead_rate and
+    revenue_factor.
+
+    :param combo_params: dict of parameter name -> value
+    """
+    # Example operation
+    sample_op = Operation(
+        name="SampleOperation",
+        parameters={
+            "base_transaction_volume": 100,
+            "direct_cost": 2.0,
+            "variable_cost": 0.8,
+            "kyc_fee": 5.0,           # if relevant for contract_complexity
+            "base_revenue": 5.0,
+            "revenue_per_unit": 2.0
+        },
+        contract_complexity="High"
+    )
+
+    # Attach the operation to a TransactionModel
+    tx_model = TransactionModel(
+        operations=[sample_op],
+        parameters={
+            "growth_rate": combo_params.get("growth_rate", 0.0),
+            "overhead_rate": combo_params.get("overhead_rate", 0.0),
+            "revenue_factor": combo_params.get("revenue_factor", 1.0),
+            "revenue_tax_rate": 0.02
+        }
+    )
+
+    # Create the business model
+    bm = BusinessModel(
+        name="ParameterSweepModel",
+        transaction_model=tx_model,
+        parameters={}
+    )
+    return bm
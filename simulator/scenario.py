@@ -0,0 +1,555 @@
+# business_model_simulator/simulator/scenario.py
+
+"""
+Declarative scenario files.
+
+A scenario describes operations, transaction/business model parameters,
+global parameters and an optional sweep grid in JSON, TOML or YAML:
+
+    {
+      "simulation_period": 12,
+      "global_parameters": {"base_gas_price": 0.1},
+      "business_models": [{
+        "name": "CDIPBusinessModel",
+        "parameters": {"user_adoption_rate": 0.1},
+        "transaction_model": {
+          "parameters": {"overhead_rate": 0.05, "revenue_tax_rate": 0.02},
+          "operations": [{
+            "class": "cdip.audit_operation.AuditOperation",
+            "name": "Audit",
+            "parameters": {"execution_cost": 3.0, "legal_cost": 4.0},
+            "contract_complexity": "High"
+          }]
+        }
+      }],
+      "sweep": {"grid": {"overhead_rate": [0.03, 0.05],
+                         "business_model.user_adoption_rate": {"start": 0.05, "stop": 0.2, "step": 0.05},
+                         "Audit.legal_cost": [4.0, 6.0]}}
+    }
+
+Any parameter value may be a schedule:
+    {"schedule": "piecewise", "breakpoints": {"0": 0.1, "6": 0.15}}
+    {"schedule": "interpolated", "points": {"0": 0.05, "11": 0.1}}
+    {"schedule": "array", "values": [...]}
+
+Sweep axes are plain transaction model parameter names, or qualified as
+"business_model.<name>", "transaction_model.<name>" or "<operation>.<name>".
+
+load_scenario() validates a file once and compiles it into a
+CompiledScenario. Compiled scenarios are cached in memory and on disk, keyed
+by the SHA-256 of the file contents, so later launches skip parsing and
+validation entirely.
+
+The disk cache holds the validated, normalised scenario as JSON: classes are
+stored as import paths and re-imported on load, schedules as their spec
+dicts. Nothing executable is deserialised from the cache, and an entry is
+discarded when any module defining a referenced class has changed since it
+was written.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import sys
+
+from .business_model import BusinessModel
+from .operation import Operation
+from .transaction_model import TransactionModel
+from .schedules import PiecewiseSchedule, InterpolatedSchedule, ArraySchedule
+from .utils import arange, import_object
+
+# Bump when the compiled representation changes so stale disk caches are ignored
+COMPILER_VERSION = 2
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+    "business_model_simulator",
+    "scenarios"
+)
+
+TOP_LEVEL_KEYS = {"simulation_period", "global_parameters", "business_models", "sweep"}
+BUSINESS_MODEL_KEYS = {"name", "parameters", "transaction_model"}
+TRANSACTION_MODEL_KEYS = {"class", "parameters", "operations"}
+OPERATION_KEYS = {"class", "name", "parameters", "contract_complexity"}
+SWEEP_KEYS = {"grid", "business_model"}
+
+_memory_cache = {}
+
+
+class ScenarioError(ValueError):
+    """
+    Raised when a scenario file cannot be parsed or fails validation.
+    """
+
+
+def _parse_text(data, path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".json":
+        return json.loads(data)
+    if extension == ".toml":
+        try:
+            import tomllib
+        except ImportError:
+            try:
+                import tomli as tomllib
+            except ImportError:
+                raise ScenarioError("Reading TOML scenarios requires Python 3.11+ or the 'tomli' package")
+        return tomllib.loads(data.decode("utf-8"))
+    if extension in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ScenarioError("Reading YAML scenarios requires the 'PyYAML' package")
+        return yaml.safe_load(data)
+    raise ScenarioError(f"Unsupported scenario format '{extension}' (use .json, .toml, .yaml or .yml)")
+
+
+def _check_keys(where, mapping, allowed, required=()):
+    if not isinstance(mapping, dict):
+        raise ScenarioError(f"{where}: expected a mapping, got {type(mapping).__name__}")
+    unknown = set(mapping) - allowed
+    if unknown:
+        raise ScenarioError(f"{where}: unknown keys {sorted(unknown)}")
+    for key in required:
+        if key not in mapping:
+            raise ScenarioError(f"{where}: missing required key '{key}'")
+
+
+def _build_schedule(value):
+    kind = value["schedule"]
+    if kind == "piecewise":
+        return PiecewiseSchedule(value["breakpoints"], initial=value.get("initial"))
+    if kind == "interpolated":
+        return InterpolatedSchedule(value["points"])
+    if kind == "array":
+        return ArraySchedule(value["values"])
+    raise ValueError(f"unknown schedule type '{kind}'")
+
+
+def _normalise_value(where, value):
+    """
+    Validates a parameter value and returns it in JSON-compatible form.
+    """
+    if isinstance(value, dict) and "schedule" in value:
+        kind = value["schedule"]
+        if kind not in ("piecewise", "interpolated", "array"):
+            raise ScenarioError(f"{where}: unknown schedule type '{kind}'")
+        try:
+            _build_schedule(value)
+        except (KeyError, TypeError, ValueError) as exc:
+            raise ScenarioError(f"{where}: invalid {kind} schedule ({exc})")
+        return json.loads(json.dumps(value))
+    if isinstance(value, (bool, int, float, str)) or value is None:
+        return value
+    if isinstance(value, list):
+        return [_normalise_value(f"{where}[{i}]", v) for i, v in enumerate(value)]
+    if isinstance(value, dict):
+        return {str(k): _normalise_value(f"{where}.{k}", v) for k, v in value.items()}
+    raise ScenarioError(f"{where}: unsupported value of type {type(value).__name__}")
+
+
+def _build_value(value):
+    """
+    Turns a normalised value into its engine form (schedule specs become Schedules).
+    """
+    if isinstance(value, dict) and "schedule" in value:
+        return _build_schedule(value)
+    if isinstance(value, list):
+        return [_build_value(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _build_value(v) for k, v in value.items()}
+    return value
+
+
+def _compile_parameters(where, parameters):
+    if parameters is None:
+        return {}
+    if not isinstance(parameters, dict):
+        raise ScenarioError(f"{where}: expected a mapping of parameters")
+    return {str(k): _normalise_value(f"{where}.{k}", v) for k, v in parameters.items()}
+
+
+def _check_class(where, path, base):
+    """
+    Checks that path imports a subclass of base and returns path unchanged
+    (None selects the base class).
+    """
+    if path is None:
+        return None
+    if not isinstance(path, str):
+        raise ScenarioError(f"{where}: expected an import path string")
+    try:
+        cls = import_object(path)
+    except (ImportError, AttributeError, ValueError) as exc:
+        raise ScenarioError(f"{where}: cannot import '{path}' ({exc})")
+    if not (isinstance(cls, type) and issubclass(cls, base)):
+        raise ScenarioError(f"{where}: '{path}' is not a subclass of {base.__name__}")
+    return path
+
+
+def _compile_grid_axis(where, values):
+    if isinstance(values, dict):
+        _check_keys(where, values, {"start", "stop", "step"}, required=("start", "stop", "step"))
+        try:
+            values = arange(float(values["start"]), float(values["stop"]), float(values["step"]))
+        except (TypeError, ValueError, ZeroDivisionError) as exc:
+            raise ScenarioError(f"{where}: invalid range ({exc})")
+    if not isinstance(values, list) or not values:
+        raise ScenarioError(f"{where}: expected a non-empty list or a start/stop/step range")
+    return [_normalise_value(f"{where}[{i}]", v) for i, v in enumerate(values)]
+
+
+class ScenarioFactory:
+    """
+    Picklable business model factory for one model of a compiled scenario.
+    Called with a dict of sweep parameters, it returns a fresh BusinessModel
+    with those parameters applied at their target layer.
+    """
+
+    def __init__(self, model_spec):
+        self.model_spec = model_spec
+
+    def __call__(self, combo_params=None):
+        spec = self.model_spec
+        tm_spec = spec["transaction_model"]
+
+        bm_params = copy.deepcopy(spec["parameters"])
+        tm_params = copy.deepcopy(tm_spec["parameters"])
+        op_params = [copy.deepcopy(op["parameters"]) for op in tm_spec["operations"]]
+        op_index = {op["name"]: i for i, op in enumerate(tm_spec["operations"])}
+
+        for axis, value in (combo_params or {}).items():
+            target, _, name = axis.rpartition(".")
+            if target == "business_model":
+                bm_params[name] = value
+            elif target in ("", "transaction_model"):
+                tm_params[name] = value
+            else:
+                op_params[op_index[target]][name] = value
+
+        operations = [
+            op["class"](
+                name=op["name"],
+                parameters=params,
+                contract_complexity=op["contract_complexity"]
+            )
+            for op, params in zip(tm_spec["operations"], op_params)
+        ]
+        tx_model = tm_spec["class"](operations=operations, parameters=tm_params)
+        return BusinessModel(name=spec["name"], transaction_model=tx_model, parameters=bm_params)
+
+
+class CompiledScenario:
+    """
+    Validated, engine-ready form of a scenario file.
+    """
+
+    def __init__(self, simulation_period, global_parameters, models, param_grid, sweep_model,
+                 digest=None):
+        """
+        :param simulation_period: int, number of time steps
+        :param global_parameters: dict of global parameters
+        :param models: list of normalised business model specs
+        :param param_grid: dict of sweep axis -> list of values (may be empty)
+        :param sweep_model: str, name of the business model the sweep applies to
+        :param digest: str, SHA-256 of the source file
+        """
+        self.simulation_period = simulation_period
+        self.global_parameters = global_parameters
+        self.models = models
+        self.param_grid = param_grid
+        self.sweep_model = sweep_model
+        self.digest = digest
+
+    @property
+    def model_names(self):
+        return [model["name"] for model in self.models]
+
+    def factory(self, name=None):
+        """
+        Returns a ScenarioFactory for the named business model (default: the
+        sweep target, or the first model).
+        """
+        name = name or self.sweep_model or self.models[0]["name"]
+        for model in self.models:
+            if model["name"] == name:
+                return ScenarioFactory(model)
+        raise KeyError(f"Scenario has no business model named '{name}'")
+
+    def build_simulator(self, overrides=None):
+        """
+        Returns a Simulator with every business model registered.
+
+        :param overrides: optional dict of sweep-style parameter overrides
+            (e.g. {"overhead_rate": 0.04}) applied to every model
+        """
+        from .simulator import Simulator
+
+        sim = Simulator(
+            simulation_period=self.simulation_period,
+            global_parameters=dict(self.global_parameters)
+        )
+        for model in self.models:
+            sim.add_business_model(ScenarioFactory(model)(overrides))
+        return sim
+
+
+def compile_scenario(document, digest=None):
+    """
+    Validates a parsed scenario document and returns a CompiledScenario.
+
+    :raises ScenarioError: describing the first problem found
+    """
+    return build_scenario(normalise_scenario(document), digest=digest)
+
+
+def normalise_scenario(document):
+    """
+    Validates a parsed scenario document and returns its normalised form: a
+    JSON-compatible dict with defaults filled in, sweep ranges expanded and
+    classes given as import paths (None for the base classes).
+
+    :raises ScenarioError: describing the first problem found
+    """
+    _check_keys("scenario", document, TOP_LEVEL_KEYS, required=("business_models",))
+
+    simulation_period = document.get("simulation_period", 10)
+    if not isinstance(simulation_period, int) or isinstance(simulation_period, bool) or simulation_period < 0:
+        raise ScenarioError("simulation_period: expected a non-negative integer")
+
+    global_parameters = _compile_parameters("global_parameters", document.get("global_parameters"))
+
+    raw_models = document["business_models"]
+    if not isinstance(raw_models, list) or not raw_models:
+        raise ScenarioError("business_models: expected a non-empty list")
+
+    models = []
+    for i, raw_model in enumerate(raw_models):
+        where = f"business_models[{i}]"
+        _check_keys(where, raw_model, BUSINESS_MODEL_KEYS, required=("name",))
+        raw_tm = raw_model.get("transaction_model", {})
+        _check_keys(f"{where}.transaction_model", raw_tm, TRANSACTION_MODEL_KEYS)
+
+        operations = []
+        raw_ops = raw_tm.get("operations", [])
+        if not isinstance(raw_ops, list):
+            raise ScenarioError(f"{where}.transaction_model.operations: expected a list")
+        for j, raw_op in enumerate(raw_ops):
+            op_where = f"{where}.transaction_model.operations[{j}]"
+            _check_keys(op_where, raw_op, OPERATION_KEYS, required=("name",))
+            complexity = raw_op.get("contract_complexity")
+            if complexity is not None and not isinstance(complexity, str):
+                raise ScenarioError(f"{op_where}.contract_complexity: expected a string")
+            operations.append({
+                "class": _check_class(f"{op_where}.class", raw_op.get("class"), Operation),
+                "name": str(raw_op["name"]),
+                "parameters": _compile_parameters(f"{op_where}.parameters", raw_op.get("parameters")),
+                "contract_complexity": complexity,
+            })
+
+        names = [op["name"] for op in operations]
+        if len(set(names)) != len(names):
+            raise ScenarioError(f"{where}.transaction_model.operations: operation names must be unique")
+
+        models.append({
+            "name": str(raw_model["name"]),
+            "parameters": _compile_parameters(f"{where}.parameters", raw_model.get("parameters")),
+            "transaction_model": {
+                "class": _check_class(
+                    f"{where}.transaction_model.class", raw_tm.get("class"), TransactionModel
+                ),
+                "parameters": _compile_parameters(
+                    f"{where}.transaction_model.parameters", raw_tm.get("parameters")
+                ),
+                "operations": operations,
+            },
+        })
+
+    model_names = [model["name"] for model in models]
+    if len(set(model_names)) != len(model_names):
+        raise ScenarioError("business_models: names must be unique")
+
+    raw_sweep = document.get("sweep", {})
+    _check_keys("sweep", raw_sweep, SWEEP_KEYS)
+    sweep_model = raw_sweep.get("business_model", model_names[0])
+    if sweep_model not in model_names:
+        raise ScenarioError(f"sweep.business_model: unknown business model '{sweep_model}'")
+
+    target_ops = {
+        op["name"]
+        for model in models if model["name"] == sweep_model
+        for op in model["transaction_model"]["operations"]
+    }
+    param_grid = {}
+    raw_grid = raw_sweep.get("grid", {})
+    if not isinstance(raw_grid, dict):
+        raise ScenarioError("sweep.grid: expected a mapping of axis -> values")
+    for axis, values in raw_grid.items():
+        target = axis.rpartition(".")[0]
+        if target not in ("", "business_model", "transaction_model") and target not in target_ops:
+            raise ScenarioError(f"sweep.grid.{axis}: unknown operation '{target}'")
+        param_grid[axis] = _compile_grid_axis(f"sweep.grid.{axis}", values)
+
+    return {
+        "simulation_period": simulation_period,
+        "global_parameters": global_parameters,
+        "models": models,
+        "param_grid": param_grid,
+        "sweep_model": sweep_model,
+    }
+
+
+def _load_class(path, default):
+    return default if path is None else import_object(path)
+
+
+def build_scenario(spec, digest=None):
+    """
+    Builds a CompiledScenario from a normalised scenario (see
+    normalise_scenario), importing classes and constructing schedules.
+    """
+    models = []
+    for model in spec["models"]:
+        tm_spec = model["transaction_model"]
+        models.append({
+            "name": model["name"],
+            "parameters": _build_value(model["parameters"]),
+            "transaction_model": {
+                "class": _load_class(tm_spec["class"], TransactionModel),
+                "parameters": _build_value(tm_spec["parameters"]),
+                "operations": [
+                    {
+                        "class": _load_class(op["class"], Operation),
+                        "name": op["name"],
+                        "parameters": _build_value(op["parameters"]),
+                        "contract_complexity": op["contract_complexity"],
+                    }
+                    for op in tm_spec["operations"]
+                ],
+            },
+        })
+
+    return CompiledScenario(
+        simulation_period=spec["simulation_period"],
+        global_parameters=_build_value(spec["global_parameters"]),
+        models=models,
+        param_grid=_build_value(spec["param_grid"]),
+        sweep_model=spec["sweep_model"],
+        digest=digest,
+    )
+
+
+def _cache_path(cache_dir, digest):
+    return os.path.join(cache_dir, f"{digest}.v{COMPILER_VERSION}.json")
+
+
+def _class_paths(spec):
+    for model in spec["models"]:
+        tm_spec = model["transaction_model"]
+        if tm_spec["class"] is not None:
+            yield tm_spec["class"]
+        for op in tm_spec["operations"]:
+            if op["class"] is not None:
+                yield op["class"]
+
+
+def _module_stamps(spec):
+    """
+    Returns {module name: [file, mtime_ns, size]} for every module defining a
+    class referenced by spec, so cache entries go stale when that code changes.
+    """
+    stamps = {}
+    for path in _class_paths(spec):
+        module_name = import_object(path).__module__
+        if module_name in stamps:
+            continue
+        filename = getattr(sys.modules.get(module_name), "__file__", None)
+        if filename is None:
+            stamps[module_name] = None
+            continue
+        stat = os.stat(filename)
+        stamps[module_name] = [filename, stat.st_mtime_ns, stat.st_size]
+    return stamps
+
+
+def _read_cache(cache_dir, digest):
+    """
+    Returns the cached CompiledScenario for digest, or None if there is no
+    usable entry.
+    """
+    try:
+        with open(_cache_path(cache_dir, digest), "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        if entry.get("compiler_version") != COMPILER_VERSION or entry.get("digest") != digest:
+            return None
+        spec = entry["spec"]
+        if _module_stamps(spec) != entry["modules"]:
+            return None
+        return build_scenario(spec, digest=digest)
+    except (OSError, ValueError, KeyError, TypeError, ImportError, AttributeError):
+        return None
+
+
+def load_scenario(path, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Loads, validates and compiles a scenario file.
+
+    The compiled scenario is cached in memory and (unless cache_dir is None)
+    on disk, keyed by the SHA-256 of the file's bytes. A cache hit skips
+    parsing and validation; editing the file changes its hash and forces a
+    recompile, as does changing a module that defines a referenced class.
+
+    The disk cache is plain JSON and is never executed, but it is trusted to
+    have been written by this function: keep cache_dir private to the user.
+
+    :param path: str, path to a .json, .toml, .yaml or .yml scenario
+    :param cache_dir: str or None, directory for the on-disk cache
+    :return: CompiledScenario
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+
+    compiled = _memory_cache.get(digest)
+    if compiled is not None:
+        return compiled
+
+    if cache_dir is not None:
+        compiled = _read_cache(cache_dir, digest)
+
+    if compiled is None:
+        spec = normalise_scenario(_parse_text(data, path))
+        compiled = build_scenario(spec, digest=digest)
+        if cache_dir is not None:
+            _write_cache(cache_dir, digest, spec)
+
+    _memory_cache[digest] = compiled
+    return compiled
+
+
+def _write_cache(cache_dir, digest, spec):
+    target = _cache_path(cache_dir, digest)
+    temporary = f"{target}.{os.getpid()}.tmp"
+    entry = {
+        "compiler_version": COMPILER_VERSION,
+        "digest": digest,
+        "modules": _module_stamps(spec),
+        "spec": spec,
+    }
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(temporary, target)
+    except OSError:
+        # The cache is an optimisation only; a read-only or full disk is not an error
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def clear_memory_cache():
+    """
+    Drops compiled scenarios cached in this process.
+    """
+    _memory_cache.clear()
@@ -0,0 +1,192 @@
+# business_model_simulator/simulator/schedules.py
+
+# NumPy is imported inside the methods that need it so that building models
+# without schedules (the pure-Python engine path) does not pay its import cost.
+
+
+class Schedule:
+    """
+    A parameter value that varies over the simulation's time steps.
+
+    Any transaction model, business model, global or operation parameter may be
+    given as a Schedule instead of a plain number. Schedules are materialised
+    once per run into a NumPy array of length simulation_period, and the engine
+    reads the value for each step from that array.
+    """
+
+    def materialize(self, simulation_period):
+        """
+        Returns a float64 array of shape (simulation_period,) holding the value
+        for each time step. Subclasses must override this method.
+        """
+        raise NotImplementedError
+
+    def fingerprint(self):
+        """
+        Returns a hashable key describing this schedule (used for caching).
+        """
+        raise NotImplementedError
+
+    def __add__(self, other):
+        return SumSchedule(self, other)
+
+    def __radd__(self, other):
+        return SumSchedule(other, self)
+
+
+class PiecewiseSchedule(Schedule):
+    """
+    Step-wise constant schedule, e.g. a gas price that changes at given steps.
+
+    Example:
+        PiecewiseSchedule({0: 0.1, 6: 0.15, 9: 0.2})
+    holds 0.1 for steps 0-5, 0.15 for steps 6-8 and 0.2 from step 9 onwards.
+    """
+
+    def __init__(self, breakpoints, initial=None):
+        """
+        :param breakpoints: dict, step -> value taking effect from that step
+        :param initial: float, value before the first breakpoint; defaults to
+            the value of the first breakpoint
+        """
+        if not breakpoints:
+            raise ValueError("PiecewiseSchedule requires at least one breakpoint")
+        self.breakpoints = dict(sorted((int(k), float(v)) for k, v in breakpoints.items()))
+        first_value = next(iter(self.breakpoints.values()))
+        self.initial = float(initial) if initial is not None else first_value
+
+    def materialize(self, simulation_period):
+        import numpy as np
+        values = np.full(simulation_period, self.initial, dtype=np.float64)
+        for step, value in self.breakpoints.items():
+            if step < simulation_period:
+                values[max(step, 0):] = value
+        return values
+
+    def fingerprint(self):
+        return ("piecewise", tuple(self.breakpoints.items()), self.initial)
+
+
+class InterpolatedSchedule(Schedule):
+    """
+    Linearly interpolated schedule between (step, value) points, e.g. a ramping
+    overhead_rate. Values before the first or after the last point are held flat.
+    """
+
+    def __init__(self, points):
+        """
+        :param points: dict, step -> value at that step
+        """
+        if not points:
+            raise ValueError("InterpolatedSchedule requires at least one point")
+        self.points = dict(sorted((float(k), float(v)) for k, v in points.items()))
+
+    def materialize(self, simulation_period):
+        import numpy as np
+        steps = np.arange(simulation_period, dtype=np.float64)
+        xp = np.fromiter(self.points.keys(), dtype=np.float64)
+        fp = np.fromiter(self.points.values(), dtype=np.float64)
+        return np.interp(steps, xp, fp)
+
+    def fingerprint(self):
+        return ("interpolated", tuple(self.points.items()))
+
+
+class ArraySchedule(Schedule):
+    """
+    Explicit per-step values, e.g. a promotion calendar for revenue_per_unit.
+    """
+
+    def __init__(self, values):
+        """
+        :param values: sequence of floats, one per time step. Must cover at
+            least the simulation_period it is used with.
+        """
+        import numpy as np
+        self.values = np.array(values, dtype=np.float64).reshape(-1)
+        self.values.setflags(write=False)
+
+    def materialize(self, simulation_period):
+        if len(self.values) < simulation_period:
+            raise ValueError(
+                f"ArraySchedule has {len(self.values)} values but the simulation "
+                f"period is {simulation_period}"
+            )
+        return self.values[:simulation_period].copy()
+
+    def fingerprint(self):
+        return ("array", self.values.tobytes())
+
+
+class SumSchedule(Schedule):
+    """
+    Sum of two schedules or a schedule and a constant. Produced when business
+    model adjustments (e.g. cost_scaling_factor) are added to a scheduled
+    parameter.
+    """
+
+    def __init__(self, left, right):
+        self.left = left
+        self.right = right
+
+    def materialize(self, simulation_period):
+        return (
+            materialize_value(self.left, simulation_period)
+            + materialize_value(self.right, simulation_period)
+        )
+
+    def fingerprint(self):
+        return ("sum", _fingerprint(self.left), _fingerprint(self.right))
+
+
+def _fingerprint(value):
+    return value.fingerprint() if isinstance(value, Schedule) else value
+
+
+def is_schedule(value):
+    """
+    Returns True if value is a Schedule.
+    """
+    return isinstance(value, Schedule)
+
+
+def materialize_value(value, simulation_period):
+    """
+    Returns value as a float64 array over simulation_period, broadcasting
+    constants.
+    """
+    import numpy as np
+    if isinstance(value, Schedule):
+        return value.materialize(simulation_period)
+    return np.full(simulation_period, float(value), dtype=np.float64)
+
+
+def materialize_schedules(parameters, simulation_period):
+    """
+    Materialises every scheduled entry of a parameter dict.
+
+    :param parameters: mapping of parameter name -> value or Schedule
+    :param simulation_period: int, number of time steps
+    :return: dict of parameter name -> read-only float64 array
+    """
+    arrays = {}
+    for key, value in parameters.items():
+        if isinstance(value, Schedule):
+            values = value.materialize(simulation_period)
+            values.setflags(write=False)
+            arrays[key] = values
+    return arrays
+
+
+def compound_growth(growth_rates):
+    """
+    Returns the cumulative growth factor for each step of a time-varying
+    growth rate: factor[t] = prod(1 + growth_rates[s] for s < t), with
+    factor[0] = 1. For a constant rate g this equals (1 + g) ** t.
+    """
+    import numpy as np
+    growth_rates = np.asarray(growth_rates, dtype=np.float64)
+    factors = np.ones(growth_rates.shape, dtype=np.float64)
+    if growth_rates.shape[-1] > 1:
+        factors[..., 1:] = np.cumprod(1.0 + growth_rates[..., :-1], axis=-1)
+    return factors
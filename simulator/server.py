@@ -0,0 +1,327 @@
+# business_model_simulator/simulator/server.py
+
+"""
+Long-running what-if service.
+
+A planning UI that starts a fresh process per query pays for imports,
+scenario construction and a full run every time. WhatIfService keeps the
+compiled scenario (or factory) and an LRU cache of results resident, and
+create_server() exposes it over HTTP on localhost:
+
+    POST /evaluate   {"parameters": {"overhead_rate": 0.04},
+                      "model": "CDIPBusinessModel",      (optional)
+                      "summary": true,                   (optional)
+                      "metrics": ["npv"], "discount_rate": 0.1}
+    GET  /health
+    GET  /metrics    request counts, cache hits and latency percentiles
+
+Parameters use the sweep axis names of the scenario (e.g.
+"business_model.user_adoption_rate" or "Audit.legal_cost"). Requests are
+served concurrently on threads; identical queries are answered from the
+cache. Start it with `python -m simulator serve --scenario FILE`.
+"""
+
+import collections
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .parameters import ParameterResolver, freeze
+from .simulator import run_resolved_model
+
+# Latency samples kept per endpoint for the percentiles in /metrics
+LATENCY_WINDOW = 2048
+
+# Largest request body accepted, in bytes
+MAX_BODY_BYTES = 1 << 20
+
+
+class RequestError(ValueError):
+    """
+    Raised for a request the service cannot answer (unknown model, invalid
+    parameters); reported to the client as HTTP 400.
+    """
+
+
+class LatencyStats:
+    """
+    Thread-safe request counters and latency percentiles per endpoint.
+    """
+
+    def __init__(self, window=LATENCY_WINDOW):
+        """
+        :param window: int, number of recent samples kept per endpoint
+        """
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._counts = collections.Counter()
+        self._errors = collections.Counter()
+
+    def record(self, endpoint, seconds, error=False):
+        with self._lock:
+            if endpoint not in self._samples:
+                self._samples[endpoint] = collections.deque(maxlen=self.window)
+            self._samples[endpoint].append(seconds)
+            self._counts[endpoint] += 1
+            if error:
+                self._errors[endpoint] += 1
+
+    def snapshot(self):
+        """
+        Returns {endpoint: {"count", "errors", "mean_ms", "p50_ms", "p95_ms",
+        "p99_ms", "max_ms"}}; percentiles cover the most recent samples.
+        """
+        with self._lock:
+            samples = {name: sorted(values) for name, values in self._samples.items()}
+            counts = dict(self._counts)
+            errors = dict(self._errors)
+
+        def percentile(values, fraction):
+            return values[min(len(values) - 1, int(fraction * len(values)))] * 1000.0
+
+        return {
+            name: {
+                "count": counts[name],
+                "errors": errors.get(name, 0),
+                "mean_ms": sum(values) / len(values) * 1000.0,
+                "p50_ms": percentile(values, 0.50),
+                "p95_ms": percentile(values, 0.95),
+                "p99_ms": percentile(values, 0.99),
+                "max_ms": values[-1] * 1000.0,
+            }
+            for name, values in samples.items()
+        }
+
+
+class WhatIfService:
+    """
+    Evaluates business models for parameter overrides, keeping factories and
+    recent results in memory.
+    """
+
+    def __init__(self, factories, simulation_period, global_parameters=None,
+                 default_model=None, cache_size=1024):
+        """
+        :param factories: dict of model name -> callable(parameters) returning a BusinessModel
+        :param simulation_period: int, number of time steps
+        :param global_parameters: dict of global parameters
+        :param default_model: str, model evaluated when a request names none
+            (default: the first factory)
+        :param cache_size: int, number of evaluated results kept
+        """
+        if not factories:
+            raise ValueError("WhatIfService needs at least one business model factory")
+        self.factories = dict(factories)
+        self.simulation_period = simulation_period
+        self.global_parameters = dict(global_parameters or {})
+        self.default_model = default_model or next(iter(self.factories))
+        self.cache_size = cache_size
+        self.stats = LatencyStats()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_scenario(cls, scenario, simulation_period=None, global_parameters=None, **kwargs):
+        """
+        Builds a service over every business model of a CompiledScenario.
+
+        :param global_parameters: dict of globals overriding the scenario's
+        """
+        merged = dict(scenario.global_parameters)
+        merged.update(global_parameters or {})
+        return cls(
+            {name: scenario.factory(name) for name in scenario.model_names},
+            simulation_period or scenario.simulation_period,
+            merged,
+            default_model=scenario.sweep_model,
+            **kwargs
+        )
+
+    def warm_up(self):
+        """
+        Evaluates every model once with no overrides, so the first real
+        request does not pay for lazy imports and first-call setup.
+        """
+        for name in self.factories:
+            self.evaluate({}, model=name)
+        return self
+
+    def _run(self, name, parameters):
+        try:
+            business_model = self.factories[name](dict(parameters))
+        except (KeyError, TypeError, ValueError) as exc:
+            raise RequestError(f"Invalid parameters for '{name}': {exc}") from exc
+        resolved = ParameterResolver(max_entries=0).resolve(business_model, self.global_parameters)
+        return run_resolved_model(resolved, self.simulation_period)
+
+    def evaluate(self, parameters, model=None):
+        """
+        Returns (records, cached) for one model under parameter overrides,
+        where records is the list of {"step", "costs", "revenues"} of a run.
+
+        :param parameters: dict of sweep-style parameter overrides
+        :param model: str, business model name (default: default_model)
+        :raises RequestError: for an unknown model or parameters the factory rejects
+        """
+        name = model or self.default_model
+        if name not in self.factories:
+            raise RequestError(f"Unknown business model '{name}'; expected one of {list(self.factories)}")
+        key = (name, freeze(parameters))
+        with self._lock:
+            records = self._cache.get(key)
+            if records is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return records, True
+            self.cache_misses += 1
+
+        # Evaluated outside the lock so concurrent misses do not serialise
+        records = self._run(name, parameters)
+        with self._lock:
+            self._cache[key] = records
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return records, False
+
+    def answer(self, request):
+        """
+        Answers one /evaluate request document (see the module docstring) and
+        returns the response document.
+        """
+        if not isinstance(request, dict):
+            raise RequestError("Expected a JSON object")
+        parameters = request.get("parameters") or {}
+        if not isinstance(parameters, dict):
+            raise RequestError("'parameters' must be an object of name -> value")
+        records, cached = self.evaluate(parameters, request.get("model"))
+
+        response = {"model": request.get("model") or self.default_model, "cached": cached}
+        if request.get("summary"):
+            total_costs = sum(r["costs"] for r in records)
+            total_revenues = sum(r["revenues"] for r in records)
+            response["summary"] = {
+                "total_costs": total_costs,
+                "total_revenues": total_revenues,
+                "total_profit": total_revenues - total_costs,
+            }
+        else:
+            response["results"] = records
+
+        if request.get("metrics"):
+            from .metrics import compute_metrics
+            try:
+                computed = compute_metrics(
+                    [r["costs"] for r in records], [r["revenues"] for r in records],
+                    metrics=request["metrics"], discount_rate=float(request.get("discount_rate", 0.0))
+                )
+            except (TypeError, ValueError) as exc:
+                raise RequestError(str(exc)) from exc
+            response["metrics"] = {
+                name: value.tolist() if hasattr(value, "tolist") else value
+                for name, value in computed.items()
+            }
+        return response
+
+    def status(self):
+        """
+        Returns the /metrics document: latency per endpoint and cache counters.
+        """
+        with self._lock:
+            cache = {"entries": len(self._cache), "capacity": self.cache_size,
+                     "hits": self.cache_hits, "misses": self.cache_misses}
+        return {"latency": self.stats.snapshot(), "cache": cache}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keep connections open between requests from the same client
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, document):
+        body = json.dumps(document).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _timed(self, endpoint, handle):
+        started = time.perf_counter()
+        status, document = handle()
+        elapsed = time.perf_counter() - started
+        if isinstance(document, dict) and endpoint == "/evaluate" and status == 200:
+            document["elapsed_ms"] = elapsed * 1000.0
+        self._send(status, document)
+        self.server.service.stats.record(endpoint, time.perf_counter() - started, error=status != 200)
+
+    def do_GET(self):
+        service = self.server.service
+        if self.path == "/health":
+            self._timed("/health", lambda: (200, {"status": "ok", "models": list(service.factories)}))
+        elif self.path == "/metrics":
+            self._timed("/metrics", lambda: (200, service.status()))
+        else:
+            self._send(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/evaluate":
+            self._send(404, {"error": f"Unknown path {self.path}"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self._send(413, {"error": f"Request body above {MAX_BODY_BYTES} bytes"})
+            self.close_connection = True
+            return
+        body = self.rfile.read(length)
+
+        def handle():
+            try:
+                request = json.loads(body or b"{}")
+            except ValueError as exc:
+                return 400, {"error": f"Invalid JSON: {exc}"}
+            try:
+                return 200, self.server.service.answer(request)
+            except RequestError as exc:
+                return 400, {"error": str(exc)}
+
+        self._timed("/evaluate", handle)
+
+
+class WhatIfServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server answering what-if requests from a WhatIfService.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, service, host="127.0.0.1", port=0, verbose=False):
+        """
+        :param service: WhatIfService
+        :param host: str, interface to bind (localhost by default)
+        :param port: int, port to bind (0 picks a free one; see server_port)
+        :param verbose: bool, log each request to stderr
+        """
+        self.service = service
+        self.verbose = verbose
+        super().__init__((host, port), _Handler)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def create_server(service, host="127.0.0.1", port=0, verbose=False):
+    """
+    Returns a WhatIfServer for service; call serve_forever() (or run it on a
+    thread) and shutdown() to stop.
+    """
+    return WhatIfServer(service, host, port, verbose)
@@ -1,8 +1,49 @@
 # business_model_simulator/simulator/simulator.py
 
 from .business_model import BusinessModel
+from .parameters import ParameterResolver
 import itertools
 
+# simulator.metrics and simulator.vectorized depend on NumPy and are imported
+# only when metrics or the vectorized engine are requested, keeping the
+# pure-Python path quick to start.
+
+def iter_model_steps(resolved, simulation_period):
+    """
+    Steps a working copy of a ResolvedModel through simulation_period, yielding
+    (step, working_model) once that step's scheduled values and transaction
+    volumes are in place. The working model is the same object at every step;
+    read what you need from it before advancing.
+
+    Every helper that needs per-step values of the reference engine (e.g. one
+    operation's revenue) builds on this instead of repeating the loop.
+    """
+    tx_model = resolved.instantiate()
+    apply_schedules = resolved.stepper(simulation_period)
+
+    for step in range(simulation_period):
+        apply_schedules(tx_model, step)
+        if hasattr(tx_model, 'update_for_time_step'):
+            tx_model.update_for_time_step(step)
+        yield step, tx_model
+
+
+def run_resolved_model(resolved, simulation_period):
+    """
+    Reference engine: steps a working copy of a ResolvedModel through
+    simulation_period and returns a list of {"step", "costs", "revenues"}
+    records. Pure Python; every faster engine is checked against this one.
+    """
+    return [
+        {
+            "step": step,
+            "costs": tx_model.calculate_costs(),
+            "revenues": tx_model.calculate_revenues()
+        }
+        for step, tx_model in iter_model_steps(resolved, simulation_period)
+    ]
+
+
 class Simulator:
     """
     Main controller for running simulations and collecting results.
@@ -18,6 +59,11 @@ class Simulator:
         self.global_parameters = global_parameters if global_parameters else {}
         self.business_models = []
         self.results = {}
+        self.metrics = {}
+        self.sweep_combo_keys = []
+        self.sweep_metrics = {}
+        self.market_shares = {}
+        self.resolver = ParameterResolver()
 
     def add_business_model(self, business_model):
         """
@@ -25,31 +71,118 @@ class Simulator:
         """
         self.business_models.append(business_model)
 
-    def run_simulation(self):
+    def run_simulation(self, metrics=None, discount_rate=0.0):
         """
         Runs the simulation for each registered BusinessModel over the specified
         simulation_period. Results are stored in self.results.
+
+        :param metrics: optional iterable of metric names (see
+            simulator.metrics.AVAILABLE_METRICS) to compute for each model;
+            stored in self.metrics keyed by model name
+        :param discount_rate: float, per-step discount rate for npv metrics
+
+        Parameters are resolved into a run-local view (see ParameterResolver), so
+        the registered models are never modified and repeated runs give the
+        same results. Scheduled parameters (see simulator.schedules) are
+        materialised once per run and their per-step values are written into
+        the working copy before each step is evaluated.
         """
         for model in self.business_models:
-            # Merge global parameters
-            model.transaction_model.parameters.update(self.global_parameters)
-            model.adjust_parameters()
+            resolved = self.resolver.resolve(model, self.global_parameters)
+            model_results = run_resolved_model(resolved, self.simulation_period)
+            self.results[model.name] = model_results
+
+            if metrics:
+                from .metrics import compute_metrics
+                self.metrics[model.name] = compute_metrics(
+                    [r["costs"] for r in model_results],
+                    [r["revenues"] for r in model_results],
+                    metrics=metrics,
+                    discount_rate=discount_rate
+                )
 
-            model_results = []
-            for step in range(self.simulation_period):
-                if hasattr(model.transaction_model, 'update_for_time_step'):
-                    model.transaction_model.update_for_time_step(step)
+    def run_market_simulation(self, market, metrics=None, discount_rate=0.0, engine="python"):
+        """
+        Runs the registered models as competitors sharing market's demand
+        pool (see simulator.market): each step's users are split by logit
+        shares of the models' market_price and market_quality, and every
+        operation's volume is its base_transaction_volume per user. Imports
+        NumPy on first use.
 
-                total_costs = model.transaction_model.calculate_costs()
-                total_revenues = model.transaction_model.calculate_revenues()
+        Results and metrics are stored as by run_simulation; the shares per
+        step are stored in self.market_shares keyed by model name.
 
-                model_results.append({
-                    "step": step,
-                    "costs": total_costs,
-                    "revenues": total_revenues
-                })
+        :param market: simulator.market.Market
+        :param engine: "python" or "vectorized"
+        :return: simulator.market.MarketResults
+        """
+        from .market import run_market
 
-            self.results[model.name] = model_results
+        names = [model.name for model in self.business_models]
+        if len(set(names)) != len(names):
+            raise ValueError("Competing business models need distinct names")
+        outcome = run_market(self.business_models, market, self.simulation_period,
+                             self.global_parameters, engine=engine)
+        for row, name in enumerate(outcome.model_names):
+            self.results[name] = [
+                {"step": step, "costs": float(cost), "revenues": float(revenue)}
+                for step, (cost, revenue) in enumerate(zip(outcome.costs[row], outcome.revenues[row]))
+            ]
+            self.market_shares[name] = outcome.shares[row].tolist()
+            if metrics:
+                from .metrics import compute_metrics
+                self.metrics[name] = compute_metrics(
+                    outcome.costs[row].tolist(), outcome.revenues[row].tolist(),
+                    metrics=metrics, discount_rate=discount_rate
+                )
+        return outcome
+
+    def run_market_sweep(self, param_grid, market_factory, market, metrics=None,
+                         discount_rate=0.0, dtype="float64"):
+        """
+        Sweeps competing models over a shared demand pool. market_factory
+        receives each combination's parameters and returns the list of
+        competing BusinessModels; shares for every combination are allocated
+        at once and all coupled models are evaluated in one vectorized batch.
+
+        :param metrics: optional metric names, stored in self.sweep_metrics
+            per competitor name (taken from the first combination)
+        :return: simulator.market.MarketSweepArrays
+        """
+        from .market import run_market_sweep
+
+        arrays = run_market_sweep(param_grid, market_factory, market, self.simulation_period,
+                                  self.global_parameters, dtype=dtype)
+        if metrics:
+            self._store_sweep_metrics(arrays.combo_keys, {
+                name: (arrays.costs[:, row], arrays.revenues[:, row])
+                for row, name in enumerate(arrays.model_names)
+            }, metrics, discount_rate)
+        return arrays
+
+    def run_portfolio(self, root, metrics=None, discount_rate=0.0, engine="vectorized"):
+        """
+        Evaluates a CompositeBusinessModel tree (see simulator.composite) and
+        stores the consolidated results and metrics of every composite in
+        self.results and self.metrics, keyed by path (e.g. "Platform/EU").
+        Leaf series stay on the returned rollup. Imports NumPy on first use.
+
+        :param root: simulator.composite.CompositeBusinessModel
+        :param engine: "vectorized" or "python"
+        :return: simulator.composite.PortfolioRollup
+        """
+        from .composite import PortfolioRollup
+
+        rollup = PortfolioRollup(root, self.simulation_period, self.global_parameters,
+                                 engine=engine)
+        computed = rollup.metrics(metrics, discount_rate) if metrics else None
+        for row, path in enumerate(rollup.paths):
+            if rollup.is_leaf[row]:
+                continue
+            self.results[path] = rollup.results(path)
+            if computed is not None:
+                self.metrics[path] = {name: values[row] for name, values in computed.items()}
+        return rollup
 
     def collect_results(self):
         """
@@ -57,7 +190,15 @@ class Simulator:
         """
         return self.results
 
-    def run_parameter_sweep(self, param_grid, business_model_factory):
+    def collect_metrics(self):
+        """
+        Returns the metrics computed by the last run_simulation(metrics=...) call.
+        """
+        return self.metrics
+
+    def run_parameter_sweep(self, param_grid, business_model_factory,
+                            metrics=None, discount_rate=0.0, engine="python",
+                            checkpoint=None, resume=True, telemetry=None):
         """
         Iterates over all parameter combinations in param_grid, creates a fresh
         BusinessModel for each combination using business_model_factory, and runs
@@ -66,37 +207,341 @@ class Simulator:
         :param param_grid: dict, e.g. {"growth_rate": [0.0, 0.05], "overhead_rate": [0.0, 0.03]}
         :param business_model_factory: callable that accepts a dict of parameter values
                                        and returns a new BusinessModel instance
+        :param metrics: optional iterable of metric names to compute for every
+            combination at once. Results are stored in self.sweep_metrics as
+            {model_name: {metric: array over combos}}, aligned with
+            self.sweep_combo_keys, e.g. for ranking combos with metrics.rank_by.
+        :param discount_rate: float, per-step discount rate for npv metrics
+        :param engine: "python" for the reference engine, or "vectorized" to
+            evaluate all combinations as arrays (see run_vectorized_sweep)
+        :param checkpoint: optional path of an append-only sweep log (see
+            simulator.checkpoint). Each combination is recorded as it completes,
+            so an interrupted sweep can be restarted without redoing finished work.
+        :param resume: bool, with checkpoint, replay combinations already in the
+            log instead of starting over
+        :param telemetry: optional simulator.telemetry.SweepTelemetry receiving
+            progress as combinations complete
         :return: dict of results, keyed by a name that includes each parameter combination
         """
+        if engine not in ("python", "vectorized"):
+            raise ValueError(f"Unknown engine '{engine}', expected 'python' or 'vectorized'")
+        if engine == "vectorized":
+            if checkpoint is not None:
+                raise ValueError("Checkpointed sweeps require engine='python'")
+            return self.run_vectorized_sweep(
+                param_grid, business_model_factory, metrics, discount_rate, telemetry=telemetry
+            ).to_results()
+
+        combo_count = 1
+        for values in param_grid.values():
+            combo_count *= len(values)
+        collected = None
+        if metrics:
+            from .metrics import SweepSeries
+            collected = SweepSeries(combo_count, self.simulation_period)
+
+        if checkpoint is not None:
+            from .checkpoint import iter_checkpointed_sweep
+            combos = (
+                (combo_params, combo_key, run_results)
+                for _, combo_params, combo_key, run_results in iter_checkpointed_sweep(
+                    self, param_grid, business_model_factory, checkpoint, resume=resume)
+            )
+        else:
+            combos = self.iter_parameter_sweep(param_grid, business_model_factory)
 
         sweep_results = {}
+        if telemetry is not None:
+            telemetry.start(combo_count)
+        try:
+            for index, (combo_params, combo_key, run_results) in enumerate(combos):
+                # Store the results in the sweep_results dict
+                sweep_results[combo_key] = run_results
+                if collected is not None:
+                    collected.add(index, run_results)
+                if telemetry is not None:
+                    telemetry.advance()
+        finally:
+            if telemetry is not None:
+                telemetry.finish()
+
+        if collected is not None:
+            self._store_sweep_metrics(list(sweep_results.keys()), collected.series,
+                                      metrics, discount_rate)
+
+        return sweep_results
+
+    def iter_parameter_sweep(self, param_grid, business_model_factory, telemetry=None):
+        """
+        Generator form of run_parameter_sweep: runs one combination at a time and
+        yields (combo_params, combo_key, run_results) as soon as it completes,
+        so callers can stream results to disk or reduce them without holding the
+        whole sweep in memory.
+
+        :param telemetry: optional SweepTelemetry advanced after each combination
+        """
         # Create a list of parameter names and a list of value-lists
         param_names = list(param_grid.keys())
         param_value_lists = [param_grid[name] for name in param_names]
 
-        # Use itertools.product to get every combination of parameter values
-        for combo in itertools.product(*param_value_lists):
-            # Construct a dict of parameter_name -> chosen_value
-            combo_params = dict(zip(param_names, combo))
+        if telemetry is not None:
+            combo_count = 1
+            for values in param_value_lists:
+                combo_count *= len(values)
+            telemetry.start(combo_count)
+        try:
+            # Use itertools.product to get every combination of parameter values
+            for combo in itertools.product(*param_value_lists):
+                # Construct a dict of parameter_name -> chosen_value
+                combo_params = dict(zip(param_names, combo))
+                combo_key, run_results = self.run_combination(combo_params, business_model_factory)
+                if telemetry is not None:
+                    telemetry.advance()
+                yield combo_params, combo_key, run_results
+        finally:
+            if telemetry is not None:
+                telemetry.finish()
 
-            # Create a new Simulator instance for this combination
-            # so that each run starts fresh
-            sim = Simulator(simulation_period=self.simulation_period,
-                            global_parameters=self.global_parameters)
+    def run_combination(self, combo_params, business_model_factory):
+        """
+        Runs a single sweep combination and returns (combo_key, run_results).
 
-            # Use the factory to create a business model for this combo
-            bm = business_model_factory(combo_params)
-            sim.add_business_model(bm)
+        :param combo_params: dict of parameter name -> value for this combination
+        :param business_model_factory: callable returning a new BusinessModel for combo_params
+        """
+        # Create a new Simulator instance for this combination
+        # so that each run starts fresh
+        sim = Simulator(simulation_period=self.simulation_period,
+                        global_parameters=self.global_parameters)
 
-            # Run simulation
-            sim.run_simulation()
-            run_results = sim.collect_results()
+        # Use the factory to create a business model for this combo
+        bm = business_model_factory(combo_params)
+        sim.add_business_model(bm)
 
-            # Generate a key that describes the combination, e.g. "GR=0.05_OH=0.03"
-            combo_key_parts = [f"{k}={v}" for k, v in combo_params.items()]
-            combo_key = "_".join(combo_key_parts)
+        # Run simulation
+        sim.run_simulation()
+        run_results = sim.collect_results()
 
-            # Store the results in the sweep_results dict
-            sweep_results[combo_key] = run_results
+        # Generate a key that describes the combination, e.g. "GR=0.05_OH=0.03"
+        combo_key_parts = [f"{k}={v}" for k, v in combo_params.items()]
+        combo_key = "_".join(combo_key_parts)
 
-        return sweep_results
+        return combo_key, run_results
+
+    def run_summary_sweep(self, param_grid, business_model_factory, keep_summaries=True,
+                          top_k=None, rank_by="total_profit", descending=True,
+                          discount_rate=0.0, engine="python", chunk_size=4096,
+                          memory_budget=None, dtype="float64", telemetry=None):
+        """
+        Runs a sweep that keeps only per-combination summaries (totals, means,
+        npv, break-even step, payback period) and/or the top_k combinations by
+        one of them. Each combination's per-step series is reduced as soon as
+        it is produced and then discarded (see simulator.summary).
+
+        :param keep_summaries: bool, keep the summary of every combination
+        :param top_k: int, keep a bounded heap of the top_k best combinations
+        :param rank_by: str, summary field ranking the top_k combinations,
+            e.g. "total_profit" (the final cumulative profit) or "npv"
+        :param descending: bool, True if larger rank_by values are better
+        :param discount_rate: float, per-step discount rate for npv
+        :param engine: "python", or "vectorized" to evaluate the grid in chunks
+        :param chunk_size: int, combinations per vectorized chunk
+        :param memory_budget: int, bytes per vectorized chunk (overrides chunk_size)
+        :param dtype: "float64" or "float32", dtype of the vectorized chunks
+        :param telemetry: optional SweepTelemetry receiving progress
+        :return: simulator.summary.SweepSummary
+        """
+        from .summary import SweepSummary
+
+        if engine not in ("python", "vectorized"):
+            raise ValueError(f"Unknown engine '{engine}', expected 'python' or 'vectorized'")
+        summary = SweepSummary(keep_summaries=keep_summaries, top_k=top_k, rank_by=rank_by,
+                               descending=descending, discount_rate=discount_rate)
+        if engine == "vectorized":
+            for arrays in self._iter_chunks(param_grid, business_model_factory, memory_budget,
+                                            chunk_size, dtype, telemetry):
+                summary.add_arrays(arrays)
+        else:
+            for _, combo_key, run_results in self.iter_parameter_sweep(
+                    param_grid, business_model_factory, telemetry=telemetry):
+                summary.add_records(combo_key, run_results)
+        return summary
+
+    def run_vectorized_sweep(self, param_grid, business_model_factory,
+                             metrics=None, discount_rate=0.0, reduce_axes=False, dtype="float64",
+                             telemetry=None):
+        """
+        Runs the same sweep as run_parameter_sweep, but evaluates every
+        combination at once as (combos x steps) arrays with the vectorized
+        engine. Imports NumPy on first use.
+
+        :param reduce_axes: bool, skip evaluating axes that cannot change an
+            output and broadcast instead (see simulator.relevance)
+        :param dtype: "float64" or "float32" result storage; float32 halves the
+            memory within a documented error bound (see vectorized.check_precision)
+        :param telemetry: optional SweepTelemetry; the whole grid completes as
+            one batch
+
+        :return: simulator.vectorized.SweepArrays
+        """
+        from .vectorized import run_vectorized_sweep
+
+        if telemetry is not None:
+            combo_count = 1
+            for values in param_grid.values():
+                combo_count *= len(values)
+            telemetry.start(combo_count)
+        try:
+            arrays = run_vectorized_sweep(
+                param_grid, business_model_factory, self.simulation_period, self.global_parameters,
+                reduce_axes=reduce_axes, dtype=dtype
+            )
+            if telemetry is not None:
+                telemetry.advance(len(arrays.combos))
+        finally:
+            if telemetry is not None:
+                telemetry.finish()
+        if metrics:
+            self._store_sweep_metrics(arrays.combo_keys, self._sweep_series(arrays),
+                                      metrics, discount_rate)
+        return arrays
+
+    def run_parallel_sweep(self, param_grid, business_model_factory, workers=None,
+                           metrics=None, discount_rate=0.0, engine="python", dtype="float64",
+                           telemetry=None):
+        """
+        Runs the sweep on worker processes that write each combination's series
+        into shared memory (see simulator.parallel), so only completion notices
+        travel back to this process.
+
+        :param workers: int, number of processes (default: os.cpu_count())
+        :param engine: engine used inside each worker, "python" or "vectorized"
+        :param dtype: "float64" or "float32", dtype of the shared result arrays
+        :param telemetry: optional SweepTelemetry receiving per-worker progress
+        :return: simulator.parallel.SharedSweepArrays; call release() when done
+        """
+        from .parallel import run_parallel_sweep
+
+        arrays = run_parallel_sweep(
+            param_grid, business_model_factory, self.simulation_period, self.global_parameters,
+            workers=workers, engine=engine, dtype=dtype, telemetry=telemetry
+        )
+        if metrics:
+            self._store_sweep_metrics(arrays.combo_keys, self._sweep_series(arrays),
+                                      metrics, discount_rate)
+        return arrays
+
+    def run_chunked_sweep(self, param_grid, business_model_factory, sink=None,
+                          memory_budget=None, chunk_size=None, metrics=None, discount_rate=0.0,
+                          dtype="float64", telemetry=None):
+        """
+        Runs a vectorized sweep in chunks sized to a memory budget (see
+        simulator.vectorized.iter_vectorized_sweep), handing each chunk's
+        SweepArrays to sink before the next chunk is built.
+
+        Only per-chunk metrics are kept: self.sweep_metrics holds the requested
+        metrics for the whole grid and self.sweep_combo_keys its keys, as after
+        run_parameter_sweep.
+
+        :param sink: optional callable(SweepArrays) receiving each chunk, e.g.
+            to append it to a CSV file
+        :param memory_budget: int, bytes allowed per chunk
+        :param chunk_size: int, fixed combinations per chunk when no budget is given
+        :param dtype: "float64" or "float32", dtype of each chunk's results
+        :param telemetry: optional SweepTelemetry advanced after each chunk
+        :return: int, number of combinations run
+        """
+        combo_keys = []
+        chunk_metrics = []
+        for arrays in self._iter_chunks(param_grid, business_model_factory, memory_budget,
+                                        chunk_size, dtype, telemetry):
+            if sink is not None:
+                sink(arrays)
+            combo_keys.extend(arrays.combo_keys)
+            if metrics:
+                # Reduce each chunk immediately so its series can be freed
+                from .metrics import compute_metrics
+                chunk_metrics.append((len(arrays.combos), {
+                    name: compute_metrics(costs, revenues, metrics=metrics,
+                                          discount_rate=discount_rate)
+                    for name, (costs, revenues) in self._sweep_series(arrays).items()
+                }))
+
+        if metrics:
+            self._store_chunked_metrics(combo_keys, chunk_metrics, metrics, discount_rate)
+        return len(combo_keys)
+
+    def _iter_chunks(self, param_grid, business_model_factory, memory_budget, chunk_size,
+                     dtype, telemetry):
+        from .vectorized import iter_vectorized_sweep
+
+        chunks = iter_vectorized_sweep(
+            param_grid, business_model_factory, self.simulation_period, self.global_parameters,
+            memory_budget=memory_budget, chunk_size=chunk_size, dtype=dtype
+        )
+        if telemetry is None:
+            yield from chunks
+            return
+        combo_count = 1
+        for values in param_grid.values():
+            combo_count *= len(values)
+        telemetry.start(combo_count)
+        try:
+            for arrays in chunks:
+                telemetry.advance(len(arrays.combos))
+                yield arrays
+        finally:
+            telemetry.finish()
+
+    def _sweep_series(self, arrays):
+        """
+        Returns {model_name: (costs, revenues)} for a SweepArrays result, with
+        NaN rows for combinations that built a differently named model.
+        """
+        if len(set(arrays.model_names)) <= 1:
+            return {name: (arrays.costs, arrays.revenues) for name in arrays.model_names[:1]}
+
+        # Combos built differently named models; align them per name
+        # exactly as the reference sweep does
+        import numpy as np
+        from .metrics import SweepSeries
+
+        collected = SweepSeries(*arrays.costs.shape, dtype=arrays.costs.dtype)
+        names = np.array(arrays.model_names, dtype=object)
+        for name in dict.fromkeys(arrays.model_names):
+            rows = names == name
+            collected.add_rows(name, rows, arrays.costs[rows], arrays.revenues[rows])
+        return collected.series
+
+    def _store_sweep_metrics(self, combo_keys, series, metrics, discount_rate):
+        from .metrics import compute_metrics
+
+        self.sweep_combo_keys = list(combo_keys)
+        self.sweep_metrics = {
+            name: compute_metrics(costs, revenues, metrics=metrics, discount_rate=discount_rate)
+            for name, (costs, revenues) in series.items()
+        }
+
+    def _store_chunked_metrics(self, combo_keys, chunk_metrics, metrics, discount_rate):
+        import numpy as np
+        from .metrics import compute_metrics
+
+        model_names = []
+        for _, computed in chunk_metrics:
+            model_names.extend(name for name in computed if name not in model_names)
+
+        self.sweep_combo_keys = list(combo_keys)
+        self.sweep_metrics = {}
+        for name in model_names:
+            parts = []
+            for combo_count, computed in chunk_metrics:
+                if name not in computed:
+                    # Same as SweepSeries: combos without the model have NaN series
+                    missing = np.full((combo_count, self.simulation_period), np.nan)
+                    computed = {name: compute_metrics(missing, missing, metrics=metrics,
+                                                      discount_rate=discount_rate)}
+                parts.append(computed[name])
+            self.sweep_metrics[name] = {
+                metric: np.concatenate([np.atleast_1d(part[metric]) for part in parts])
+                for metric in parts[0]
+            }
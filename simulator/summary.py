@@ -0,0 +1,278 @@
+# business_model_simulator/simulator/summary.py
+
+"""
+Summary-only and top-K sweeps.
+
+Most sweep consumers only need a few numbers per combination, or the best N
+combinations by one of them, not every per-step row. SweepSummary reduces
+each combination's series to SUMMARY_FIELDS as soon as it is produced and
+drops the series; with top_k it also (or only) keeps a bounded heap of the
+best combinations by one field, so memory no longer grows with the horizon
+(or, for top-K alone, with the grid).
+
+Records from the pure-Python engine are summarised without NumPy; chunks
+from the vectorized engine are summarised as arrays.
+"""
+
+import csv
+import heapq
+import math
+
+from .output import _ensure_parent_dir
+
+SUMMARY_FIELDS = (
+    "total_costs",
+    "total_revenues",
+    "total_profit",
+    "mean_costs",
+    "mean_revenues",
+    "mean_profit",
+    "npv",
+    "break_even_step",
+    "payback_period",
+)
+
+# Same sentinel as metrics.NEVER, for steps that are never reached
+NEVER = -1
+
+
+def summarize_records(records, discount_rate=0.0):
+    """
+    Summarises one run's list of {"step", "costs", "revenues"} records.
+
+    total_profit is the final cumulative profit; break_even_step is the first
+    step with profit >= 0 and payback_period the first step with cumulative
+    profit >= 0 (NEVER if not reached), as in simulator.metrics.
+
+    :return: dict of SUMMARY_FIELDS -> float (int for the step fields)
+    """
+    total_costs = total_revenues = npv = cumulative = 0.0
+    break_even = payback = NEVER
+    factor = 1.0
+    for step, record in enumerate(records):
+        costs, revenues = record["costs"], record["revenues"]
+        profit = revenues - costs
+        total_costs += costs
+        total_revenues += revenues
+        npv += profit * factor
+        factor /= 1.0 + discount_rate
+        cumulative += profit
+        if break_even == NEVER and profit >= 0.0:
+            break_even = step
+        if payback == NEVER and cumulative >= 0.0:
+            payback = step
+
+    steps = max(len(records), 1)
+    return {
+        "total_costs": total_costs,
+        "total_revenues": total_revenues,
+        "total_profit": total_revenues - total_costs,
+        "mean_costs": total_costs / steps,
+        "mean_revenues": total_revenues / steps,
+        "mean_profit": (total_revenues - total_costs) / steps,
+        "npv": npv,
+        "break_even_step": break_even,
+        "payback_period": payback,
+    }
+
+
+def summarize_arrays(costs, revenues, discount_rate=0.0):
+    """
+    Array form of summarize_records for (combos x steps) costs and revenues.
+
+    :return: dict of SUMMARY_FIELDS -> 1-D array over combos
+    """
+    from .metrics import compute_metrics
+
+    computed = compute_metrics(
+        costs, revenues, discount_rate=discount_rate,
+        metrics=("total_costs", "total_revenues", "total_profit", "npv",
+                 "break_even_step", "payback_period")
+    )
+    steps = max(costs.shape[-1], 1)
+    computed["mean_costs"] = computed["total_costs"] / steps
+    computed["mean_revenues"] = computed["total_revenues"] / steps
+    computed["mean_profit"] = computed["total_profit"] / steps
+    return {field: computed[field] for field in SUMMARY_FIELDS}
+
+
+class TopK:
+    """
+    Bounded heap of the k best combinations by one summary field.
+
+    Ties keep the earlier combination, and NaN values rank last, as in
+    metrics.rank_by.
+    """
+
+    def __init__(self, k, field="total_profit", descending=True):
+        """
+        :param k: int, number of combinations kept
+        :param field: str, one of SUMMARY_FIELDS used for ranking
+        :param descending: bool, True if larger values are better
+        """
+        if field not in SUMMARY_FIELDS:
+            raise ValueError(f"Unknown summary field '{field}', expected one of {SUMMARY_FIELDS}")
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        self.k = k
+        self.field = field
+        self.descending = descending
+        self._heap = []
+
+    def _score(self, value):
+        # Larger scores are better; NaN is worst
+        value = float(value)
+        if math.isnan(value):
+            return -math.inf
+        return value if self.descending else -value
+
+    def threshold(self):
+        """
+        Returns the score a combination must beat to enter a full heap, or None.
+        """
+        return self._heap[0][0] if len(self._heap) >= self.k else None
+
+    def offer(self, ordinal, combo_key, model_name, summary):
+        """
+        Considers one combination; returns True if it is kept.
+
+        :param ordinal: int, position of the combination in the grid
+        :param summary: dict of SUMMARY_FIELDS -> value
+        """
+        # Heap entries are ordered worst first: lowest score, then latest ordinal
+        entry = (self._score(summary[self.field]), -ordinal, combo_key, model_name, summary)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+            return True
+        if entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+            return True
+        return False
+
+    def best(self):
+        """
+        Returns the kept combinations, best first, as a list of
+        {"ordinal", "combo_key", "business_model", "summary"} dicts.
+        """
+        return [
+            {"ordinal": -negative_ordinal, "combo_key": key, "business_model": name,
+             "summary": summary}
+            for _, negative_ordinal, key, name, summary in sorted(
+                self._heap, key=lambda entry: entry[:2], reverse=True)
+        ]
+
+
+class SweepSummary:
+    """
+    Accumulates per-combination summaries and/or the top-K combinations of a
+    sweep while discarding the per-step series.
+    """
+
+    def __init__(self, keep_summaries=True, top_k=None, rank_by="total_profit",
+                 descending=True, discount_rate=0.0):
+        """
+        :param keep_summaries: bool, keep every combination's summary
+        :param top_k: int, also keep the top_k best combinations by rank_by
+        :param rank_by: str, one of SUMMARY_FIELDS
+        :param descending: bool, True if larger rank_by values are better
+        :param discount_rate: float, per-step discount rate for npv
+        """
+        self.keep_summaries = keep_summaries
+        self.discount_rate = discount_rate
+        self.top = TopK(top_k, rank_by, descending) if top_k else None
+        self.combo_count = 0
+        self.combo_keys = []
+        self.model_names = []
+        self.values = {field: [] for field in SUMMARY_FIELDS}
+
+    def add_records(self, combo_key, run_results):
+        """
+        Reduces one combination's {model_name: records} results (one entry
+        per model) and forgets the records.
+        """
+        ordinal = self.combo_count
+        for model_name, records in run_results.items():
+            self._add(ordinal, combo_key, model_name,
+                      summarize_records(records, self.discount_rate))
+        self.combo_count += 1
+
+    def _add(self, ordinal, combo_key, model_name, summary):
+        if self.keep_summaries:
+            self.combo_keys.append(combo_key)
+            self.model_names.append(model_name)
+            for field in SUMMARY_FIELDS:
+                self.values[field].append(summary[field])
+        if self.top is not None:
+            self.top.offer(ordinal, combo_key, model_name, summary)
+
+    def add_arrays(self, sweep_arrays):
+        """
+        Reduces a vectorized.SweepArrays result (or one chunk of a chunked
+        sweep) with array operations.
+        """
+        import numpy as np
+
+        summaries = summarize_arrays(sweep_arrays.costs, sweep_arrays.revenues, self.discount_rate)
+        count = len(sweep_arrays.combos)
+        keys = sweep_arrays.combo_keys
+        if self.keep_summaries:
+            self.combo_keys.extend(keys)
+            self.model_names.extend(sweep_arrays.model_names)
+            for field in SUMMARY_FIELDS:
+                self.values[field].extend(summaries[field].tolist())
+
+        if self.top is not None and count:
+            # Only the chunk's own top k can enter the heap
+            scores = summaries[self.top.field].astype(np.float64)
+            if not self.top.descending:
+                scores = -scores
+            scores = np.where(np.isnan(scores), -np.inf, scores)
+            candidates = np.arange(count)
+            if count > self.top.k:
+                candidates = np.argpartition(-scores, self.top.k - 1)[:self.top.k]
+            for index in sorted(candidates.tolist()):
+                summary = {field: summaries[field][index].item() for field in SUMMARY_FIELDS}
+                self.top.offer(self.combo_count + index, keys[index],
+                               sweep_arrays.model_names[index], summary)
+        self.combo_count += count
+
+    def rows(self):
+        """
+        Returns the kept summaries as dicts with combo_key, business_model and
+        SUMMARY_FIELDS, in grid order.
+        """
+        return [
+            dict({"combo_key": key, "business_model": name},
+                 **{field: self.values[field][i] for field in SUMMARY_FIELDS})
+            for i, (key, name) in enumerate(zip(self.combo_keys, self.model_names))
+        ]
+
+    def top_rows(self):
+        """
+        Returns the top-K combinations as rows like rows(), best first, with
+        their rank (1 = best).
+        """
+        if self.top is None:
+            return []
+        return [
+            dict({"rank": rank, "combo_key": entry["combo_key"],
+                  "business_model": entry["business_model"]}, **entry["summary"])
+            for rank, entry in enumerate(self.top.best(), start=1)
+        ]
+
+
+SUMMARY_FIELDNAMES = ["combo_key", "business_model"] + list(SUMMARY_FIELDS)
+
+
+def write_sweep_summary_to_csv(sweep_summary, csv_path, top_only=False):
+    """
+    Writes one row per combination (or, with top_only, per top-K combination,
+    best first, with a leading rank column) instead of one row per step.
+    """
+    _ensure_parent_dir(csv_path)
+    rows = sweep_summary.top_rows() if top_only else sweep_summary.rows()
+    fieldnames = (["rank"] if top_only else []) + SUMMARY_FIELDNAMES
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
@@ -0,0 +1,195 @@
+# business_model_simulator/simulator/telemetry.py
+
+"""
+Progress and throughput telemetry for long sweeps.
+
+A SweepTelemetry is handed to a sweep (run_parameter_sweep, run_summary_sweep,
+run_chunked_sweep, run_parallel_sweep, ...), which calls start(total) once,
+advance(count) as combinations complete and finish() at the end. Records are
+JSON-serialisable dicts sent to a sink: a callable, a text stream, or the path
+of a JSON-lines file:
+
+    {"event": "start", "total": 1200, ...}
+    {"event": "progress", "completed": 310, "rate": 95.2, "eta_seconds": 9.3,
+     "max_rss_bytes": 81264640, "workers": {"4711": {"completed": 160, ...}}, ...}
+    {"event": "finish", "completed": 1200, ...}
+
+advance() is cheap: it only adds to counters, and the clock is read once
+every `stride` calls, with the stride adapted to the observed throughput so
+the clock is checked about CHECKS_PER_INTERVAL times per interval. A
+progress record is emitted at most once per interval.
+
+Memory high-water marks come from resource.getrusage (None where the
+resource module is unavailable, e.g. on Windows). Multi-process sweeps
+report each worker's own peak with its completion notices.
+"""
+
+import json
+import sys
+import time
+
+# Clock reads per interval once the throughput is known
+CHECKS_PER_INTERVAL = 8
+
+
+def peak_rss_bytes(children=False):
+    """
+    Returns the peak resident set size of this process (or, with children,
+    of its largest terminated child) in bytes, or None if unknown.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _sink_writer(sink):
+    if callable(sink):
+        return sink, None
+    if isinstance(sink, str):
+        stream = open(sink, "a")
+    else:
+        stream = sink
+
+    def write(record):
+        stream.write(json.dumps(record) + "\n")
+        stream.flush()
+    return write, stream if isinstance(sink, str) else None
+
+
+class SweepTelemetry:
+    """
+    Rate-limited progress reporter for one sweep at a time.
+    """
+
+    def __init__(self, sink, interval=1.0, label=None, clock=time.monotonic):
+        """
+        :param sink: callable(record), writable text stream, or path of a
+            JSON-lines file records are appended to
+        :param interval: float, minimum seconds between progress records
+        :param label: optional str added to every record, e.g. the scenario name
+        :param clock: callable returning monotonic seconds
+        """
+        self._write, self._stream = _sink_writer(sink)
+        self.interval = interval
+        self.label = label
+        self.clock = clock
+        self.total = 0
+        self.completed = 0
+        self.workers = {}
+        self._started = None
+
+    def start(self, total):
+        """
+        Begins tracking a sweep of total combinations and emits a start record.
+        """
+        now = self.clock()
+        self.total = total
+        self.completed = 0
+        self.workers = {}
+        self._started = now
+        self._last_time = now
+        self._last_completed = 0
+        self._stride = 1
+        self._next_check = 1
+        self._emit("start", now)
+
+    def advance(self, count=1, worker=None, max_rss_bytes=None):
+        """
+        Records count completed combinations.
+
+        :param worker: optional worker id (e.g. a process id) the combinations
+            are credited to
+        :param max_rss_bytes: optional peak memory reported by that worker
+        """
+        self.completed += count
+        if worker is not None:
+            stats = self.workers.get(worker)
+            if stats is None:
+                stats = self.workers[worker] = {"completed": 0, "max_rss_bytes": None}
+            stats["completed"] += count
+            if max_rss_bytes is not None:
+                stats["max_rss_bytes"] = max(stats["max_rss_bytes"] or 0, max_rss_bytes)
+        if self.completed >= self._next_check:
+            self._check()
+
+    def _check(self):
+        now = self.clock()
+        elapsed = now - self._started
+        if elapsed > 0:
+            rate = self.completed / elapsed
+            self._stride = max(1, int(rate * self.interval / CHECKS_PER_INTERVAL))
+        self._next_check = self.completed + self._stride
+        if now - self._last_time >= self.interval:
+            self._emit("progress", now)
+
+    def finish(self):
+        """
+        Emits a final record, whether or not every combination completed.
+        """
+        self._emit("finish", self.clock())
+
+    def close(self):
+        """
+        Closes the JSON-lines file opened for a path sink.
+        """
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+        return False
+
+    def snapshot(self, now=None):
+        """
+        Returns the current progress as a record dict (without "event").
+        """
+        now = self.clock() if now is None else now
+        elapsed = now - self._started if self._started is not None else 0.0
+        window = now - self._last_time if self._started is not None else 0.0
+        mean_rate = self.completed / elapsed if elapsed > 0 else None
+        remaining = max(self.total - self.completed, 0)
+        record = {
+            "timestamp": time.time(),
+            "elapsed": elapsed,
+            "completed": self.completed,
+            "total": self.total,
+            "fraction": self.completed / self.total if self.total else 1.0,
+            "rate": (self.completed - self._last_completed) / window if window > 0 else None,
+            "mean_rate": mean_rate,
+            "eta_seconds": remaining / mean_rate if mean_rate else (0.0 if not remaining else None),
+            "max_rss_bytes": self._peak_memory(),
+        }
+        if self.workers:
+            record["workers"] = {
+                str(worker): {
+                    "completed": stats["completed"],
+                    "rate": stats["completed"] / elapsed if elapsed > 0 else None,
+                    "max_rss_bytes": stats["max_rss_bytes"],
+                }
+                for worker, stats in self.workers.items()
+            }
+        if self.label is not None:
+            record["label"] = self.label
+        return record
+
+    def _peak_memory(self):
+        peaks = [peak_rss_bytes()]
+        peaks.extend(stats["max_rss_bytes"] for stats in self.workers.values())
+        peaks = [peak for peak in peaks if peak is not None]
+        return max(peaks) if peaks else None
+
+    def _emit(self, event, now):
+        record = dict({"event": event}, **self.snapshot(now))
+        self._last_time = now
+        self._last_completed = self.completed
+        self._write(record)
+
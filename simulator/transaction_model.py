@@ -8,10 +8,21 @@ class TransactionModel:
         self.parameters = parameters if parameters else {}
 
     def update_for_time_step(self, step):
-        growth_rate = self.parameters.get('growth_rate', 0.0)
+        """
+        Sets each operation's transaction_volume for the given step.
+
+        Volumes grow as base_transaction_volume * (1 + growth_rate) ** step.
+        When growth_rate is scheduled, the engine supplies 'growth_factor',
+        the growth compounded step by step up to this step, which is used
+        instead.
+        """
+        growth_factor = self.parameters.get('growth_factor')
+        if growth_factor is None:
+            growth_rate = self.parameters.get('growth_rate', 0.0)
+            growth_factor = (1 + growth_rate) ** step
         for op in self.operations:
             base_volume = op.parameters.get('base_transaction_volume', 1.0)
-            new_volume = base_volume * ((1 + growth_rate) ** step)
+            new_volume = base_volume * growth_factor
             op.parameters['transaction_volume'] = new_volume
 
     def add_operation(self, operation):
@@ -0,0 +1,70 @@
+# business_model_simulator/simulator/utils.py
+
+import importlib
+import math
+
+
+def arange(start, stop, step):
+    """
+    Pure-Python equivalent of numpy.arange(start, stop, step).tolist(), for
+    building sweep grids without importing NumPy.
+    """
+    count = max(0, math.ceil((stop - start) / step))
+    # NumPy fills with start + i * delta, where delta is measured from the
+    # first two values; doing the same keeps grids (and combo keys) identical.
+    delta = (start + step) - start
+    return [start + i * delta for i in range(count)]
+
+
+def parse_value(text):
+    """
+    Converts a command-line value to int, float or bool where possible,
+    otherwise returns the string unchanged.
+    """
+    lowered = text.strip().lower()
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return text
+
+
+def parse_grid_values(spec):
+    """
+    Parses one sweep axis specification:
+      - "start:stop:step"  -> arange(start, stop, step)
+      - "a,b,c"            -> [a, b, c]
+      - "a"                -> [a]
+    """
+    if ":" in spec:
+        start, stop, step = (float(part) for part in spec.split(":"))
+        return arange(start, stop, step)
+    return [parse_value(part) for part in spec.split(",") if part.strip()]
+
+
+def parse_size(text):
+    """
+    Converts a byte size such as "512M", "2G", "64k" or "1000000" to an int.
+    Suffixes are binary (k = 1024).
+    """
+    units = {"k": 1 << 10, "m": 1 << 20, "g": 1 << 30, "t": 1 << 40}
+    cleaned = text.strip().lower().removesuffix("b").removesuffix("i")
+    if cleaned and cleaned[-1] in units:
+        return int(float(cleaned[:-1]) * units[cleaned[-1]])
+    return int(cleaned)
+
+
+def import_object(path):
+    """
+    Imports an object from a "package.module:attribute" (or
+    "package.module.attribute") path.
+    """
+    if ":" in path:
+        module_name, attribute = path.split(":", 1)
+    else:
+        module_name, _, attribute = path.rpartition(".")
+    module = importlib.import_module(module_name)
+    return getattr(module, attribute)
@@ -0,0 +1,555 @@
+# business_model_simulator/simulator/vectorized.py
+
+import itertools
+
+import numpy as np
+
+from .operation import Operation
+from .transaction_model import TransactionModel
+from .parameters import ParameterResolver
+from .simulator import iter_model_steps, run_resolved_model
+
+# Unit roundoff of float32 (half its machine epsilon)
+FLOAT32_ROUNDOFF = 2.0 ** -24
+
+# Documented bound on the relative error of float32 results against the
+# float64 reference, per (combination, step) value. In float32 mode each
+# operation term is computed from float32 inputs with a handful of float32
+# multiplies and adds (about 9 roundings, inputs included), the terms are
+# summed and the transaction-level factors applied in float64, and the result
+# is rounded once more for storage: about 11 roundings in total, so 16 leaves
+# a margin. The bound assumes the per-operation terms of a step do not cancel
+# (true for the base formulas with non-negative parameters).
+ERROR_BOUNDS = {
+    "float64": 0.0,
+    "float32": 16 * FLOAT32_ROUNDOFF,
+}
+
+
+def result_dtype(dtype):
+    """
+    Validates a result dtype ("float64", "float32" or the NumPy types) and
+    returns it as a numpy.dtype.
+    """
+    resolved = np.dtype(dtype)
+    if resolved.name not in ERROR_BOUNDS:
+        raise ValueError(f"Unsupported dtype '{dtype}', expected one of {sorted(ERROR_BOUNDS)}")
+    return resolved
+
+
+def uses_reference_transaction_model(tx_model_type):
+    """
+    Returns True if a TransactionModel class keeps the base time-step, cost and
+    revenue logic, which the vectorized engine reproduces with array formulas.
+    """
+    return all(
+        getattr(tx_model_type, name) is getattr(TransactionModel, name)
+        for name in ("update_for_time_step", "calculate_costs", "calculate_revenues")
+    )
+
+
+def _defining_class(cls, name):
+    for klass in cls.__mro__:
+        if name in vars(klass):
+            return klass
+    return None
+
+
+def has_batch_method(op_type, method_name):
+    """
+    Returns True if an Operation class can be evaluated with the array form
+    of method_name ("compute_cost" or "compute_revenue").
+
+    The array form <method_name>_batch must be defined on the class that
+    defines the scalar method, or on a subclass of it. A subclass that
+    overrides only the scalar method would otherwise inherit an array form
+    that ignores its logic, so it falls back to per-step calls.
+    """
+    if not issubclass(op_type, Operation):
+        return False
+    scalar = _defining_class(op_type, method_name)
+    batch = _defining_class(op_type, method_name + "_batch")
+    return batch is not None and issubclass(batch, scalar)
+
+
+def parameter_matrix(resolved_models, simulation_period, key, default, operation_index=None,
+                     dtype=np.float64):
+    """
+    Stacks one parameter across a list of ResolvedModels.
+
+    Returns an array of shape (models, 1) when every model holds a
+    constant (so it broadcasts over steps without being copied), or
+    (models, simulation_period) when any model schedules the parameter.
+
+    :param operation_index: int, read the parameter from this operation
+        instead of the transaction-level parameters
+    :param dtype: dtype of the returned array
+    """
+    rows = []
+    scheduled = False
+    for resolved in resolved_models:
+        parameter_arrays, operation_arrays = resolved.schedules(simulation_period)
+        if operation_index is None:
+            params, arrays = resolved.parameters, parameter_arrays
+        else:
+            params = resolved.operation_parameters[operation_index]
+            arrays = operation_arrays[operation_index]
+
+        if key in arrays:
+            rows.append(arrays[key])
+            scheduled = True
+        else:
+            rows.append(params.get(key, default))
+
+    if not scheduled:
+        return np.array(rows, dtype=dtype).reshape(-1, 1)
+
+    matrix = np.empty((len(rows), simulation_period), dtype=dtype)
+    for i, row in enumerate(rows):
+        matrix[i] = row
+    return matrix
+
+
+class BatchParameters:
+    """
+    One operation's parameters across the models of a CompiledBatch, as passed
+    to Operation.compute_cost_batch and compute_revenue_batch.
+
+    Attributes:
+      - contract_complexity: object array (models, 1) of complexity levels
+      - complexity_multiplier: array (models, 1) of each model's multiplier
+    """
+
+    def __init__(self, batch, index):
+        """
+        :param batch: CompiledBatch the operation belongs to
+        :param index: int, position of the operation in the transaction model
+        """
+        self._batch = batch
+        self._index = index
+        self._matrices = {}
+        ops = [resolved.operations[index] for resolved in batch.resolved_models]
+        self.contract_complexity = np.array(
+            [op.contract_complexity for op in ops], dtype=object
+        ).reshape(-1, 1)
+        self.complexity_multiplier = np.array([
+            op._complexity_multipliers.get(op.contract_complexity, 1.0) for op in ops
+        ], dtype=batch.dtype).reshape(-1, 1)
+
+    def get(self, key, default=0.0):
+        """
+        Returns parameter key for every model, as an array of shape (models, 1),
+        or (models, steps) when any model schedules it. Models that do not set
+        key use default.
+        """
+        if (key, default) not in self._matrices:
+            self._matrices[key, default] = parameter_matrix(
+                self._batch.resolved_models, self._batch.simulation_period, key, default,
+                operation_index=self._index, dtype=self._batch.dtype
+            )
+        return self._matrices[key, default]
+
+    def complexity_is(self, level):
+        """
+        Returns a boolean (models, 1) array, True where contract_complexity == level.
+        """
+        return self.contract_complexity == level
+
+
+class CompiledBatch:
+    """
+    Structure-of-arrays form of a group of ResolvedModels that share the same
+    layout (transaction model class and operation classes, in order).
+
+    Operations are evaluated over (models x steps) through their array
+    methods (Operation.compute_cost_batch / compute_revenue_batch), which cover
+    the base formulas and any subclass that implements them (see
+    has_batch_method). Operations that override only the scalar
+    compute_cost/compute_revenue fall back to calling it per model and step
+    against a working copy, so subclass logic is always honoured.
+
+    With a float32 dtype, operation parameters, volumes and per-operation
+    terms are float32, while growth compounding, the sum over operations and
+    the transaction-level factors stay in float64 (mixed precision); the
+    results are rounded to float32 once, at the end.
+    """
+
+    def __init__(self, resolved_models, simulation_period, dtype=np.float64):
+        """
+        :param resolved_models: list of ResolvedModel sharing one layout
+        :param simulation_period: int, number of time steps
+        :param dtype: "float64" or "float32", dtype of the operation state and results
+        """
+        self.resolved_models = list(resolved_models)
+        self.simulation_period = simulation_period
+        self.dtype = result_dtype(dtype)
+        self.steps = np.arange(simulation_period, dtype=np.float64)
+
+        def tm_matrix(key, default):
+            return parameter_matrix(self.resolved_models, simulation_period, key, default)
+
+        self.growth_rate = tm_matrix('growth_rate', 0.0)
+        # Present when any model schedules growth_rate (or sets growth_factor)
+        self.growth_factor = None
+        if any('growth_factor' in resolved.schedules(simulation_period)[0]
+               or 'growth_factor' in resolved.parameters
+               for resolved in self.resolved_models):
+            self.growth_factor = self._growth_factor_matrix()
+        self.overhead_rate = tm_matrix('overhead_rate', 0.0)
+        self.revenue_factor = tm_matrix('revenue_factor', 1.0)
+        self.revenue_tax_rate = tm_matrix('revenue_tax_rate', 0.0)
+
+        self.operations = []
+        for index, op in enumerate(self.resolved_models[0].operations):
+            self.operations.append(self._compile_operation(index, op))
+
+    def _compile_operation(self, index, op):
+        params = BatchParameters(self, index)
+        return {
+            "index": index,
+            "operation": op,
+            "params": params,
+            "batch_cost": has_batch_method(type(op), "compute_cost"),
+            "batch_revenue": has_batch_method(type(op), "compute_revenue"),
+            "base_transaction_volume": params.get('base_transaction_volume', 1.0),
+        }
+
+    def _growth_factor_matrix(self):
+        factors = np.empty((len(self.resolved_models), self.simulation_period), dtype=np.float64)
+        for row, resolved in enumerate(self.resolved_models):
+            parameter_arrays = resolved.schedules(self.simulation_period)[0]
+            if 'growth_factor' in parameter_arrays:
+                factors[row] = parameter_arrays['growth_factor']
+            elif 'growth_factor' in resolved.parameters:
+                factors[row] = resolved.parameters['growth_factor']
+            else:
+                factors[row] = np.power(1.0 + resolved.parameters.get('growth_rate', 0.0), self.steps)
+        return factors
+
+    def volumes(self, compiled_op):
+        """
+        Returns the (models x steps) transaction volumes of one operation,
+        base_transaction_volume * (1 + growth_rate) ** step, or the compounded
+        growth_factor when growth_rate is scheduled.
+        """
+        if self.growth_factor is not None:
+            growth = self.growth_factor
+        else:
+            growth = np.power(1.0 + self.growth_rate, self.steps)
+        return compiled_op["base_transaction_volume"] * growth.astype(self.dtype, copy=False)
+
+    def _scalar_fallback(self, index, volumes, method_name):
+        result = np.empty(volumes.shape, dtype=np.float64)
+        for row, resolved in enumerate(self.resolved_models):
+            row_volumes = volumes[row].tolist()
+            for step, working in iter_model_steps(resolved, self.simulation_period):
+                # The batch's volumes, which the engine compares against
+                op = working.operations[index]
+                op.parameters['transaction_volume'] = row_volumes[step]
+                result[row, step] = getattr(op, method_name)()
+        return result
+
+    def evaluate(self):
+        """
+        Returns (costs, revenues), each an array of shape
+        (models, simulation_period) in self.dtype, matching the reference engine.
+        """
+        shape = (len(self.resolved_models), self.simulation_period)
+        # Accumulators stay float64 whatever the dtype of the terms
+        costs = np.zeros(shape, dtype=np.float64)
+        revenues = np.zeros(shape, dtype=np.float64)
+
+        for compiled in self.operations:
+            volumes = np.broadcast_to(self.volumes(compiled), shape)
+
+            op, params = compiled["operation"], compiled["params"]
+            if compiled["batch_cost"]:
+                costs += op.compute_cost_batch(volumes, params)
+            else:
+                costs += self._scalar_fallback(compiled["index"], volumes, "compute_cost")
+
+            if compiled["batch_revenue"]:
+                revenues += op.compute_revenue_batch(volumes, params)
+            else:
+                revenues += self._scalar_fallback(compiled["index"], volumes, "compute_revenue")
+
+        overhead_rate = self.overhead_rate
+        costs = np.where(overhead_rate > 0.0, costs * (1.0 + overhead_rate), costs)
+
+        revenues = revenues * self.revenue_factor
+        tax_rate = self.revenue_tax_rate
+        revenues = np.where(tax_rate > 0.0, revenues * (1.0 - tax_rate), revenues)
+
+        return costs.astype(self.dtype, copy=False), revenues.astype(self.dtype, copy=False)
+
+
+def model_layout(resolved):
+    """
+    Returns a hashable layout key used to group models that can share one
+    CompiledBatch, or None if the model needs the reference engine.
+    """
+    tx_model_type = type(resolved.transaction_model)
+    if not uses_reference_transaction_model(tx_model_type):
+        return None
+    return (tx_model_type, tuple(type(op) for op in resolved.operations))
+
+
+def evaluate_models(resolved_models, simulation_period, dtype=np.float64):
+    """
+    Evaluates a list of ResolvedModels, grouping them by layout so each group
+    is computed as one CompiledBatch.
+
+    :param dtype: "float64" or "float32", dtype of the results (see CompiledBatch)
+    :return: (costs, revenues), arrays of shape (models, simulation_period)
+    """
+    resolved_models = list(resolved_models)
+    dtype = result_dtype(dtype)
+    shape = (len(resolved_models), simulation_period)
+    costs = np.zeros(shape, dtype=dtype)
+    revenues = np.zeros(shape, dtype=dtype)
+
+    groups = {}
+    for i, resolved in enumerate(resolved_models):
+        groups.setdefault(model_layout(resolved), []).append(i)
+
+    for layout, indices in groups.items():
+        if layout is None:
+            for i in indices:
+                records = run_resolved_model(resolved_models[i], simulation_period)
+                costs[i] = [r["costs"] for r in records]
+                revenues[i] = [r["revenues"] for r in records]
+            continue
+
+        batch = CompiledBatch([resolved_models[i] for i in indices], simulation_period, dtype)
+        group_costs, group_revenues = batch.evaluate()
+        costs[indices] = group_costs
+        revenues[indices] = group_revenues
+
+    return costs, revenues
+
+
+def combo_key(param_names, combo):
+    """
+    Returns the sweep key for a combination, e.g. "growth_rate=0.05_overhead_rate=0.03",
+    matching Simulator.run_parameter_sweep.
+    """
+    return "_".join(f"{k}={v}" for k, v in zip(param_names, combo))
+
+
+def combo_at(param_grid, ordinal):
+    """
+    Returns the value tuple of combination ordinal in itertools.product order
+    over param_grid, without enumerating the preceding combinations.
+    """
+    values = []
+    for name in reversed(list(param_grid.keys())):
+        axis = param_grid[name]
+        ordinal, position = divmod(ordinal, len(axis))
+        values.append(axis[position])
+    return tuple(reversed(values))
+
+
+class SweepArrays:
+    """
+    Results of a vectorized parameter sweep, held as (combos x steps) arrays
+    rather than per-step dicts.
+    """
+
+    def __init__(self, param_names, combos, model_names, costs, revenues, offset=0):
+        """
+        :param param_names: list of swept parameter names
+        :param combos: list of value tuples, one per combination, in grid order
+        :param model_names: list of business model names, one per combination
+        :param costs: float64 or float32 array (combos x steps)
+        :param revenues: float64 or float32 array (combos x steps)
+        :param offset: int, grid ordinal of the first combination (non-zero
+            for the chunks produced by iter_vectorized_sweep)
+        """
+        self.offset = offset
+        self.param_names = list(param_names)
+        self.combos = list(combos)
+        self.model_names = list(model_names)
+        self.costs = costs
+        self.revenues = revenues
+
+    @property
+    def combo_keys(self):
+        return [combo_key(self.param_names, combo) for combo in self.combos]
+
+    def combo_params(self, index):
+        """
+        Returns the {parameter: value} dict of combination index.
+        """
+        return dict(zip(self.param_names, self.combos[index]))
+
+    def to_results(self):
+        """
+        Converts to the nested dict returned by Simulator.run_parameter_sweep:
+        {combo_key: {model_name: [{"step", "costs", "revenues"}, ...]}}.
+        """
+        results = {}
+        steps = range(self.costs.shape[1])
+        for key, name, cost_row, revenue_row in zip(
+            self.combo_keys, self.model_names, self.costs.tolist(), self.revenues.tolist()
+        ):
+            results[key] = {name: [
+                {"step": step, "costs": c, "revenues": r}
+                for step, c, r in zip(steps, cost_row, revenue_row)
+            ]}
+        return results
+
+
+def _evaluate_combos(param_names, combos, business_model_factory, simulation_period,
+                     global_parameters, offset=0, dtype=np.float64):
+    # Views are used once, so there is no point caching them
+    resolver = ParameterResolver(max_entries=0)
+    resolved_models = [
+        resolver.resolve(business_model_factory(dict(zip(param_names, combo))), global_parameters)
+        for combo in combos
+    ]
+    costs, revenues = evaluate_models(resolved_models, simulation_period, dtype)
+    return SweepArrays(
+        param_names, combos, [r.name for r in resolved_models], costs, revenues, offset=offset
+    )
+
+
+def run_vectorized_sweep(param_grid, business_model_factory, simulation_period,
+                         global_parameters=None, reduce_axes=False, dtype=np.float64):
+    """
+    Vectorized equivalent of Simulator.run_parameter_sweep. Builds and resolves
+    one model per combination, then evaluates all of them as arrays.
+
+    :param reduce_axes: bool, evaluate costs and revenues only over the axes
+        they depend on and broadcast the rest (see simulator.relevance)
+    :param dtype: "float64" or "float32"; float32 halves the memory of the
+        results, within ERROR_BOUNDS of the float64 reference (see check_precision)
+    :return: SweepArrays
+    """
+    if reduce_axes:
+        from .relevance import run_reduced_sweep
+        return run_reduced_sweep(param_grid, business_model_factory, simulation_period,
+                                 global_parameters, dtype=dtype)
+
+    param_names = list(param_grid.keys())
+    combos = list(itertools.product(*(param_grid[name] for name in param_names)))
+    return _evaluate_combos(param_names, combos, business_model_factory, simulation_period,
+                            global_parameters, dtype=dtype)
+
+
+def check_precision(param_grid, business_model_factory, simulation_period,
+                    global_parameters=None, dtype=np.float32, sample_size=64):
+    """
+    Evaluates up to sample_size combinations spread evenly over the grid in
+    both dtype and float64, and checks that every value lies within
+    ERROR_BOUNDS[dtype] of the float64 reference (relative error).
+
+    :return: float, the largest relative error observed
+    :raises ValueError: if the error exceeds the documented bound, e.g. for
+        models whose operation terms cancel; use float64 for those
+    """
+    dtype = result_dtype(dtype)
+    param_names = list(param_grid.keys())
+    total = 1
+    for name in param_names:
+        total *= len(param_grid[name])
+    count = min(sample_size, total)
+    ordinals = sorted({i * total // count for i in range(count)}) if count else []
+    combos = [combo_at(param_grid, ordinal) for ordinal in ordinals]
+
+    resolver = ParameterResolver(max_entries=0)
+    resolved_models = [
+        resolver.resolve(business_model_factory(dict(zip(param_names, combo))), global_parameters)
+        for combo in combos
+    ]
+    error = 0.0
+    for reference, candidate in zip(evaluate_models(resolved_models, simulation_period),
+                                    evaluate_models(resolved_models, simulation_period, dtype)):
+        difference = np.abs(candidate.astype(np.float64) - reference)
+        scale = np.maximum(np.abs(reference), np.finfo(dtype).tiny)
+        if difference.size:
+            error = max(error, float(np.max(difference / scale)))
+
+    bound = ERROR_BOUNDS[dtype.name]
+    if error > bound:
+        raise ValueError(
+            f"{dtype.name} results differ from the float64 reference by up to {error:.3g} "
+            f"(relative), above the documented bound {bound:.3g}; use float64"
+        )
+    return error
+
+
+def measure_chunk(param_names, combos, business_model_factory, simulation_period,
+                  global_parameters=None, offset=0, dtype=np.float64):
+    """
+    Evaluates one chunk of combinations while tracing allocations, and returns
+    (SweepArrays, peak bytes allocated per combination). The peak covers
+    building and resolving the models, the intermediate (combos x steps)
+    arrays and the results.
+    """
+    import tracemalloc
+
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    try:
+        arrays = _evaluate_combos(param_names, combos, business_model_factory,
+                                  simulation_period, global_parameters, offset, dtype)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+    return arrays, max(peak - baseline, 1) / max(len(combos), 1)
+
+
+def iter_vectorized_sweep(param_grid, business_model_factory, simulation_period,
+                          global_parameters=None, memory_budget=None, chunk_size=None,
+                          probe_size=256, dtype=np.float64):
+    """
+    Evaluates a sweep in chunks of consecutive grid combinations and yields
+    one SweepArrays per chunk (with .offset set), so only one chunk's models
+    and arrays are alive at a time.
+
+    With memory_budget, the first combination is evaluated on its own under
+    tracemalloc to measure the peak footprint of one combination. The next
+    probe_size combinations, or fewer if that footprint says they would not
+    fit the budget, are measured the same way, and the remaining chunks are
+    sized from that probe to keep each chunk's peak within the budget. Memory
+    held by the consumer of the chunks is not included.
+
+    :param memory_budget: int, bytes allowed per chunk
+    :param chunk_size: int, fixed number of combinations per chunk
+        (used when memory_budget is not given; default: the whole grid)
+    :param probe_size: int, most combinations in the measured probe chunk
+    :param dtype: "float64" or "float32", dtype of each chunk's results
+    """
+    param_names = list(param_grid.keys())
+    total = 1
+    for name in param_names:
+        total *= len(param_grid[name])
+    combos = itertools.product(*(param_grid[name] for name in param_names))
+
+    offset = 0
+    if memory_budget is not None:
+        # A single combination first, so the probe itself respects the budget
+        probe_count = 1
+        for _ in range(2):
+            probe = list(itertools.islice(combos, probe_count))
+            arrays, per_combo = measure_chunk(param_names, probe, business_model_factory,
+                                              simulation_period, global_parameters, offset, dtype)
+            offset += len(probe)
+            yield arrays
+            del arrays
+            probe_count = min(probe_size, int(memory_budget // per_combo))
+            if offset >= total or probe_count < 2:
+                break
+        chunk_size = max(1, int(memory_budget // per_combo))
+    elif chunk_size is None:
+        chunk_size = max(total, 1)
+
+    while offset < total:
+        chunk = list(itertools.islice(combos, chunk_size))
+        yield _evaluate_combos(param_names, chunk, business_model_factory, simulation_period,
+                               global_parameters, offset, dtype)
+        offset += len(chunk)
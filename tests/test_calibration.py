@@ -0,0 +1,91 @@
+# business_model_simulator/tests/test_calibration.py
+
+import io
+import os
+import numpy as np
+import pytest
+from simulator.calibration import Dual, calibrate, simulate_with_gradients
+from simulator.cli import main
+from simulator.sample import create_sample_business_model
+from simulator.scenario import load_scenario
+from simulator.simulator import Simulator
+
+SCENARIO = os.path.join(os.path.dirname(__file__), "..", "example", "cdip_scenario.json")
+
+TRUTH = {"growth_rate": 0.07, "overhead_rate": 0.04, "revenue_factor": 1.3}
+
+def _observed(period=24):
+    sim = Simulator(simulation_period=period)
+    sim.add_business_model(create_sample_business_model(TRUTH))
+    sim.run_simulation()
+    records = sim.collect_results()["ParameterSweepModel"]
+    return np.array([r["costs"] for r in records]), np.array([r["revenues"] for r in records])
+
+def test_dual_arithmetic():
+    x, y = Dual.variables([2.0, 3.0])
+    z = (1 + x) ** 3 * y / x - 2.0 ** y + np.float64(4.0) * abs(-x)
+    assert z.value == pytest.approx(27 * 3 / 2 - 8 + 8)
+    assert z.gradient == pytest.approx([3 * 9 * 3 / 2 - 27 * 3 / 4 + 4, 27 / 2 - 8 * np.log(2.0)])
+    assert x < y and x and not Dual(0.0, x.gradient)
+
+def test_gradients_match_the_reference_engine_and_finite_differences():
+    costs, revenues = _observed(12)
+    series = simulate_with_gradients(create_sample_business_model, TRUTH, 12)
+    np.testing.assert_array_equal(series.costs, costs)
+    np.testing.assert_array_equal(series.revenues, revenues)
+
+    step = 1e-7
+    for column, name in enumerate(series.names):
+        moved = simulate_with_gradients(create_sample_business_model,
+                                        dict(TRUTH, **{name: TRUTH[name] + step}), 12)
+        np.testing.assert_allclose((moved.costs - costs) / step, series.cost_jacobian[:, column],
+                                   rtol=1e-5, atol=1e-6)
+        np.testing.assert_allclose((moved.revenues - revenues) / step,
+                                   series.revenue_jacobian[:, column], rtol=1e-5, atol=1e-6)
+
+def test_calibrate_recovers_parameters_in_few_evaluations():
+    costs, revenues = _observed()
+    revenues[[3, 10]] = np.nan
+    result = calibrate(create_sample_business_model,
+                       {"growth_rate": 0.0, "overhead_rate": 0.01, "revenue_factor": 1.0},
+                       costs, revenues, bounds={"overhead_rate": (0.0, None)})
+    assert result.converged and result.evaluations <= 20
+    for name, value in TRUTH.items():
+        assert result.parameters[name] == pytest.approx(value, rel=1e-8)
+    assert result.rmse < 1e-6
+
+    noisy = calibrate(create_sample_business_model, {"growth_rate": 0.0},
+                      costs * (1.0 + 0.01 * np.cos(np.arange(24))), fixed={"overhead_rate": 0.04})
+    assert noisy.parameters["growth_rate"] == pytest.approx(0.07, abs=0.01)
+    assert noisy.standard_errors["growth_rate"] > 0
+
+def test_insensitive_parameters_are_rejected():
+    scenario = load_scenario(SCENARIO, cache_dir=None)
+    costs, revenues = _observed(12)
+    with pytest.raises(ValueError, match="Audit.execution_cost"):
+        calibrate(scenario.factory(), {"Audit.execution_cost": 1.0}, costs)
+    with pytest.raises(ValueError, match="overhead_rate"):
+        calibrate(create_sample_business_model, {"overhead_rate": 0.0}, costs)
+
+def test_parameters_converted_to_floats_are_named():
+    def factory(params):
+        return create_sample_business_model(dict(params, growth_rate=float(params["growth_rate"])))
+
+    costs, revenues = _observed(12)
+    with pytest.raises(ValueError, match=r"\['growth_rate'\]"):
+        simulate_with_gradients(factory, {"growth_rate": 0.07, "overhead_rate": 0.04}, 12)
+    with pytest.raises(ValueError, match="growth_rate"):
+        calibrate(factory, {"growth_rate": 0.0}, costs, fixed={"overhead_rate": 0.04})
+
+def test_calibrate_command(tmp_path):
+    costs, revenues = _observed(12)
+    path = tmp_path / "observed.csv"
+    lines = ["step,costs,revenues"] + [f"{i},{float(c)!r},{float(r)!r}"
+                                       for i, (c, r) in enumerate(zip(costs, revenues))]
+    path.write_text("\n".join(lines) + "\n")
+    out = io.StringIO()
+    assert main(["calibrate", "--observed", str(path), "--fit", "growth_rate=0",
+                 "--fit", "revenue_factor=1", "--param", "overhead_rate=0.04",
+                 "--bound", "growth_rate=-0.5:"], out=out) == 0
+    text = out.getvalue()
+    assert "growth_rate = 0.07" in text and "converged" in text
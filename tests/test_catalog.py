@@ -0,0 +1,84 @@
+# business_model_simulator/tests/test_catalog.py
+
+import numpy as np
+import pytest
+from cdip.data_exploration_operation import DataExplorationOperation
+from cdip.data_purchase_opertation import DataPurchaseOperation
+from simulator.business_model import BusinessModel
+from simulator.catalog import (
+    ConsumerPopulation, DatasetCatalog, attach_catalog, catalog_volumes, pack_bits
+)
+from simulator.schedules import PiecewiseSchedule
+from simulator.simulator import Simulator
+from simulator.transaction_model import TransactionModel
+
+def _brute_force(catalog, needs, purposes, mode, datasets=None):
+    tags, sharing = catalog.tags, catalog.sharing
+    if datasets is not None:
+        tags, sharing = tags[datasets], sharing[datasets]
+    shared = (sharing[None, :] & purposes[:, None]) == purposes[:, None]
+    overlap = tags[None, :] & needs[:, None]
+    wanted = overlap != 0 if mode == "any" else overlap == needs[:, None]
+    return (shared & wanted).sum(axis=1)
+
+@pytest.mark.parametrize("mode", ["any", "all"])
+def test_match_counts_equal_pairwise_matching(mode):
+    catalog = DatasetCatalog.random(400, 7, 3, tag_probability=0.3, seed=1)
+    consumers = ConsumerPopulation.random(250, 7, 3, need_probability=0.25,
+                                          purpose_probability=0.3, seed=2)
+    counts = catalog.match_counts(consumers.needs, consumers.purposes, mode=mode)
+    expected = _brute_force(catalog, consumers.needs, consumers.purposes, mode)
+    assert counts.tolist() == expected.tolist()
+    assert expected.any()
+
+def test_bitsets_are_validated():
+    assert pack_bits([[True, False, True], [False, False, False]]).tolist() == [5, 0]
+    with pytest.raises(ValueError):
+        DatasetCatalog([8], [0], tag_bits=3, purpose_bits=1)
+    with pytest.raises(ValueError):
+        DatasetCatalog([0], [0], tag_bits=20, purpose_bits=8)
+    catalog = DatasetCatalog([1, 3], [1, 0], tag_bits=2, purpose_bits=1)
+    with pytest.raises(ValueError):
+        catalog.match_counts([1], [1], mode="some")
+
+def test_volumes_follow_listing_and_joining_steps():
+    """
+    Each step matches the consumers joined so far against the datasets listed
+    so far, exactly as pairwise matching would.
+    """
+    catalog = DatasetCatalog.random(300, 6, 2, tag_probability=0.3, listing_steps=4, seed=3)
+    consumers = ConsumerPopulation.random(200, 6, 2, need_probability=0.3,
+                                          purpose_probability=0.4, joining_steps=5, seed=4)
+    volumes = catalog_volumes(catalog, consumers, 6, browse_limit=3, purchase_rate=0.5)
+
+    for step in range(6):
+        active = consumers.joined_step <= step
+        counts = _brute_force(catalog, consumers.needs[active], consumers.purposes[active], "any",
+                              datasets=catalog.listed_step <= step)
+        assert volumes.exploration[step] == np.minimum(counts, 3).sum()
+        assert volumes.purchase[step] == 0.5 * np.count_nonzero(counts)
+        assert volumes.active_consumers[step] == active.sum()
+    assert volumes.preference.tolist() == \
+        np.bincount(catalog.listed_step, minlength=6).tolist()
+
+def test_volumes_drive_operations():
+    catalog = DatasetCatalog.random(100, 5, 2, listing_steps=3, seed=5)
+    consumers = ConsumerPopulation.random(80, 5, 2, joining_steps=4, seed=6)
+    volumes = catalog_volumes(catalog, consumers, 5)
+
+    model = BusinessModel("Marketplace", TransactionModel([
+        DataExplorationOperation("DataExploration", {"variable_cost": 0.1}),
+        DataPurchaseOperation("DataPurchase", {"revenue_per_unit": 20.0}),
+    ]))
+    attach_catalog(model, volumes)
+    sim = Simulator(simulation_period=5)
+    sim.add_business_model(model)
+    sim.run_simulation()
+    results = sim.collect_results()["Marketplace"]
+    np.testing.assert_allclose([r["costs"] for r in results], 0.1 * volumes.exploration)
+    np.testing.assert_allclose([r["revenues"] for r in results], 20.0 * volumes.purchase)
+
+    # Joining and listing steps already model growth
+    with pytest.raises(ValueError, match="growth_rate"):
+        attach_catalog(model, volumes, global_parameters={"growth_rate": PiecewiseSchedule({0: 0.0, 3: 0.1})})
+    attach_catalog(model, volumes, global_parameters={"growth_rate": PiecewiseSchedule({0: 0.0, 9: 0.1})})
@@ -0,0 +1,74 @@
+# business_model_simulator/tests/test_chain.py
+
+import numpy as np
+import pytest
+from simulator.business_model import BusinessModel
+from simulator.chain import ChainModel, attach_chain, operation_volumes, queue_backlog
+from simulator.equivalence import assert_sweep_equivalent
+from simulator.operation import Operation
+from simulator.schedules import PiecewiseSchedule
+from simulator.simulator import Simulator
+from simulator.transaction_model import TransactionModel
+
+def _loop_backlog(demand, capacity, initial):
+    backlog, out = initial, []
+    for d, c in zip(demand, capacity):
+        backlog = max(0.0, backlog + d - c)
+        out.append(backlog)
+    return out
+
+def test_backlog_matches_lindley_recursion():
+    """
+    The cumulative-sum queue equals the step-by-step recursion for every
+    scenario row, with and without an initial backlog.
+    """
+    rng = np.random.default_rng(0)
+    demand = rng.uniform(0.0, 20.0, (50, 30))
+    capacity = rng.uniform(5.0, 15.0, (1, 30))
+    initial = rng.uniform(0.0, 30.0, 50)
+    backlog = queue_backlog(demand, capacity, initial)
+    for row in range(50):
+        np.testing.assert_allclose(
+            backlog[row], _loop_backlog(demand[row], capacity[0], initial[row]), atol=1e-9)
+
+    state = ChainModel(10.0, congestion_premium=0.5, initial_backlog=4.0).evaluate(
+        [12.0, 3.0, 10.0, 30.0], 2.0)
+    assert state.backlog.tolist() == [6.0, 0.0, 0.0, 20.0]
+    assert state.processed.tolist() == [10.0, 9.0, 10.0, 10.0]
+    assert state.gas_price.tolist() == [2.6, 2.0, 2.0, 4.0]
+    with pytest.raises(ValueError):
+        ChainModel(0.0).evaluate([1.0], 1.0)
+
+def _factory(params):
+    swap = Operation("Swap", {"base_transaction_volume": 100.0, "gas_per_transaction": 2.0})
+    mint = Operation("Mint", {"base_transaction_volume": 10.0, "gas_per_transaction": 5.0,
+                              "direct_cost": 1.0})
+    offchain = Operation("Offchain", {"base_transaction_volume": 1000.0, "variable_cost": 0.01})
+    model = BusinessModel("Chain", TransactionModel([swap, mint, offchain],
+                                                    {"growth_rate": params.get("growth_rate", 0.2)}))
+    chain = ChainModel.from_throughput(1.0, 250.0, 1.0, congestion_premium=params.get("premium", 1.0))
+    attach_chain(model, chain, 8, {"base_gas_price": PiecewiseSchedule({0: 0.01, 4: 0.02})})
+    return model
+
+def test_congested_gas_price_feeds_operation_costs():
+    """
+    Demand growing past capacity builds a backlog whose higher gas price is
+    charged by every gas-using operation.
+    """
+    model = _factory({})
+    volumes = operation_volumes(model, 8)
+    np.testing.assert_allclose(volumes[0], 100.0 * 1.2 ** np.arange(8))
+
+    demand = 2.0 * volumes[0] + 5.0 * volumes[1]
+    base = np.where(np.arange(8) < 4, 0.01, 0.02)
+    state = ChainModel(250.0).evaluate(demand, base)
+    assert state.backlog[0] == 0.0 and state.backlog[-1] > 0.0
+
+    sim = Simulator(simulation_period=8)
+    sim.add_business_model(model)
+    sim.run_simulation()
+    costs = [r["costs"] for r in sim.collect_results()["Chain"]]
+    expected = 1.0 + 0.01 * volumes[2] + demand * state.gas_price
+    np.testing.assert_allclose(costs, expected)
+
+    assert_sweep_equivalent({"growth_rate": [0.0, 0.2, 0.4], "premium": [0.0, 2.0]}, _factory, 8)
@@ -0,0 +1,60 @@
+# business_model_simulator/tests/test_checkpoint.py
+
+import pytest
+from simulator.simulator import Simulator
+from simulator.checkpoint import (
+    iter_checkpointed_sweep, read_manifest, read_sweep_log, CheckpointError
+)
+from simulator.sample import create_sample_business_model
+
+PARAM_GRID = {"growth_rate": [0.0, 0.1, 0.2], "overhead_rate": [0.0, 0.05]}
+
+def test_checkpointed_sweep_matches_plain_sweep(tmp_path):
+    sim = Simulator(simulation_period=4)
+    log_path = str(tmp_path / "sweep.jsonl")
+    expected = sim.run_parameter_sweep(PARAM_GRID, create_sample_business_model)
+    results = sim.run_parameter_sweep(PARAM_GRID, create_sample_business_model, checkpoint=log_path)
+
+    assert results == expected
+    assert list(results) == list(expected)
+    assert read_manifest(log_path)["completed"] == 6
+
+def test_resume_skips_completed_combos(tmp_path):
+    """
+    An interrupted sweep resumes from the log, re-running only missing combos
+    and ignoring a partially written last line.
+    """
+    sim = Simulator(simulation_period=4)
+    log_path = str(tmp_path / "sweep.jsonl")
+    sweep = iter_checkpointed_sweep(sim, PARAM_GRID, create_sample_business_model, log_path,
+                                    checkpoint_every=1)
+    for _ in range(3):
+        next(sweep)
+    sweep.close()
+    with open(log_path, "a") as f:
+        f.write('{"ordinal": 3, "combo_k')
+
+    calls = []
+    def counting_factory(combo_params):
+        calls.append(combo_params)
+        return create_sample_business_model(combo_params)
+
+    results = sim.run_parameter_sweep(PARAM_GRID, counting_factory, checkpoint=log_path,
+                                      metrics=["total_profit"])
+    assert len(calls) == 3
+    assert results == sim.run_parameter_sweep(PARAM_GRID, create_sample_business_model)
+    assert len(sim.sweep_metrics["ParameterSweepModel"]["total_profit"]) == 6
+
+    header, entries, _ = read_sweep_log(log_path)
+    assert sorted(entries) == list(range(6))
+
+def test_resume_rejects_other_grid(tmp_path):
+    sim = Simulator(simulation_period=4)
+    log_path = str(tmp_path / "sweep.jsonl")
+    sim.run_parameter_sweep(PARAM_GRID, create_sample_business_model, checkpoint=log_path)
+    with pytest.raises(CheckpointError):
+        sim.run_parameter_sweep({"growth_rate": [0.3]}, create_sample_business_model,
+                                checkpoint=log_path)
+    # Starting over is always allowed
+    assert len(sim.run_parameter_sweep({"growth_rate": [0.3]}, create_sample_business_model,
+                                       checkpoint=log_path, resume=False)) == 1
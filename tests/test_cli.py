@@ -0,0 +1,65 @@
+# business_model_simulator/tests/test_cli.py
+
+import csv
+import io
+import json
+import subprocess
+import sys
+import pytest
+from simulator.cli import main, choose_engine
+from simulator.utils import parse_grid_values
+
+def test_parse_grid_values():
+    assert parse_grid_values("0:0.06:0.02") == pytest.approx([0.0, 0.02, 0.04])
+    assert parse_grid_values("1,2.5,High") == [1, 2.5, "High"]
+
+def test_choose_engine():
+    small = {"growth_rate": [0.0, 0.1]}
+    assert choose_engine("auto", small, 10) == "python"
+    assert choose_engine("auto", small, 10, "out.npz") == "vectorized"
+    assert choose_engine("auto", {"a": list(range(1000)), "b": list(range(100))}, 10) == "vectorized"
+    assert choose_engine("python", small, 10, "out.npz") == "python"
+
+def test_run_command_prints_json():
+    out = io.StringIO()
+    assert main(["run", "--period", "3", "--param", "growth_rate=0.1",
+                 "--metrics", "total_profit"], out=out) == 0
+    summary = json.loads(out.getvalue())
+    assert len(summary["results"]["ParameterSweepModel"]) == 3
+    assert "total_profit" in summary["metrics"]["ParameterSweepModel"]
+
+@pytest.mark.parametrize("engine", ["python", "vectorized"])
+def test_sweep_command_writes_csv(tmp_path, engine):
+    output = tmp_path / "sweep.csv"
+    out = io.StringIO()
+    main(["sweep", "--period", "4", "--grid", "growth_rate=0,0.1", "--grid", "overhead_rate=0.0,0.05",
+          "--engine", engine, "--output", str(output)], out=out)
+
+    with open(output, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 2 * 2 * 4
+    assert rows[0]["combo_key"] == "growth_rate=0_overhead_rate=0.0"
+    assert engine in out.getvalue()
+
+def test_python_path_does_not_import_numpy():
+    """
+    Small single-scenario runs must not pay NumPy's import cost.
+    """
+    code = (
+        "import io, sys; from simulator.cli import main; "
+        "main(['run', '--period', '5'], out=io.StringIO()); "
+        "sys.exit(1 if 'numpy' in sys.modules else 0)"
+    )
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
+
+def test_default_factory_is_packaged():
+    """
+    The default --factory lives in the simulator package, so the CLI does not
+    depend on the example scripts being importable.
+    """
+    from simulator.cli import DEFAULT_FACTORY
+    from simulator.utils import import_object
+
+    factory = import_object(DEFAULT_FACTORY)
+    assert factory.__module__.startswith("simulator.")
+    assert factory({"growth_rate": 0.1}).name == "ParameterSweepModel"
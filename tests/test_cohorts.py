@@ -0,0 +1,88 @@
+# business_model_simulator/tests/test_cohorts.py
+
+import numpy as np
+import pytest
+from cdip.data_purchase_opertation import DataPurchaseOperation
+from cdip.registration_operation import RegistrationOperation
+from simulator import cohorts as cohort_module
+from simulator.business_model import BusinessModel
+from simulator.cohorts import CohortFactory, CohortModel, attach_cohorts, cohort_convolve
+from simulator.equivalence import assert_sweep_equivalent
+from simulator.schedules import PiecewiseSchedule
+from simulator.simulator import Simulator
+from simulator.transaction_model import TransactionModel
+
+def test_convolution_paths_agree(monkeypatch):
+    """
+    The triangular matrix and the FFT both equal the cohort sum.
+    """
+    rng = np.random.default_rng(0)
+    new_users = rng.random((3, 40))
+    kernel = rng.random(25)
+    expected = np.zeros_like(new_users)
+    padded = np.concatenate([kernel, np.full(15, kernel[-1])])
+    for t in range(40):
+        for c in range(t + 1):
+            expected[:, t] += new_users[:, c] * padded[t - c]
+    np.testing.assert_allclose(cohort_convolve(new_users, kernel), expected, rtol=1e-12)
+    monkeypatch.setattr(cohort_module, "FFT_MIN_STEPS", 1)
+    np.testing.assert_allclose(cohort_convolve(new_users, kernel), expected, rtol=1e-9)
+
+def test_geometric_churn_matches_the_step_recursion():
+    """
+    With constant churn, active users follow active[t] = active[t-1] * (1 - churn) + new[t].
+    """
+    cohorts = CohortModel(10000.0, churn_rate=0.1, initial_users=50.0,
+                          activity={"Purchase": [0.0, 2.0, 1.0]})
+    outcome = cohorts.evaluate(PiecewiseSchedule({0: 0.05, 6: 0.2}), 12)
+    assert outcome.new_users[0] == pytest.approx(50.0 + 0.05 * 9950.0)
+    assert outcome.new_users.sum() < 10000.0
+
+    active = 0.0
+    for t in range(12):
+        active = active * 0.9 + outcome.new_users[t]
+        assert outcome.active_users[t] == pytest.approx(active)
+
+    # Cohorts buy nothing in their first step, twice in the second, then once
+    purchases = outcome.volumes["Purchase"]
+    new, kept = outcome.new_users, 0.9 ** np.arange(12)
+    assert purchases[0] == 0.0
+    assert purchases[3] == pytest.approx(2.0 * new[2] * kept[1] + new[1] * kept[2] + new[0] * kept[3])
+
+    batch = cohorts.evaluate(np.array([[0.05], [0.1]]), 12)
+    assert batch.active_users.shape == (2, 12)
+    with pytest.raises(ValueError):
+        cohorts.evaluate(1.5, 12)
+
+def _factory(params):
+    registration = RegistrationOperation("Registration", {"administrative_cost": 0.5,
+                                                          "variable_cost": 0.1})
+    purchase = DataPurchaseOperation("DataPurchase", {"revenue_per_unit": 3.0})
+    return BusinessModel("CDIP", TransactionModel([registration, purchase]),
+                         {"user_adoption_rate": params.get("business_model.user_adoption_rate", 0.1)})
+
+def test_adoption_rate_drives_both_engines():
+    """
+    attach_cohorts turns user_adoption_rate into operation volumes.
+    """
+    cohorts = CohortModel(5000.0, retention=[1.0, 0.6, 0.45, 0.4],
+                          activity={"Registration": [1.0, 0.0], "DataPurchase": [0.2, 0.5]})
+    model = _factory({})
+    outcome = attach_cohorts(model, cohorts, 10)
+    np.testing.assert_allclose(outcome.volumes["Registration"], outcome.new_users)
+
+    sim = Simulator(simulation_period=10)
+    sim.add_business_model(model)
+    sim.run_simulation()
+    revenues = [r["revenues"] for r in sim.collect_results()["CDIP"]]
+    np.testing.assert_allclose(revenues, 3.0 * outcome.volumes["DataPurchase"])
+
+    factory = CohortFactory(_factory, cohorts, 10)
+    _, _, revenues = assert_sweep_equivalent(
+        {"business_model.user_adoption_rate": [0.02, 0.1, 0.3]}, factory, 10)
+    assert (np.diff(revenues.sum(axis=1)) > 0).all()
+
+    with pytest.raises(ValueError):
+        attach_cohorts(BusinessModel("Bare", TransactionModel([])), cohorts, 10)
+    with pytest.raises(ValueError, match="growth_rate"):
+        attach_cohorts(model, cohorts, 10, global_parameters={"growth_rate": 0.05})
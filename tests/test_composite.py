@@ -0,0 +1,103 @@
+# business_model_simulator/tests/test_composite.py
+
+import numpy as np
+import pytest
+from simulator.business_model import BusinessModel
+from simulator.composite import CompositeBusinessModel, PortfolioRollup
+from simulator.operation import Operation
+from simulator.simulator import Simulator
+from simulator.transaction_model import TransactionModel
+
+def _leaf(name, volume, fee=2.0):
+    op = Operation("Sale", {"base_transaction_volume": volume, "variable_cost": 0.5,
+                            "revenue_per_unit": fee})
+    return BusinessModel(name, TransactionModel([op], {"growth_rate": 0.1}))
+
+def _platform():
+    europe = CompositeBusinessModel("EU", [_leaf("Ads", 10.0), _leaf("Data", 4.0)],
+                                    parameters={"growth_rate": 0.2})
+    america = CompositeBusinessModel("US", [
+        CompositeBusinessModel("East", [_leaf("Ads", 7.0)]),
+        _leaf("Data", 3.0),
+    ])
+    return CompositeBusinessModel("Platform", [europe, america, _leaf("Licensing", 1.0)])
+
+def _standalone(model, global_parameters=None):
+    sim = Simulator(simulation_period=5, global_parameters=global_parameters)
+    sim.add_business_model(model)
+    sim.run_simulation()
+    records = sim.collect_results()[model.name]
+    return np.array([r["costs"] for r in records]), np.array([r["revenues"] for r in records])
+
+def test_rollups_sum_standalone_leaves():
+    """
+    Every composite's series is the sum of its leaves run on their own,
+    with composite parameters passed down as global parameters.
+    """
+    root = _platform()
+    sim = Simulator(simulation_period=5)
+    rollup = sim.run_portfolio(root, metrics=["cumulative_profit"])
+    assert rollup.paths[:4] == ["Platform", "Platform/EU", "Platform/US", "Platform/Licensing"]
+    assert rollup.children("Platform/US") == ["Platform/US/East", "Platform/US/Data"]
+
+    europe = [_standalone(leaf, {"growth_rate": 0.2}) for leaf in root.children[0].children]
+    np.testing.assert_allclose(rollup.series("Platform/EU")[0], europe[0][0] + europe[1][0])
+    np.testing.assert_allclose(rollup.series("Platform/EU/Ads")[1], europe[0][1])
+    leaves = [_standalone(leaf) for leaf in root.children[1].leaves() + [root.children[2]]]
+    np.testing.assert_allclose(rollup.series("Platform")[1],
+                               europe[0][1] + europe[1][1] + sum(revenues for _, revenues in leaves))
+
+    python = PortfolioRollup(root, 5, engine="python")
+    np.testing.assert_allclose(python.costs, rollup.costs, rtol=1e-12)
+    assert [r["revenues"] for r in sim.collect_results()["Platform/US"]] == pytest.approx(
+        rollup.series("Platform/US")[1].tolist())
+    assert "Platform/US/Data" not in sim.collect_results()
+    assert sim.collect_metrics()["Platform"]["cumulative_profit"][-1] == pytest.approx(
+        (rollup.revenues[0] - rollup.costs[0]).sum())
+
+    with pytest.raises(ValueError):
+        PortfolioRollup(CompositeBusinessModel("Dup", [_leaf("A", 1.0), _leaf("A", 2.0)]), 5)
+    with pytest.raises(ValueError):
+        PortfolioRollup(CompositeBusinessModel("Empty"), 5)
+
+def test_update_leaf_recomputes_its_path():
+    """
+    Updating one leaf changes only its ancestors and matches a full rebuild.
+    """
+    root = _platform()
+    rollup = PortfolioRollup(root, 5)
+    before = rollup.revenues.copy()
+
+    east = root.children[1].children[0]
+    east.children[0] = _leaf("Ads", 20.0, fee=3.0)
+    rollup.update_leaf("Platform/US/East/Ads", east.children[0])
+    changed = {rollup.paths[row] for row in np.flatnonzero((rollup.revenues != before).any(axis=1))}
+    assert changed == {"Platform", "Platform/US", "Platform/US/East", "Platform/US/East/Ads"}
+
+    rebuilt = PortfolioRollup(root, 5)
+    np.testing.assert_allclose(rollup.costs, rebuilt.costs, rtol=1e-12)
+    np.testing.assert_allclose(rollup.revenues, rebuilt.revenues, rtol=1e-12)
+
+    with pytest.raises(ValueError):
+        rollup.update_leaf("Platform/US")
+    with pytest.raises(KeyError):
+        rollup.update_leaf("Platform/Asia")
+
+def test_large_portfolio_rolls_up_every_level():
+    """
+    Wide trees consolidate correctly at every level.
+    """
+    regions = [
+        CompositeBusinessModel(f"R{r}", [
+            CompositeBusinessModel(f"L{line}", [_leaf(f"V{v}", 1.0 + v) for v in range(5)])
+            for line in range(8)
+        ])
+        for r in range(6)
+    ]
+    rollup = PortfolioRollup(CompositeBusinessModel("Root", regions), 3)
+    assert rollup.is_leaf.sum() == 240
+    leaves = rollup.revenues[rollup.is_leaf]
+    np.testing.assert_allclose(rollup.revenues[0], leaves.sum(axis=0))
+    line = rollup.index("Root/R2/L3")
+    first, last = rollup.index("Root/R2/L3/V0"), rollup.index("Root/R2/L3/V4")
+    np.testing.assert_allclose(rollup.revenues[line], rollup.revenues[first:last + 1].sum(axis=0))
@@ -0,0 +1,68 @@
+# business_model_simulator/tests/test_diff.py
+
+import csv
+import io
+import numpy as np
+from simulator.cli import main
+from simulator.diff import diff_results, load_results
+from simulator.output import write_sweep_arrays_to_csv, write_sweep_arrays_to_npz
+from simulator.sample import create_sample_business_model
+from simulator.vectorized import run_vectorized_sweep
+
+PARAM_GRID = {"growth_rate": [0.0, 0.05, 0.1], "overhead_rate": [0.0, 0.02]}
+
+def test_csv_and_npz_results_align(tmp_path):
+    """
+    The same sweep written as .csv and .npz loads to identical tables.
+    """
+    arrays = run_vectorized_sweep(PARAM_GRID, create_sample_business_model, 5)
+    write_sweep_arrays_to_csv(arrays, str(tmp_path / "a.csv"))
+    write_sweep_arrays_to_npz(arrays, str(tmp_path / "a.npz"))
+
+    table = load_results(str(tmp_path / "a.csv"))
+    assert table.keys == [(key, "ParameterSweepModel") for key in arrays.combo_keys]
+    np.testing.assert_array_equal(table.costs, arrays.costs)
+    result = diff_results(str(tmp_path / "a.csv"), str(tmp_path / "a.npz"))
+    assert result.equal and result.compared == 2 * 6 * 5
+
+def test_cli_csv_and_npz_match_with_integer_grid_values(tmp_path):
+    """
+    An integer grid value (overhead_rate=0) keeps its spelling in the .npz
+    keys, so CSV and NPZ output of the same sweep compare row by row.
+    """
+    grid = ["--period", "4", "--grid", "growth_rate=0:0.26:0.05", "--grid", "overhead_rate=0,0.02"]
+    assert main(["sweep", *grid, "--output", str(tmp_path / "a.csv")], out=io.StringIO()) == 0
+    assert main(["sweep", *grid, "--engine", "vectorized", "--output", str(tmp_path / "a.npz")],
+                out=io.StringIO()) == 0
+
+    result = diff_results(str(tmp_path / "a.csv"), str(tmp_path / "a.npz"))
+    assert not result.only_in_a and not result.only_in_b
+    assert result.equal and result.compared == 2 * 12 * 4
+    assert ("growth_rate=0.0_overhead_rate=0", "ParameterSweepModel") in load_results(
+        str(tmp_path / "a.npz")).keys
+
+def test_diff_reports_differences_and_missing_rows(tmp_path):
+    arrays = run_vectorized_sweep(PARAM_GRID, create_sample_business_model, 4)
+    write_sweep_arrays_to_csv(arrays, str(tmp_path / "a.csv"))
+    arrays.revenues[2, 3] += 0.5
+    arrays.costs[4, 1] = np.nan
+    write_sweep_arrays_to_csv(arrays, str(tmp_path / "b.csv"))
+
+    # Drop the last combination from the second file
+    with open(tmp_path / "b.csv", newline="") as f:
+        rows = list(csv.reader(f))
+    with open(tmp_path / "b.csv", "w", newline="") as f:
+        csv.writer(f).writerows(rows[:-4])
+
+    result = diff_results(str(tmp_path / "a.csv"), str(tmp_path / "b.csv"), worst=5)
+    assert not result.equal
+    assert result.mismatches == 2
+    assert result.only_in_a == [(arrays.combo_keys[-1], "ParameterSweepModel")]
+    assert result.max_abs == np.inf
+    assert {(w[0], w[1], w[3]) for w in result.worst} == {
+        ("costs", arrays.combo_keys[4], 1), ("revenues", arrays.combo_keys[2], 3)
+    }
+
+    out = io.StringIO()
+    assert main(["diff", str(tmp_path / "a.csv"), str(tmp_path / "b.csv")], out=out) == 1
+    assert "2 outside tolerance" in out.getvalue()
@@ -0,0 +1,76 @@
+# business_model_simulator/tests/test_distribution.py
+
+import numpy as np
+import pytest
+from cdip.data_purchase_opertation import DataPurchaseOperation
+from cdip.profit_distribution_operation import ProfitDistributionOperation
+from simulator.business_model import BusinessModel
+from simulator.distribution import DistributionLedger, attach_distribution
+from simulator.equivalence import assert_sweep_equivalent
+from simulator.simulator import Simulator
+from simulator.transaction_model import TransactionModel
+
+def test_pro_rata_split_with_minimum_payout():
+    """
+    Amounts are split by weight; balances below min_payout carry over and
+    every unit is either paid or still held.
+    """
+    ledger = DistributionLedger.from_contributions([0, 0, 0, 1, 2, 2], owner_count=4, min_payout=1.0)
+    assert ledger.weights.tolist() == [3.0, 1.0, 2.0, 0.0]
+
+    assert ledger.distribute(3.0) == (2, 2.5)
+    assert ledger.balances.tolist() == [0.0, 0.5, 0.0, 0.0]
+    assert ledger.distribute(3.0) == (3, 3.5)
+    assert ledger.paid.tolist() == [3.0, 1.0, 2.0, 0.0]
+    assert ledger.payouts_by([0, 1, 1, 1]).tolist() == [3.0, 3.0]
+
+    record = DistributionLedger(np.ones(5), min_payout=0.3).run([1.0, 0.0, 0.5, 1.0])
+    assert record.transfers.tolist() == [0.0, 0.0, 5.0, 0.0]
+    np.testing.assert_allclose(np.cumsum(record.paid) + record.held, np.cumsum(record.amounts))
+
+    empty = DistributionLedger([0.0, 0.0])
+    assert empty.distribute(5.0) == (0, 0.0) and empty.undistributed == 5.0
+    with pytest.raises(ValueError):
+        DistributionLedger([1.0, -1.0])
+
+def test_large_ledger_conserves_amounts():
+    rng = np.random.default_rng(7)
+    owners = 200000
+    ledger = DistributionLedger.from_contributions(rng.integers(0, owners, 3 * owners),
+                                                   owner_count=owners, min_payout=0.05)
+    record = ledger.run(rng.uniform(0.0, 5000.0, 12))
+    assert ledger.paid.sum() + ledger.balances.sum() == pytest.approx(record.amounts.sum())
+    assert record.held[-1] == pytest.approx(ledger.balances.sum())
+    # Owners without contributions are never paid
+    assert not ledger.paid[ledger.weights == 0].any()
+
+def _factory(params):
+    purchase = DataPurchaseOperation("DataPurchase", {"licensing_fees": 10.0,
+                                                      "revenue_per_unit": 2.0,
+                                                      "base_transaction_volume": 5.0})
+    distribution = ProfitDistributionOperation("ProfitDistribution", {
+        "direct_cost": 2.0, "cost_per_transfer": params.get("cost_per_transfer", 0.01)
+    })
+    model = BusinessModel("Marketplace", TransactionModel([purchase, distribution],
+                                                          {"growth_rate": 0.1}))
+    ledger = DistributionLedger(np.arange(100) % 7, min_payout=0.5)
+    attach_distribution(model, ledger, 6, revenue_share=0.4)
+    return model
+
+def test_transfer_costs_feed_into_operation_cost():
+    """
+    Transfers counted by the ledger are charged by ProfitDistributionOperation.
+    """
+    model = _factory({})
+    ledger = DistributionLedger(np.arange(100) % 7, min_payout=0.5)
+    purchase_revenue = [10.0 + 2.0 * 5.0 * 1.1 ** step for step in range(6)]
+    record = ledger.run([0.4 * r for r in purchase_revenue])
+
+    sim = Simulator(simulation_period=6)
+    sim.add_business_model(model)
+    sim.run_simulation()
+    costs = [r["costs"] for r in sim.collect_results()["Marketplace"]]
+    np.testing.assert_allclose(costs, 2.0 + 0.01 * record.transfers)
+    assert record.transfers.max() > 0
+
+    assert_sweep_equivalent({"cost_per_transfer": [0.0, 0.01, 0.05]}, _factory, 6)
@@ -0,0 +1,50 @@
+# business_model_simulator/tests/test_equivalence.py
+
+import pytest
+from simulator import equivalence
+from simulator.equivalence import (
+    ENGINES, EquivalenceError, check_scenario, random_scenario, run_harness
+)
+
+def test_random_scenarios_are_reproducible_and_varied():
+    assert random_scenario(7) == random_scenario(7)
+    classes = {
+        op.get("class")
+        for seed in range(40)
+        for op in random_scenario(seed)["business_models"][0]["transaction_model"]["operations"]
+    }
+    assert None in classes
+    assert any(path and path.startswith("cdip.") for path in classes)
+
+def test_fast_engines_match_reference():
+    """
+    Every fast engine agrees with the reference engine on random scenarios.
+    """
+    assert run_harness(range(25), engines=[n for n in ENGINES if n != "parallel"]) == {}
+    assert run_harness(range(3), engines=["parallel"]) == {}
+
+def test_harness_reports_disagreement(monkeypatch):
+    """
+    An engine whose costs and revenues drift from the reference is caught.
+    """
+    def drifting(param_grid, factory, simulation_period, global_parameters):
+        names, costs, revenues = ENGINES["vectorized"](param_grid, factory, simulation_period,
+                                                       global_parameters)
+        return names, costs + 1.0, revenues * 0.999
+
+    monkeypatch.setitem(equivalence.ENGINES, "broken", drifting)
+    document = random_scenario(3)
+    transaction_model = document["business_models"][0]["transaction_model"]
+    transaction_model["parameters"] = {}
+    transaction_model["operations"][0].pop("class", None)
+    transaction_model["operations"][0]["parameters"]["base_revenue"] = 10.0
+    document["sweep"]["grid"] = {"growth_rate": [0.0, 0.1]}
+    report = check_scenario(document, engines=["vectorized", "broken"])
+    assert report["vectorized"] == []
+    revenues = [m for m in report["broken"] if m[0] == "revenues"]
+    assert revenues and all(actual == pytest.approx(expected * 0.999)
+                            for _, _, _, expected, actual in revenues)
+    assert any(m[0] == "costs" for m in report["broken"])
+
+    with pytest.raises(EquivalenceError, match="broken"):
+        run_harness([3], engines=["broken"])
@@ -0,0 +1,119 @@
+# business_model_simulator/tests/test_governance.py
+
+import numpy as np
+import pytest
+from cdip.data_purchase_opertation import DataPurchaseOperation
+from cdip.governance_operation import GovernanceOperation
+from simulator.business_model import BusinessModel
+from simulator.equivalence import assert_sweep_equivalent
+from simulator.governance import HolderPopulation, attach_governance, simulate_governance
+from simulator.schedules import compound_growth
+from simulator.simulator import Simulator
+from simulator.transaction_model import TransactionModel
+
+def test_quorum_and_threshold():
+    """
+    Deterministic voters make the quorum and approval rules exact.
+    """
+    balances = [40.0, 35.0, 25.0]
+    unanimous = HolderPopulation(balances, turnout=1.0, support=[1.0, 0.0, 1.0])
+    outcome = simulate_governance(unanimous, 4, proposal_rate=2.0, approval_threshold=0.6, seed=1)
+    assert outcome.proposals.sum() == len(outcome.proposal_step) > 0
+    assert outcome.votes_for.tolist() == [65.0] * len(outcome.proposal_step)
+    assert outcome.passed.tolist() == outcome.proposals.tolist()
+    np.testing.assert_allclose(outcome.turnout[outcome.proposals > 0], 1.0)
+
+    blocked = simulate_governance(unanimous, 4, proposal_rate=2.0, approval_threshold=0.7, seed=1)
+    assert not blocked.approved.any()
+
+    absent = HolderPopulation(balances, turnout=[0.0, 0.0, 1.0], support=1.0)
+    below_quorum = simulate_governance(absent, 4, proposal_rate=2.0, quorum=0.3, seed=1)
+    assert below_quorum.proposals.sum() > 0 and not below_quorum.passed.any()
+
+    with pytest.raises(ValueError):
+        HolderPopulation([1.0], turnout=1.5)
+    with pytest.raises(ValueError):
+        simulate_governance(unanimous, 4, method="guess")
+
+@pytest.mark.parametrize("method", ["approximate", "exact"])
+def test_sampled_votes_match_expectations(method):
+    """
+    Both sampling methods reproduce the expected token weights and vote
+    counts over many proposals.
+    """
+    holders = HolderPopulation.random(20000, seed=3)
+    outcome = simulate_governance(holders, 50, proposal_rate=4.0, method=method, whales=64, seed=4)
+    proposals = len(outcome.proposal_step)
+    p_for = holders.turnout * holders.support
+    for sampled, p in ((outcome.votes_for, p_for), (outcome.votes_against, holders.turnout - p_for)):
+        # Within five standard errors of the mean
+        standard_error = np.sqrt((holders.balances ** 2) @ (p * (1.0 - p)) / proposals)
+        assert abs(sampled.mean() - holders.balances @ p) < 5.0 * standard_error
+    assert outcome.votes.sum() / outcome.proposals.sum() == pytest.approx(holders.turnout.sum(), rel=0.01)
+
+def test_approximate_votes_never_exceed_the_supply():
+    """
+    With near-certain turnout the normal approximation often overshoots; the
+    (for, against) pair is scaled so it stays within the tokens held.
+    """
+    holders = HolderPopulation(np.ones(1000), turnout=0.999, support=0.5)
+    outcome = simulate_governance(holders, 20, proposal_rate=20.0, whales=0, seed=2)
+    voting = outcome.votes_for + outcome.votes_against
+    assert len(voting) > 100 and (voting <= holders.supply * (1.0 + 1e-12)).all()
+    assert (outcome.votes_for >= 0).all() and (outcome.votes_against >= 0).all()
+
+def _factory(params):
+    governance = GovernanceOperation("Governance", {"cost_per_proposal": params.get("cost", 5.0),
+                                                    "cost_per_vote": 0.01})
+    purchase = DataPurchaseOperation("DataPurchase", {"licensing_fees": 10.0})
+    model = BusinessModel("DAO", TransactionModel([governance, purchase]))
+    holders = HolderPopulation([50.0, 30.0, 20.0, 10.0], turnout=[1.0, 0.0, 1.0, 1.0], support=1.0)
+    outcome = simulate_governance(holders, 6, proposal_rate=1.5, seed=7)
+    return attach_governance(model, outcome, adjustments={"DataPurchase.licensing_fees": -0.1})
+
+def test_outcomes_feed_costs_and_fees():
+    """
+    Proposal and vote counts are charged by GovernanceOperation, and each
+    passed proposal lowers the licensing fee from the next step on.
+    """
+    holders = HolderPopulation([50.0, 30.0, 20.0, 10.0], turnout=[1.0, 0.0, 1.0, 1.0], support=1.0)
+    outcome = simulate_governance(holders, 6, proposal_rate=1.5, seed=7)
+    assert outcome.votes.tolist() == (3 * outcome.proposals).tolist()
+
+    sim = Simulator(simulation_period=6)
+    sim.add_business_model(_factory({}))
+    sim.run_simulation()
+    results = sim.collect_results()["DAO"]
+    np.testing.assert_allclose([r["costs"] for r in results],
+                               5.0 * outcome.proposals + 0.01 * outcome.votes)
+    enacted = np.concatenate([[0.0], np.cumsum(outcome.passed)[:-1]])
+    np.testing.assert_allclose([r["revenues"] for r in results], 10.0 * 0.9 ** enacted)
+    assert enacted[-1] > 0
+
+    assert_sweep_equivalent({"cost": [0.0, 5.0, 8.0]}, _factory, 6)
+
+def test_transaction_level_adjustments_start_from_the_resolved_value():
+    """
+    An un-prefixed adjustment starts from the value the model resolves and
+    is not overridden by global or business model parameters.
+    """
+    holders = HolderPopulation([1.0], turnout=1.0, support=1.0)
+    outcome = simulate_governance(holders, 6, proposal_rate=1.5, seed=7)
+    purchase = DataPurchaseOperation("DataPurchase", {"revenue_per_unit": 10.0,
+                                                      "base_transaction_volume": 1.0})
+    model = BusinessModel("DAO", TransactionModel([GovernanceOperation("Governance", {}), purchase],
+                                                  {"tax_rate": 0.5}),
+                          {"growth_rate": 0.1})
+    attach_governance(model, outcome, adjustments={"growth_rate": -0.5, "tax_rate": 1.0},
+                      global_parameters={"tax_rate": 0.1})
+
+    sim = Simulator(simulation_period=6, global_parameters={"tax_rate": 0.1})
+    sim.add_business_model(model)
+    sim.run_simulation()
+    enacted = np.concatenate([[0.0], np.cumsum(outcome.passed)[:-1]])
+    growth_rate = 0.1 * 0.5 ** enacted
+    assert enacted[-1] > 0
+    np.testing.assert_allclose(model.parameters["growth_rate"].values, growth_rate)
+    np.testing.assert_allclose(model.parameters["tax_rate"].values, 0.1 * 2.0 ** enacted)
+    np.testing.assert_allclose([r["revenues"] for r in sim.collect_results()["DAO"]],
+                               10.0 * compound_growth(growth_rate))
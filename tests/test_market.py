@@ -0,0 +1,90 @@
+# business_model_simulator/tests/test_market.py
+
+import numpy as np
+import pytest
+from simulator.business_model import BusinessModel
+from simulator.market import Market, logit_shares, run_market
+from simulator.operation import Operation
+from simulator.schedules import PiecewiseSchedule
+from simulator.simulator import Simulator
+from simulator.transaction_model import TransactionModel
+
+def _competitor(name, price, quality=0.0, unit_cost=0.5):
+    op = Operation("Sale", {"base_transaction_volume": 2.0, "variable_cost": unit_cost,
+                            "revenue_per_unit": price})
+    return BusinessModel(name, TransactionModel([op], {"growth_rate": 0.3}),
+                         {"market_price": price, "market_quality": quality})
+
+def test_logit_shares():
+    """
+    Shares sum to one across models (less the outside option's share), are
+    stable for large utilities and favour better products.
+    """
+    utilities = np.array([[1.0, 801.0], [2.0, 802.0], [0.5, 800.5]])
+    shares = logit_shares(utilities)
+    np.testing.assert_allclose(shares.sum(axis=0), 1.0)
+    expected = np.exp(utilities[:, 0]) / np.exp(utilities[:, 0]).sum()
+    np.testing.assert_allclose(shares[:, 0], expected)
+    np.testing.assert_allclose(shares[:, 1], expected)
+
+    with_outside = logit_shares(utilities, outside_utility=1.0)
+    np.testing.assert_allclose(with_outside.sum(axis=0)[0],
+                               1.0 - np.e / (np.exp(utilities[:, 0]).sum() + np.e))
+    assert np.isfinite(with_outside).all()
+
+def test_market_simulation_splits_the_pool():
+    """
+    Every model's volume is its base volume per user times its users, the
+    pool's growth replaces the models' growth_rate, and both engines agree.
+    """
+    market = Market(1000.0, growth_rate=0.1, price_sensitivity=0.5, quality_sensitivity=1.0)
+    sim = Simulator(simulation_period=5)
+    sim.add_business_model(_competitor("Cheap", 1.0))
+    sim.add_business_model(_competitor("Premium", 3.0, quality=PiecewiseSchedule({0: 0.0, 2: 2.0})))
+    outcome = sim.run_market_simulation(market, metrics=["cumulative_profit"])
+
+    pool = 1000.0 * 1.1 ** np.arange(5)
+    np.testing.assert_allclose(outcome.users.sum(axis=0), pool)
+    assert outcome.shares[1, 0] < 0.5 < outcome.shares[1, 4]
+    np.testing.assert_allclose(outcome.revenues, 2.0 * outcome.users * [[1.0], [3.0]])
+    np.testing.assert_allclose([r["costs"] for r in sim.collect_results()["Premium"]],
+                               2.0 * 0.5 * outcome.users[1])
+    assert sim.market_shares["Cheap"] == pytest.approx(outcome.shares[0].tolist())
+    assert sim.collect_metrics()["Cheap"]["cumulative_profit"][-1] == pytest.approx(
+        (outcome.revenues[0] - outcome.costs[0]).sum())
+
+    vectorized = run_market(sim.business_models, market, 5, engine="vectorized")
+    np.testing.assert_allclose(vectorized.costs, outcome.costs, rtol=1e-12)
+    np.testing.assert_allclose(vectorized.revenues, outcome.revenues, rtol=1e-12)
+    assert sim.business_models[0].transaction_model.parameters == {"growth_rate": 0.3}
+
+    sim.add_business_model(_competitor("Cheap", 2.0))
+    with pytest.raises(ValueError):
+        sim.run_market_simulation(market)
+
+def test_market_sweep_matches_single_markets():
+    """
+    One batched sweep over many competitors equals running each
+    combination's market on its own.
+    """
+    market = Market(500.0, price_sensitivity=0.8, outside_utility=-1.0)
+
+    def factory(params):
+        return [_competitor(f"Entrant{i}", 1.0 + 0.1 * i, quality=params["quality"] * (i % 3),
+                            unit_cost=params["cost"])
+                for i in range(40)]
+
+    grid = {"quality": [0.0, 0.5], "cost": [0.2, 0.4, 0.6]}
+    sim = Simulator(simulation_period=4)
+    arrays = sim.run_market_sweep(grid, factory, market, metrics=["cumulative_profit"])
+    assert arrays.costs.shape == arrays.shares.shape == (6, 40, 4)
+    assert arrays.model_names[3] == "Entrant3"
+    assert (arrays.shares.sum(axis=1) < 1.0).all()
+
+    for index, combo in enumerate(arrays.combos):
+        single = run_market(factory(dict(zip(arrays.param_names, combo))), market, 4)
+        np.testing.assert_allclose(arrays.costs[index], single.costs, rtol=1e-12)
+        np.testing.assert_allclose(arrays.revenues[index], single.revenues, rtol=1e-12)
+    assert sim.sweep_combo_keys == arrays.combo_keys
+    np.testing.assert_allclose(sim.sweep_metrics["Entrant0"]["cumulative_profit"][:, -1],
+                               (arrays.revenues[:, 0] - arrays.costs[:, 0]).sum(axis=1))
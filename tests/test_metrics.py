@@ -0,0 +1,117 @@
+# business_model_simulator/tests/test_metrics.py
+
+import pytest
+import numpy as np
+from simulator.metrics import compute_metrics, rank_by, NEVER
+from simulator.simulator import Simulator
+from simulator.business_model import BusinessModel
+from simulator.transaction_model import TransactionModel
+from simulator.operation import Operation
+
+def test_single_run_metrics():
+    """
+    Metrics for a single series match hand-computed values.
+    """
+    costs = [10.0, 5.0, 5.0, 5.0]
+    revenues = [0.0, 8.0, 8.0, 8.0]
+    m = compute_metrics(costs, revenues, discount_rate=0.1)
+
+    np.testing.assert_allclose(m["profit"], [-10.0, 3.0, 3.0, 3.0])
+    np.testing.assert_allclose(m["cumulative_profit"], [-10.0, -7.0, -4.0, -1.0])
+    assert m["total_profit"] == pytest.approx(-1.0)
+    expected_npv = -10.0 + 3.0 / 1.1 + 3.0 / 1.1 ** 2 + 3.0 / 1.1 ** 3
+    assert m["npv"] == pytest.approx(expected_npv)
+    assert m["break_even_step"] == 1
+    assert m["payback_period"] == NEVER
+    # Cash flows never pay back, so the IRR is negative
+    irr = m["irr"]
+    assert irr < 0.0
+    assert sum(p / (1.0 + irr) ** t for t, p in enumerate(m["profit"])) == pytest.approx(0.0, abs=1e-9)
+    assert np.isnan(compute_metrics([1.0, 1.0], [2.0, 2.0], metrics=["irr"])["irr"])
+
+def test_irr_and_payback_vectorized():
+    """
+    Summary metrics are computed per row for (combos x steps) input.
+    """
+    costs = np.array([[100.0, 0.0, 0.0], [100.0, 0.0, 0.0]])
+    revenues = np.array([[0.0, 60.0, 60.0], [0.0, 110.0, 0.0]])
+    m = compute_metrics(costs, revenues, metrics=["irr", "payback_period"])
+
+    # -100 + 60/(1+r) + 60/(1+r)^2 = 0  =>  r ~ 0.1307
+    assert m["irr"][0] == pytest.approx(0.130662, abs=1e-5)
+    assert m["irr"][1] == pytest.approx(0.1, abs=1e-6)
+    np.testing.assert_array_equal(m["payback_period"], [2, 1])
+
+def test_unknown_metric():
+    with pytest.raises(ValueError):
+        compute_metrics([1.0], [1.0], metrics=["ebitda"])
+
+def test_rank_by():
+    """
+    rank_by returns the top-k indices, best first, with NaN last.
+    """
+    values = np.array([3.0, np.nan, 7.0, 1.0, 5.0])
+    assert rank_by(values, k=2).tolist() == [2, 4]
+    assert rank_by(values, descending=False).tolist() == [3, 0, 4, 2, 1]
+
+def _factory(combo_params):
+    op = Operation(
+        name="Op",
+        parameters={"direct_cost": 5.0, "base_revenue": 4.0, "revenue_per_unit": 1.0}
+    )
+    tm = TransactionModel(operations=[op], parameters={"growth_rate": combo_params["growth_rate"]})
+    return BusinessModel(name="SweepModel", transaction_model=tm)
+
+def test_run_and_sweep_metrics():
+    """
+    Metrics can be requested for single runs and for whole sweeps.
+    """
+    sim = Simulator(simulation_period=4)
+    sim.add_business_model(_factory({"growth_rate": 0.5}))
+    sim.run_simulation(metrics=["total_profit", "break_even_step"])
+    run_metrics = sim.collect_metrics()["SweepModel"]
+    # revenues => 4 + 1.5^t, costs => 5
+    assert run_metrics["total_profit"] == pytest.approx(
+        sum(4.0 + 1.5 ** t - 5.0 for t in range(4))
+    )
+    assert run_metrics["break_even_step"] == 0
+
+    sweep = Simulator(simulation_period=4)
+    results = sweep.run_parameter_sweep(
+        {"growth_rate": [0.0, 0.5, 0.2]}, _factory, metrics=["npv"], discount_rate=0.05
+    )
+    npv = sweep.sweep_metrics["SweepModel"]["npv"]
+    assert len(npv) == len(results) == 3
+    best = sweep.sweep_combo_keys[rank_by(npv, k=1)[0]]
+    assert best == "growth_rate=0.5"
+
+def test_irr_requires_sign_change():
+    """
+    Rows whose NPV never changes sign, including all-zero profit, get NaN.
+    """
+    costs = np.zeros((3, 3))
+    revenues = np.array([[0.0, 0.0, 0.0], [5.0, 5.0, 5.0], [0.0, 60.0, 60.0]])
+    costs[2, 0] = 100.0
+    irr = compute_metrics(costs, revenues, metrics=["irr"])["irr"]
+    assert np.isnan(irr[0])
+    assert np.isnan(irr[1])
+    assert irr[2] == pytest.approx(0.130662, abs=1e-5)
+
+def test_sweep_metrics_missing_model_are_nan():
+    """
+    Combos that did not build a model get NaN metrics for it, not zeros.
+    """
+    def factory(combo_params):
+        bm = _factory({"growth_rate": 0.0})
+        if combo_params["variant"] == "b":
+            bm.name = "Other"
+        return bm
+
+    for engine in ("python", "vectorized"):
+        sim = Simulator(simulation_period=3)
+        sim.run_parameter_sweep({"variant": ["a", "b"]}, factory,
+                                metrics=["total_profit"], engine=engine)
+        total = sim.sweep_metrics["SweepModel"]["total_profit"]
+        assert total[0] == pytest.approx(0.0)
+        assert np.isnan(total[1])
+        assert np.isnan(sim.sweep_metrics["Other"]["total_profit"][0])
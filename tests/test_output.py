@@ -0,0 +1,87 @@
+# business_model_simulator/tests/test_output.py
+
+import csv
+import pytest
+from simulator.simulator import Simulator
+from simulator.output import (
+    BackgroundCSVWriter, run_pipelined_sweep, sweep_rows, write_sweep_results_to_csv
+)
+from scripts.run_simulation import create_business_model
+
+PARAM_GRID = {"growth_rate": [0.0, 0.1, 0.2], "overhead_rate": [0.0, 0.05]}
+
+def _read(path):
+    with open(path, newline="") as f:
+        return list(csv.reader(f))
+
+def test_pipelined_sweep_matches_batch_write(tmp_path):
+    """
+    Streaming through the background writer produces the same file as
+    collecting the sweep and writing it at the end.
+    """
+    sim = Simulator(simulation_period=6)
+    batch_path = tmp_path / "batch.csv"
+    write_sweep_results_to_csv(sim.run_parameter_sweep(PARAM_GRID, create_business_model), str(batch_path))
+
+    piped_path = tmp_path / "nested" / "piped.csv"
+    combos = run_pipelined_sweep(sim, PARAM_GRID, create_business_model, str(piped_path),
+                                 max_pending=1, batch_rows=4)
+
+    assert combos == 6
+    assert _read(piped_path) == _read(batch_path)
+
+def test_writer_counts_rows(tmp_path):
+    path = tmp_path / "rows.csv"
+    with BackgroundCSVWriter(str(path), fieldnames=["a", "b"], batch_rows=3) as writer:
+        for i in range(10):
+            writer.submit([(i, i * 2)])
+        writer.submit([])
+    assert writer.rows_written == 10
+    assert _read(path)[-1] == ["9", "18"]
+
+def test_writer_errors_are_raised(tmp_path):
+    """
+    An error on the writer thread surfaces in the producer on close.
+    """
+    writer = BackgroundCSVWriter(str(tmp_path / "bad.csv"), fieldnames=["a"], join_timeout=10)
+    writer.submit([42])  # not a row sequence
+    with pytest.raises(csv.Error):
+        writer.close()
+
+def test_writer_error_on_final_flush(tmp_path):
+    """
+    A bad row that is only written by the final flush after close() must
+    raise rather than deadlock.
+    """
+    writer = BackgroundCSVWriter(str(tmp_path / "bad.csv"), fieldnames=["a"],
+                                 batch_rows=1000, join_timeout=10)
+    # Hold the writer on a first batch so the bad row is still pending when
+    # close() enqueues the stop marker
+    writer.submit([("ok",)] * 10)
+    writer._queue.put([("ok",)])
+    writer._queue.put([42])
+    with pytest.raises(csv.Error):
+        writer.close()
+
+def test_producer_error_takes_precedence(tmp_path):
+    """
+    If the producer raises inside the with block, its exception propagates
+    instead of the writer's.
+    """
+    with pytest.raises(KeyError):
+        with BackgroundCSVWriter(str(tmp_path / "bad.csv"), fieldnames=["a"], join_timeout=10) as writer:
+            writer.submit([42])
+            raise KeyError("producer failed")
+
+def test_script_sweep_uses_its_combo_keys(tmp_path):
+    from scripts.run_simulation import run_parameter_sweep
+    path = tmp_path / "script.csv"
+    run_parameter_sweep(simulation_period=2, output_csv=str(path))
+    rows = _read(path)
+    assert rows[0][0] == "combo_key"
+    assert rows[1][0] == "GR=0.00_OH=0.00_RF=1.00"
+    assert len(rows) == 1 + 6 * 6 * 7 * 2
+
+def test_sweep_rows():
+    rows = sweep_rows("k", {"M": [{"step": 0, "costs": 1.0, "revenues": 2.0}]})
+    assert rows == [("k", "M", 0, 1.0, 2.0)]
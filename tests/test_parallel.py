@@ -0,0 +1,49 @@
+# business_model_simulator/tests/test_parallel.py
+
+import multiprocessing
+import numpy as np
+import pytest
+from simulator.simulator import Simulator
+from simulator.parallel import combo_at, run_parallel_sweep
+from simulator.sample import create_sample_business_model
+from simulator.vectorized import run_vectorized_sweep
+
+PARAM_GRID = {"growth_rate": [0.0, 0.1, 0.2], "overhead_rate": [0.0, 0.02], "revenue_factor": [1.0, 1.1]}
+
+def test_combo_at_matches_product_order():
+    import itertools
+    combos = list(itertools.product(*PARAM_GRID.values()))
+    assert [combo_at(PARAM_GRID, i) for i in range(len(combos))] == combos
+
+@pytest.mark.parametrize("engine", ["python", "vectorized"])
+def test_parallel_sweep_matches_serial(engine):
+    expected = run_vectorized_sweep(PARAM_GRID, create_sample_business_model, simulation_period=5)
+    with run_parallel_sweep(PARAM_GRID, create_sample_business_model, simulation_period=5,
+                            workers=2, chunk_size=3, engine=engine) as arrays:
+        assert arrays.combos == expected.combos
+        assert arrays.model_names == expected.model_names
+        np.testing.assert_allclose(arrays.costs, expected.costs, rtol=1e-12)
+        np.testing.assert_allclose(arrays.revenues, expected.revenues, rtol=1e-12)
+
+def test_parallel_sweep_with_spawn_and_metrics():
+    """
+    Workers started with "spawn" receive the factory by pickling; metrics are
+    computed from the shared arrays in the parent.
+    """
+    sim = Simulator(simulation_period=4)
+    reference = Simulator(simulation_period=4)
+    reference.run_parameter_sweep(PARAM_GRID, create_sample_business_model, metrics=["npv"])
+
+    arrays = sim.run_parallel_sweep(PARAM_GRID, create_sample_business_model, workers=2,
+                                    metrics=["npv"])
+    try:
+        np.testing.assert_allclose(sim.sweep_metrics["ParameterSweepModel"]["npv"],
+                                   reference.sweep_metrics["ParameterSweepModel"]["npv"])
+    finally:
+        arrays.release()
+
+    spawn = multiprocessing.get_context("spawn")
+    with run_parallel_sweep({"growth_rate": [0.0, 0.3]}, create_sample_business_model, 3,
+                            workers=2, mp_context=spawn) as arrays:
+        assert arrays.costs.shape == (2, 3)
+        assert arrays.costs[1, 2] > arrays.costs[0, 2]
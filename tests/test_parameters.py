@@ -0,0 +1,80 @@
+# business_model_simulator/tests/test_parameters.py
+
+import pytest
+from simulator.parameters import ParameterResolver, freeze
+from simulator.business_model import BusinessModel
+from simulator.transaction_model import TransactionModel
+from simulator.operation import Operation
+
+def _make_model():
+    op = Operation(name="Op", parameters={"direct_cost": 1.0})
+    tm = TransactionModel(operations=[op], parameters={"overhead_rate": 0.05, "growth_rate": 0.1})
+    return BusinessModel(
+        name="Resolved",
+        transaction_model=tm,
+        parameters={"cost_scaling_factor": 0.1, "growth_rate": 0.2}
+    )
+
+def test_resolution_layering():
+    """
+    Global parameters override the transaction model, and business model
+    adjustments are applied last.
+    """
+    bm = _make_model()
+    resolved = ParameterResolver().resolve(bm, {"overhead_rate": 0.5, "base_gas_price": 0.1})
+
+    assert resolved.parameters["overhead_rate"] == pytest.approx(0.6, 0.001)
+    assert resolved.parameters["growth_rate"] == 0.2
+    assert resolved.parameters["base_gas_price"] == 0.1
+    assert resolved.operation_parameters[0]["direct_cost"] == 1.0
+
+def test_resolution_does_not_mutate_inputs():
+    """
+    Resolving, and working on an instantiated copy, leaves inputs untouched.
+    """
+    bm = _make_model()
+    global_params = {"overhead_rate": 0.5}
+    resolved = ParameterResolver().resolve(bm, global_params)
+
+    working = resolved.instantiate()
+    working.parameters["overhead_rate"] = 99.0
+    working.operations[0].parameters["transaction_volume"] = 42.0
+
+    assert bm.transaction_model.parameters == {"overhead_rate": 0.05, "growth_rate": 0.1}
+    assert bm.transaction_model.operations[0].parameters == {"direct_cost": 1.0}
+    assert global_params == {"overhead_rate": 0.5}
+    assert resolved.parameters["overhead_rate"] == pytest.approx(0.6, 0.001)
+    with pytest.raises(TypeError):
+        resolved.parameters["overhead_rate"] = 1.0
+
+def test_resolution_is_cached_until_inputs_change():
+    """
+    The same inputs return the cached view; changing any layer re-resolves.
+    """
+    bm = _make_model()
+    resolver = ParameterResolver()
+    first = resolver.resolve(bm, {"base_gas_price": 0.1})
+    assert resolver.resolve(bm, {"base_gas_price": 0.1}) is first
+
+    bm.transaction_model.operations[0].parameters["direct_cost"] = 2.0
+    second = resolver.resolve(bm, {"base_gas_price": 0.1})
+    assert second is not first
+    assert second.operation_parameters[0]["direct_cost"] == 2.0
+
+def test_freeze_is_order_independent():
+    """
+    Dict fingerprints should not depend on insertion order.
+    """
+    assert freeze({"a": 1, "b": [1, 2]}) == freeze({"b": [1, 2], "a": 1})
+    assert freeze({"a": 1}) != freeze({"a": 2})
+
+def test_instantiate_copies_container_attributes():
+    """
+    Working copies do not share dict/list attributes with the original operation.
+    """
+    bm = _make_model()
+    original_op = bm.transaction_model.operations[0]
+    working = ParameterResolver().resolve(bm).instantiate()
+
+    working.operations[0]._complexity_multipliers['High'] = 99.0
+    assert original_op._complexity_multipliers['High'] == 2.0
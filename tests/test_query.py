@@ -0,0 +1,79 @@
+# business_model_simulator/tests/test_query.py
+
+import csv
+import pytest
+from simulator.simulator import Simulator
+from simulator.query import SweepIndex, write_indexed_sweep, write_indexed_sweep_arrays
+from simulator.sample import create_sample_business_model
+from simulator.utils import arange
+
+PARAM_GRID = {"growth_rate": arange(0.0, 0.21, 0.05), "overhead_rate": [0.0, 0.02, 0.04], "tier": ["a", "b"]}
+
+def test_indexed_csv_has_typed_parameter_columns(tmp_path):
+    path = str(tmp_path / "sweep.csv")
+    sim = Simulator(simulation_period=3)
+    assert write_indexed_sweep(sim, PARAM_GRID, create_sample_business_model, path) == 30
+
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 30 * 3
+    assert float(rows[6]["param_overhead_rate"]) == 0.02
+    assert rows[0]["param_tier"] == "a"
+
+    index = SweepIndex.load(path)
+    assert index.param_types == {"growth_rate": "float", "overhead_rate": "float", "tier": "str"}
+
+def test_query_ranges_and_fetch_by_offset(tmp_path):
+    path = str(tmp_path / "sweep.csv")
+    sim = Simulator(simulation_period=3)
+    write_indexed_sweep(sim, PARAM_GRID, create_sample_business_model, path)
+    expected = sim.run_parameter_sweep(PARAM_GRID, create_sample_business_model)
+
+    index = SweepIndex.load(path)
+    matches = index.query(growth_rate=(0.05, 0.1), overhead_rate=0.02)
+    assert [(e["params"]["growth_rate"], e["params"]["tier"]) for e in matches] == [
+        (0.05, "a"), (0.05, "b"), (0.1, "a"), (0.1, "b")
+    ]
+    for entry, results in index.fetch_many(matches):
+        assert results == expected[entry["combo_key"]]
+
+    assert len(index.query(tier={"b"}, growth_rate=(None, 0.0))) == 3
+    assert index.query(overhead_rate=0.5) == []
+    with pytest.raises(KeyError):
+        index.query(revenue_factor=1.0)
+
+def test_vectorized_results_share_the_format(tmp_path):
+    path = str(tmp_path / "sweep.csv")
+    sim = Simulator(simulation_period=3)
+    grid = {"growth_rate": [0.0, 0.1], "overhead_rate": [0.0, 0.02]}
+    write_indexed_sweep_arrays(sim.run_vectorized_sweep(grid, create_sample_business_model), path)
+
+    index = SweepIndex.load(path)
+    (entry,) = index.query(growth_rate=0.1, overhead_rate=0.0)
+    expected = sim.run_parameter_sweep(grid, create_sample_business_model)[entry["combo_key"]]
+    assert index.fetch(entry)["ParameterSweepModel"] == pytest.approx(expected["ParameterSweepModel"])
+
+def test_mixed_int_and_float_axis_is_numeric(tmp_path):
+    path = str(tmp_path / "sweep.csv")
+    write_indexed_sweep(Simulator(simulation_period=2), {"growth_rate": [0, 0.1]},
+                        create_sample_business_model, path)
+    index = SweepIndex.load(path)
+    assert index.param_types["growth_rate"] == "float"
+    assert [e["combo_key"] for e in index.query(growth_rate=(0.05, 0.2))] == ["growth_rate=0.1"]
+
+def test_float_ranges_include_arange_grid_values(tmp_path):
+    """
+    arange(0, 0.2, 0.05) yields 0.15000000000000002; a range ending at 0.15
+    still selects it, within the same tolerance as equality.
+    """
+    path = str(tmp_path / "sweep.csv")
+    grid = {"growth_rate": arange(0.0, 0.2, 0.05)}
+    assert grid["growth_rate"][-1] != 0.15
+    write_indexed_sweep(Simulator(simulation_period=2), grid, create_sample_business_model, path)
+    index = SweepIndex.load(path)
+    selected = [e["params"]["growth_rate"] for e in index.query(growth_rate=(0.05, 0.15))]
+    assert selected == grid["growth_rate"][1:]
+    assert [e["params"]["growth_rate"] for e in index.query(growth_rate=(0.15, None))] == [
+        grid["growth_rate"][-1]
+    ]
+    assert index.query(growth_rate=(0.1500001, None)) == []
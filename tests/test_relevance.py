@@ -0,0 +1,48 @@
+# business_model_simulator/tests/test_relevance.py
+
+import numpy as np
+from simulator.business_model import BusinessModel
+from simulator.transaction_model import TransactionModel
+from simulator.operation import Operation
+from simulator.relevance import analyse_relevance, run_reduced_sweep
+from simulator.vectorized import run_vectorized_sweep
+from cdip.audit_operation import AuditOperation
+
+GRID = {
+    "growth_rate": [0.0, 0.1],
+    "overhead_rate": [0.0, 0.02, 0.04],
+    "revenue_factor": [1.0, 1.1, 1.2],
+    "revenue_tax_rate": [0.0, 0.02],
+    "legal_cost": [1.0, 4.0],
+    "name": ["A", "B"],
+}
+
+def _factory(combo_params):
+    ops = [
+        Operation("Core", {"base_transaction_volume": 50, "direct_cost": 1.0,
+                           "variable_cost": 0.2, "revenue_per_unit": 1.5}, "Medium"),
+        AuditOperation("Audit", {"direct_cost": 2.0, "legal_cost": combo_params["legal_cost"]}, "High"),
+    ]
+    tm = TransactionModel(ops, {key: combo_params[key] for key in
+                                ("growth_rate", "overhead_rate", "revenue_factor", "revenue_tax_rate")})
+    return BusinessModel(combo_params["name"], tm)
+
+def test_analyse_relevance():
+    relevance = analyse_relevance(GRID, _factory)
+    assert relevance["growth_rate"] == {"costs", "revenues"}
+    assert relevance["overhead_rate"] == {"costs"}
+    assert relevance["revenue_factor"] == {"revenues"}
+    assert relevance["revenue_tax_rate"] == {"revenues"}
+    # AuditOperation overrides compute_revenue, but returns 0 regardless;
+    # its parameters still conservatively count for its overridden formulas
+    assert relevance["legal_cost"] == {"costs", "revenues"}
+    assert "name" in relevance["name"]
+
+def test_reduced_sweep_matches_full_sweep():
+    full = run_vectorized_sweep(GRID, _factory, simulation_period=5)
+    reduced = run_reduced_sweep(GRID, _factory, simulation_period=5)
+
+    assert reduced.combos == full.combos
+    assert reduced.model_names == full.model_names
+    np.testing.assert_allclose(reduced.costs, full.costs, rtol=1e-12)
+    np.testing.assert_allclose(reduced.revenues, full.revenues, rtol=1e-12)
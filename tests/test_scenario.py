@@ -0,0 +1,160 @@
+# business_model_simulator/tests/test_scenario.py
+
+import json
+import pytest
+import simulator.scenario as scenario_module
+from simulator.scenario import load_scenario, compile_scenario, clear_memory_cache, ScenarioError
+from simulator.schedules import PiecewiseSchedule
+from simulator.simulator import Simulator
+from simulator.business_model import BusinessModel
+from simulator.transaction_model import TransactionModel
+from cdip.audit_operation import AuditOperation
+from cdip.data_purchase_opertation import DataPurchaseOperation
+
+SCENARIO = {
+    "simulation_period": 4,
+    "global_parameters": {"base_gas_price": 0.1},
+    "business_models": [{
+        "name": "Scenario",
+        "parameters": {"legal_compliance_fee": 0.01},
+        "transaction_model": {
+            "parameters": {
+                "overhead_rate": 0.05,
+                "growth_rate": {"schedule": "piecewise", "breakpoints": {"0": 0.0, "2": 0.1}}
+            },
+            "operations": [
+                {"class": "cdip.audit_operation.AuditOperation", "name": "Audit",
+                 "parameters": {"direct_cost": 1.0, "legal_cost": 4.0}, "contract_complexity": "High"},
+                {"class": "cdip.data_purchase_opertation.DataPurchaseOperation", "name": "DataPurchase",
+                 "parameters": {"licensing_fees": 15.0, "revenue_per_unit": 2.0}}
+            ]
+        }
+    }],
+    "sweep": {"grid": {
+        "overhead_rate": [0.03, 0.05],
+        "DataPurchase.licensing_fees": {"start": 10, "stop": 20, "step": 5}
+    }}
+}
+
+def _hand_built(overhead_rate=0.05, licensing_fees=15.0):
+    ops = [
+        AuditOperation("Audit", {"direct_cost": 1.0, "legal_cost": 4.0}, "High"),
+        DataPurchaseOperation("DataPurchase", {"licensing_fees": licensing_fees, "revenue_per_unit": 2.0}),
+    ]
+    tm = TransactionModel(ops, {
+        "overhead_rate": overhead_rate,
+        "growth_rate": PiecewiseSchedule({0: 0.0, 2: 0.1})
+    })
+    return BusinessModel("Scenario", tm, {"legal_compliance_fee": 0.01})
+
+def _write(tmp_path, document, name="scenario.json"):
+    path = tmp_path / name
+    path.write_text(json.dumps(document))
+    return str(path)
+
+def test_scenario_matches_hand_built_model(tmp_path):
+    compiled = load_scenario(_write(tmp_path, SCENARIO), cache_dir=None)
+    sim = compiled.build_simulator()
+    sim.run_simulation()
+
+    expected = Simulator(simulation_period=4, global_parameters={"base_gas_price": 0.1})
+    expected.add_business_model(_hand_built())
+    expected.run_simulation()
+
+    assert sim.collect_results() == expected.collect_results()
+
+def test_scenario_sweep_grid(tmp_path):
+    compiled = load_scenario(_write(tmp_path, SCENARIO), cache_dir=None)
+    assert compiled.param_grid["DataPurchase.licensing_fees"] == [10.0, 15.0]
+
+    sweep = Simulator(simulation_period=4).run_parameter_sweep(compiled.param_grid, compiled.factory())
+    assert len(sweep) == 4
+    key = "overhead_rate=0.03_DataPurchase.licensing_fees=10.0"
+    expected = Simulator(simulation_period=4)
+    expected.add_business_model(_hand_built(overhead_rate=0.03, licensing_fees=10.0))
+    expected.run_simulation()
+    assert sweep[key] == expected.collect_results()
+
+def test_compiled_scenario_is_cached_on_disk(tmp_path, monkeypatch):
+    path = _write(tmp_path, SCENARIO)
+    cache_dir = str(tmp_path / "cache")
+    clear_memory_cache()
+    first = load_scenario(path, cache_dir=cache_dir)
+
+    # A new process has an empty memory cache; the disk cache must avoid parsing
+    clear_memory_cache()
+    def fail(*args):
+        raise AssertionError("scenario should not be parsed again")
+    monkeypatch.setattr(scenario_module, "_parse_text", fail)
+    second = load_scenario(path, cache_dir=cache_dir)
+    assert second.digest == first.digest
+    assert second.param_grid == first.param_grid
+
+    # Editing the file changes its hash and forces a recompile
+    changed = dict(SCENARIO, simulation_period=5)
+    _write(tmp_path, changed)
+    with pytest.raises(AssertionError):
+        load_scenario(path, cache_dir=cache_dir)
+
+def test_disk_cache_is_json_and_tracks_class_modules(tmp_path, monkeypatch):
+    """
+    The disk cache stores classes as import paths in plain JSON, and entries
+    are discarded when a module defining a referenced class changes.
+    """
+    path = _write(tmp_path, SCENARIO)
+    cache_dir = tmp_path / "cache"
+    clear_memory_cache()
+    load_scenario(path, cache_dir=str(cache_dir))
+
+    (cache_file,) = cache_dir.iterdir()
+    entry = json.loads(cache_file.read_text())
+    operations = entry["spec"]["models"][0]["transaction_model"]["operations"]
+    assert operations[0]["class"] == "cdip.audit_operation.AuditOperation"
+    assert "cdip.audit_operation" in entry["modules"]
+
+    # Pretend the audit module was edited after the entry was written
+    entry["modules"]["cdip.audit_operation"][1] -= 1
+    cache_file.write_text(json.dumps(entry))
+    clear_memory_cache()
+    parsed = []
+    original = scenario_module._parse_text
+    monkeypatch.setattr(scenario_module, "_parse_text",
+                        lambda *args: parsed.append(args) or original(*args))
+    compiled = load_scenario(path, cache_dir=str(cache_dir))
+    assert parsed
+    assert compiled.models[0]["transaction_model"]["operations"][0]["class"] is AuditOperation
+
+@pytest.mark.parametrize("mutate,message", [
+    (lambda d: d.update(simulation_period=-1), "simulation_period"),
+    (lambda d: d["business_models"][0]["transaction_model"]["operations"][0].update(
+        {"class": "simulator.business_model.BusinessModel"}), "not a subclass of Operation"),
+    (lambda d: d["business_models"][0].update(colour="red"), "unknown keys"),
+    (lambda d: d["sweep"]["grid"].update({"Missing.fee": [1]}), "unknown operation"),
+    (lambda d: d["business_models"][0]["transaction_model"]["parameters"].update(
+        {"overhead_rate": {"schedule": "cubic"}}), "unknown schedule type"),
+])
+def test_validation_errors(mutate, message):
+    document = json.loads(json.dumps(SCENARIO))
+    mutate(document)
+    with pytest.raises(ScenarioError, match=message):
+        compile_scenario(document)
+
+def test_toml_and_yaml_formats(tmp_path):
+    toml_text = '''
+simulation_period = 3
+[[business_models]]
+name = "Toml"
+[business_models.transaction_model]
+parameters = { overhead_rate = 0.1 }
+operations = [ { name = "Op", parameters = { direct_cost = 2.0 } } ]
+'''
+    toml_path = tmp_path / "scenario.toml"
+    toml_path.write_text(toml_text)
+    sim = load_scenario(str(toml_path), cache_dir=None).build_simulator()
+    sim.run_simulation()
+    assert sim.collect_results()["Toml"][0]["costs"] == pytest.approx(2.2)
+
+    yaml = pytest.importorskip("yaml")
+    yaml_path = tmp_path / "scenario.yaml"
+    yaml_path.write_text(yaml.safe_dump(SCENARIO))
+    assert load_scenario(str(yaml_path), cache_dir=None).model_names == ["Scenario"]
@@ -0,0 +1,93 @@
+# business_model_simulator/tests/test_schedules.py
+
+import pytest
+import numpy as np
+from simulator.schedules import (
+    PiecewiseSchedule, InterpolatedSchedule, ArraySchedule, materialize_value
+)
+from simulator.simulator import Simulator
+from simulator.business_model import BusinessModel
+from simulator.transaction_model import TransactionModel
+from simulator.operation import Operation
+
+def test_piecewise_schedule():
+    """
+    Piecewise schedules hold each value from its breakpoint onwards.
+    """
+    values = PiecewiseSchedule({0: 0.1, 3: 0.2, 5: 0.3}).materialize(6)
+    np.testing.assert_allclose(values, [0.1, 0.1, 0.1, 0.2, 0.2, 0.3])
+
+def test_interpolated_schedule():
+    """
+    Interpolated schedules ramp linearly and hold flat outside their points.
+    """
+    values = InterpolatedSchedule({1: 0.0, 3: 1.0}).materialize(5)
+    np.testing.assert_allclose(values, [0.0, 0.0, 0.5, 1.0, 1.0])
+
+def test_array_schedule_too_short():
+    """
+    An explicit array must cover the whole simulation period.
+    """
+    with pytest.raises(ValueError):
+        ArraySchedule([1.0, 2.0]).materialize(3)
+
+def test_schedule_plus_constant():
+    """
+    Adding a constant (e.g. a cost_scaling_factor) offsets every step.
+    """
+    values = materialize_value(ArraySchedule([0.1, 0.2]) + 0.05, 2)
+    np.testing.assert_allclose(values, [0.15, 0.25])
+
+def test_scheduled_parameters_in_simulation():
+    """
+    Scheduled transaction and operation parameters take effect per step and
+    combine with business model adjustments.
+    """
+    op = Operation(
+        name="PromoOp",
+        parameters={
+            "direct_cost": 10.0,
+            "revenue_per_unit": ArraySchedule([1.0, 0.5, 2.0])
+        }
+    )
+    tx_model = TransactionModel(
+        operations=[op],
+        parameters={"overhead_rate": PiecewiseSchedule({0: 0.0, 2: 0.1})}
+    )
+    bm = BusinessModel(
+        name="Scheduled",
+        transaction_model=tx_model,
+        parameters={"cost_scaling_factor": 0.1}
+    )
+
+    sim = Simulator(simulation_period=3)
+    sim.add_business_model(bm)
+    sim.run_simulation()
+    results = sim.collect_results()["Scheduled"]
+
+    costs = [r["costs"] for r in results]
+    revenues = [r["revenues"] for r in results]
+    assert costs == pytest.approx([11.0, 11.0, 12.0])
+    assert revenues == pytest.approx([1.0, 0.5, 2.0])
+
+def test_scheduled_growth_compounds():
+    """
+    A scheduled growth_rate compounds step by step, so volume never falls
+    back when growth stops; both engines agree.
+    """
+    from simulator.vectorized import run_vectorized_sweep
+
+    def factory(combo_params):
+        op = Operation(name="Op", parameters={"base_transaction_volume": 100.0, "variable_cost": 1.0})
+        tm = TransactionModel(operations=[op],
+                              parameters={"growth_rate": PiecewiseSchedule({0: 0.1, 4: 0.0})})
+        return BusinessModel(name="Growth", transaction_model=tm)
+
+    sim = Simulator(simulation_period=6)
+    sim.add_business_model(factory({}))
+    sim.run_simulation()
+    costs = [r["costs"] for r in sim.collect_results()["Growth"]]
+    assert costs == pytest.approx([100.0, 110.0, 121.0, 133.1, 146.41, 146.41])
+
+    arrays = run_vectorized_sweep({"unused": [0]}, factory, simulation_period=6)
+    np.testing.assert_allclose(arrays.costs[0], costs, rtol=1e-12)
@@ -0,0 +1,107 @@
+# business_model_simulator/tests/test_server.py
+
+import json
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from simulator.scenario import compile_scenario
+from simulator.server import RequestError, WhatIfService, create_server
+
+SCENARIO = {
+    "simulation_period": 6,
+    "global_parameters": {"base_gas_price": 0.1},
+    "business_models": [{
+        "name": "Platform",
+        "parameters": {"user_adoption_rate": 0.1},
+        "transaction_model": {
+            "parameters": {"growth_rate": 0.05, "overhead_rate": 0.05},
+            "operations": [
+                {"class": "cdip.audit_operation.AuditOperation", "name": "Audit",
+                 "parameters": {"execution_cost": 3.0, "legal_cost": 4.0}, "contract_complexity": "High"},
+                {"class": "cdip.data_purchase_opertation.DataPurchaseOperation", "name": "DataPurchase",
+                 "parameters": {"licensing_fees": 15.0, "base_transaction_volume": 10}},
+            ]
+        }
+    }]
+}
+
+def _service():
+    return WhatIfService.from_scenario(compile_scenario(SCENARIO), cache_size=2)
+
+def test_evaluate_matches_simulator_and_caches():
+    """
+    Overrides are applied like sweep axes, results match a Simulator run, and
+    repeated queries are served from the LRU cache.
+    """
+    scenario = compile_scenario(SCENARIO)
+    service = _service()
+    overrides = {"overhead_rate": 0.1, "Audit.legal_cost": 6.0}
+
+    records, cached = service.evaluate(overrides)
+    sim = scenario.build_simulator(overrides)
+    sim.run_simulation()
+    assert records == sim.collect_results()["Platform"]
+    assert not cached
+    assert service.evaluate(dict(reversed(list(overrides.items()))))[1]
+
+    # Least recently used entries are evicted beyond cache_size
+    service.evaluate({"overhead_rate": 0.2})
+    service.evaluate({"overhead_rate": 0.3})
+    assert not service.evaluate(overrides)[1]
+    assert service.status()["cache"]["entries"] == 2
+
+    with pytest.raises(RequestError, match="Unknown business model"):
+        service.evaluate({}, model="Missing")
+    with pytest.raises(RequestError, match="Invalid parameters"):
+        service.evaluate({"NoSuchOperation.cost": 1.0})
+
+def _post(url, document):
+    request = urllib.request.Request(url + "/evaluate", data=json.dumps(document).encode(),
+                                     headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.load(response)
+
+def test_http_server_answers_concurrent_requests():
+    """
+    The HTTP server answers series, summary and metric queries concurrently,
+    reports errors as 400 and exposes latency metrics.
+    """
+    server = create_server(_service().warm_up())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        series = _post(server.url, {"parameters": {"overhead_rate": 0.1}})
+        assert series["model"] == "Platform" and len(series["results"]) == 6
+        assert series["elapsed_ms"] >= 0.0
+
+        rates = [0.0, 0.05, 0.1, 0.15] * 8
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            answers = list(pool.map(
+                lambda rate: _post(server.url, {"parameters": {"overhead_rate": rate},
+                                                "summary": True, "metrics": ["npv"],
+                                                "discount_rate": 0.1}),
+                rates
+            ))
+        for rate, answer in zip(rates, answers):
+            expected = _post(server.url, {"parameters": {"overhead_rate": rate}})["results"]
+            total_costs = sum(r["costs"] for r in expected)
+            assert answer["summary"]["total_costs"] == pytest.approx(total_costs)
+            assert isinstance(answer["metrics"]["npv"], float)
+
+        with pytest.raises(urllib.error.HTTPError) as error:
+            _post(server.url, {"model": "Missing"})
+        assert error.value.code == 400
+
+        with urllib.request.urlopen(server.url + "/metrics", timeout=10) as response:
+            status = json.load(response)
+        evaluate = status["latency"]["/evaluate"]
+        assert evaluate["count"] == 1 + len(rates) * 2 + 1
+        assert evaluate["errors"] == 1
+        assert 0.0 <= evaluate["p50_ms"] <= evaluate["p99_ms"] <= evaluate["max_ms"]
+        assert status["cache"]["hits"] > 0
+    finally:
+        server.shutdown()
+        server.server_close()
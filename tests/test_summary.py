@@ -0,0 +1,94 @@
+# business_model_simulator/tests/test_summary.py
+
+import csv
+import io
+import math
+import numpy as np
+import pytest
+from simulator.cli import main
+from simulator.metrics import compute_metrics, rank_by
+from simulator.sample import create_sample_business_model
+from simulator.simulator import Simulator
+from simulator.summary import SUMMARY_FIELDS, TopK, summarize_arrays, summarize_records
+
+PARAM_GRID = {
+    "growth_rate": [0.0, 0.05, 0.1, 0.2],
+    "overhead_rate": [0.0, 0.02, 0.05],
+    "revenue_factor": [0.5, 1.0],
+}
+
+def test_record_and_array_summaries_match_metrics():
+    """
+    The pure-Python and array summaries agree with simulator.metrics.
+    """
+    costs = np.array([[5.0, 4.0, 3.0, 3.0], [1.0, 1.0, 1.0, 1.0]])
+    revenues = np.array([[1.0, 2.0, 6.0, 8.0], [0.0, 0.5, 0.5, 0.5]])
+    arrays = summarize_arrays(costs, revenues, discount_rate=0.1)
+    expected = compute_metrics(costs, revenues, discount_rate=0.1)
+
+    for row in range(2):
+        records = [{"step": s, "costs": c, "revenues": r}
+                   for s, (c, r) in enumerate(zip(costs[row], revenues[row]))]
+        summary = summarize_records(records, discount_rate=0.1)
+        for field in SUMMARY_FIELDS:
+            assert summary[field] == pytest.approx(arrays[field][row])
+        assert summary["npv"] == pytest.approx(expected["npv"][row])
+        assert summary["payback_period"] == expected["payback_period"][row]
+        assert summary["mean_profit"] == pytest.approx((revenues[row] - costs[row]).mean())
+    assert arrays["break_even_step"].tolist() == [2, -1]
+
+def test_top_k_matches_rank_by():
+    """
+    The bounded heap keeps the same combinations as a full ranking, with ties
+    resolved to the earlier combination and NaN ranked last.
+    """
+    values = [3.0, float("nan"), 7.0, 3.0, 1.0, 7.0, 5.0]
+    for descending in (True, False):
+        top = TopK(4, "npv", descending=descending)
+        for ordinal, value in enumerate(values):
+            top.offer(ordinal, f"combo{ordinal}", "Model", {"npv": value})
+        assert [entry["ordinal"] for entry in top.best()] == \
+            rank_by(values, k=4, descending=descending).tolist()
+
+    with pytest.raises(ValueError):
+        TopK(3, "no_such_field")
+
+@pytest.mark.parametrize("engine", ["python", "vectorized"])
+def test_summary_sweep_matches_full_sweep(engine):
+    """
+    Summary and top-K sweeps reproduce the full sweep's totals without
+    keeping its per-step series.
+    """
+    full_sim = Simulator(simulation_period=6)
+    full = full_sim.run_parameter_sweep(PARAM_GRID, create_sample_business_model,
+                                        metrics=["total_profit"])
+    totals = full_sim.sweep_metrics["ParameterSweepModel"]["total_profit"]
+
+    sim = Simulator(simulation_period=6)
+    summary = sim.run_summary_sweep(PARAM_GRID, create_sample_business_model, top_k=5,
+                                    engine=engine, chunk_size=7)
+    assert summary.combo_count == len(full)
+    assert summary.combo_keys == list(full.keys())
+    np.testing.assert_allclose(summary.values["total_profit"], totals, rtol=1e-12)
+    assert [row["combo_key"] for row in summary.top_rows()] == \
+        [full_sim.sweep_combo_keys[i] for i in rank_by(totals, k=5)]
+
+    # Top-K alone keeps nothing per combination
+    top_only = sim.run_summary_sweep(PARAM_GRID, create_sample_business_model, keep_summaries=False,
+                                     top_k=2, rank_by="total_costs", descending=False, engine=engine)
+    assert top_only.combo_keys == [] and top_only.values["total_costs"] == []
+    assert [row["rank"] for row in top_only.top_rows()] == [1, 2]
+
+def test_keep_top_command_writes_ranked_csv(tmp_path):
+    output = tmp_path / "top.csv"
+    out = io.StringIO()
+    main(["sweep", "--period", "5", "--grid", "growth_rate=0,0.1,0.2", "--grid", "overhead_rate=0,0.05",
+          "--keep-top", "2", "--rank-by", "npv", "--discount-rate", "0.1",
+          "--output", str(output)], out=out)
+
+    with open(output, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["rank"] for row in rows] == ["1", "2"]
+    assert float(rows[0]["npv"]) >= float(rows[1]["npv"])
+    assert not math.isnan(float(rows[0]["break_even_step"]))
+    assert "Top 2 combinations by npv:" in out.getvalue()
@@ -0,0 +1,99 @@
+# business_model_simulator/tests/test_telemetry.py
+
+import io
+import json
+import pytest
+from simulator.cli import main
+from simulator.sample import create_sample_business_model
+from simulator.simulator import Simulator
+from simulator.telemetry import SweepTelemetry
+
+PARAM_GRID = {"growth_rate": [0.0, 0.05, 0.1], "overhead_rate": [0.0, 0.02, 0.05, 0.1]}
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.reads = 0
+
+    def __call__(self):
+        self.reads += 1
+        return self.now
+
+def test_progress_is_rate_limited_and_sampled():
+    """
+    Progress records are emitted at most once per interval, and once the
+    throughput is known the clock is only read every few combinations.
+    """
+    records = []
+    clock = FakeClock()
+    telemetry = SweepTelemetry(records.append, interval=1.0, clock=clock)
+    telemetry.start(10000)
+
+    for _ in range(50):
+        telemetry.advance()
+    assert [r["event"] for r in records] == ["start"]
+
+    clock.now += 0.5
+    for _ in range(1000):
+        telemetry.advance()
+    clock.now += 0.5
+    reads = clock.reads
+    for _ in range(1000):
+        telemetry.advance()
+    assert clock.reads - reads < 20
+    progress = [r for r in records if r["event"] == "progress"]
+    assert len(progress) == 1
+    assert progress[0]["completed"] >= 1050
+    assert progress[0]["mean_rate"] == pytest.approx(progress[0]["completed"] / 1.0)
+
+    clock.now += 3.0
+    telemetry.finish()
+    final = records[-1]
+    assert final["event"] == "finish" and final["completed"] == 2050
+    assert final["fraction"] == pytest.approx(0.205)
+    assert final["eta_seconds"] == pytest.approx((10000 - 2050) / (2050 / 4.0))
+
+def test_sweeps_report_progress(tmp_path):
+    """
+    Serial, summary and chunked sweeps write start, progress and finish
+    records to a JSON-lines file.
+    """
+    path = tmp_path / "telemetry.jsonl"
+    sim = Simulator(simulation_period=5)
+    with SweepTelemetry(str(path), interval=0.0, label="grid") as telemetry:
+        results = sim.run_parameter_sweep(PARAM_GRID, create_sample_business_model,
+                                          telemetry=telemetry)
+        sim.run_summary_sweep(PARAM_GRID, create_sample_business_model, telemetry=telemetry)
+        sim.run_chunked_sweep(PARAM_GRID, create_sample_business_model, chunk_size=5,
+                              telemetry=telemetry)
+
+    with open(path) as f:
+        records = [json.loads(line) for line in f]
+    finishes = [r for r in records if r["event"] == "finish"]
+    assert len(finishes) == 3
+    assert all(r["completed"] == r["total"] == len(results) for r in finishes)
+    assert all(r["label"] == "grid" for r in records)
+    chunked = records[records.index(finishes[1]) + 1:]
+    assert [r["completed"] for r in chunked if r["event"] == "progress"] == [5, 10, 12]
+    assert all(r["max_rss_bytes"] is None or r["max_rss_bytes"] > 0 for r in records)
+
+def test_parallel_sweep_reports_workers():
+    records = []
+    sim = Simulator(simulation_period=5)
+    telemetry = SweepTelemetry(records.append, interval=0.0)
+    with sim.run_parallel_sweep(PARAM_GRID, create_sample_business_model, workers=2,
+                                telemetry=telemetry) as arrays:
+        assert len(arrays.combos) == 12
+
+    final = records[-1]
+    assert final["event"] == "finish" and final["completed"] == 12
+    assert sum(worker["completed"] for worker in final["workers"].values()) == 12
+    assert all(worker["rate"] > 0 for worker in final["workers"].values())
+
+def test_telemetry_command_option(tmp_path):
+    path = tmp_path / "progress.jsonl"
+    main(["sweep", "--period", "4", "--grid", "growth_rate=0,0.1", "--engine", "python",
+          "--telemetry", str(path), "--telemetry-interval", "0"], out=io.StringIO())
+    with open(path) as f:
+        events = [json.loads(line)["event"] for line in f]
+    assert events[0] == "start" and events[-1] == "finish"
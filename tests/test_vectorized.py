@@ -0,0 +1,208 @@
+# business_model_simulator/tests/test_vectorized.py
+
+import pytest
+import numpy as np
+from simulator.simulator import Simulator
+from simulator.business_model import BusinessModel
+from simulator.transaction_model import TransactionModel
+from simulator.operation import Operation
+from simulator.schedules import PiecewiseSchedule
+from simulator.vectorized import ERROR_BOUNDS, check_precision, run_vectorized_sweep
+from simulator.output import write_sweep_arrays_to_csv
+from example.example_operation import RegistrationOperation
+
+def _factory(combo_params):
+    ops = [
+        Operation(
+            name="Affine",
+            parameters={
+                "base_transaction_volume": 100,
+                "direct_cost": 2.0,
+                "variable_cost": 0.8,
+                "base_revenue": 5.0,
+                "revenue_per_unit": PiecewiseSchedule({0: 2.0, 2: 2.5})
+            },
+            contract_complexity=combo_params.get("complexity", "High")
+        ),
+        # Subclass with custom cost logic, evaluated through its batch methods
+        RegistrationOperation(
+            name="Registration",
+            parameters={"base_transaction_volume": 10, "direct_cost": 1.0, "kyc_fee": 3.0},
+            contract_complexity=combo_params.get("complexity", "High")
+        ),
+    ]
+    tx_model = TransactionModel(
+        operations=ops,
+        parameters={
+            "growth_rate": combo_params["growth_rate"],
+            "overhead_rate": combo_params["overhead_rate"],
+            "revenue_factor": 1.1,
+            "revenue_tax_rate": 0.02
+        }
+    )
+    return BusinessModel(name="VectorModel", transaction_model=tx_model,
+                         parameters={"legal_compliance_fee": 0.01})
+
+PARAM_GRID = {
+    "growth_rate": [0.0, 0.05, 0.2],
+    "overhead_rate": [0.0, 0.03],
+    "complexity": ["High", "Low"],
+}
+
+def test_vectorized_matches_reference():
+    """
+    The vectorized sweep reproduces the reference engine's results.
+    """
+    reference = Simulator(simulation_period=5).run_parameter_sweep(PARAM_GRID, _factory)
+    arrays = run_vectorized_sweep(PARAM_GRID, _factory, simulation_period=5)
+
+    assert arrays.combo_keys == list(reference.keys())
+    for i, key in enumerate(arrays.combo_keys):
+        records = reference[key]["VectorModel"]
+        np.testing.assert_allclose(arrays.costs[i], [r["costs"] for r in records], rtol=1e-12)
+        np.testing.assert_allclose(arrays.revenues[i], [r["revenues"] for r in records], rtol=1e-12)
+
+def test_engine_option_and_metrics():
+    """
+    run_parameter_sweep(engine="vectorized") returns the reference format, and
+    sweep metrics agree with the reference engine.
+    """
+    sim_ref = Simulator(simulation_period=4)
+    ref = sim_ref.run_parameter_sweep(PARAM_GRID, _factory, metrics=["npv"], discount_rate=0.1)
+    sim_vec = Simulator(simulation_period=4)
+    vec = sim_vec.run_parameter_sweep(
+        PARAM_GRID, _factory, metrics=["npv"], discount_rate=0.1, engine="vectorized"
+    )
+
+    assert list(vec.keys()) == list(ref.keys())
+    assert vec[sim_vec.sweep_combo_keys[0]]["VectorModel"][0]["step"] == 0
+    np.testing.assert_allclose(
+        sim_vec.sweep_metrics["VectorModel"]["npv"],
+        sim_ref.sweep_metrics["VectorModel"]["npv"],
+        rtol=1e-12
+    )
+
+class ScalarOnlyRegistration(RegistrationOperation):
+    """
+    Overrides only the scalar cost, so its inherited batch form is stale.
+    """
+    def compute_cost(self):
+        return super().compute_cost() + self.parameters.get("transaction_volume", 1.0) % 3
+
+def test_batch_protocol_and_scalar_fallback(monkeypatch):
+    """
+    Operations with matching batch methods are evaluated as arrays; a subclass
+    overriding only the scalar method falls back to per-step calls.
+    """
+    from simulator.vectorized import has_batch_method
+
+    assert has_batch_method(Operation, "compute_cost")
+    assert has_batch_method(RegistrationOperation, "compute_cost")
+    assert not has_batch_method(ScalarOnlyRegistration, "compute_cost")
+    assert has_batch_method(ScalarOnlyRegistration, "compute_revenue")
+
+    def factory(combo_params):
+        ops = [
+            RegistrationOperation(name="Batch", parameters={"base_transaction_volume": 7, "kyc_fee": 2.0},
+                                  contract_complexity=combo_params["complexity"]),
+            ScalarOnlyRegistration(name="Scalar", parameters={"base_transaction_volume": 5, "direct_cost": 1.0},
+                                   contract_complexity=combo_params["complexity"]),
+        ]
+        tx_model = TransactionModel(operations=ops, parameters={"growth_rate": combo_params["growth_rate"]})
+        return BusinessModel(name="Protocol", transaction_model=tx_model)
+
+    grid = {"growth_rate": [0.0, 0.3], "complexity": ["High", "Medium"]}
+    scalar_calls = []
+    original = RegistrationOperation.compute_cost
+    monkeypatch.setattr(RegistrationOperation, "compute_cost",
+                        lambda self: scalar_calls.append(self.name) or original(self))
+
+    arrays = run_vectorized_sweep(grid, factory, simulation_period=4)
+    assert set(scalar_calls) == {"Scalar"}
+    reference = Simulator(simulation_period=4).run_parameter_sweep(grid, factory)
+    for i, key in enumerate(arrays.combo_keys):
+        records = reference[key]["Protocol"]
+        np.testing.assert_allclose(arrays.costs[i], [r["costs"] for r in records], rtol=1e-12)
+        np.testing.assert_allclose(arrays.revenues[i], [r["revenues"] for r in records], rtol=1e-12)
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        Simulator(simulation_period=1).run_parameter_sweep({}, _factory, engine="gpu")
+
+def test_chunked_sweep_matches_single_batch(tmp_path):
+    """
+    A memory-budgeted sweep is split into chunks whose concatenation equals
+    the single-batch result, with metrics for the whole grid.
+    """
+    from simulator.vectorized import iter_vectorized_sweep, measure_chunk
+
+    grid = {"growth_rate": [0.0, 0.05, 0.1, 0.2], "complexity": ["High", "Low"],
+            "overhead_rate": [0.0, 0.01, 0.02, 0.03, 0.04]}
+    full = run_vectorized_sweep(grid, _factory, simulation_period=4)
+
+    _, per_combo = measure_chunk(list(grid), full.combos[:8], _factory, 4)
+    assert per_combo > 0
+    chunks = list(iter_vectorized_sweep(grid, _factory, 4, memory_budget=per_combo * 6, probe_size=4))
+    assert len(chunks) > 2
+    assert [c.offset for c in chunks] == np.cumsum([0] + [len(c.combos) for c in chunks[:-1]]).tolist()
+    np.testing.assert_array_equal(np.concatenate([c.costs for c in chunks]), full.costs)
+    np.testing.assert_array_equal(np.concatenate([c.revenues for c in chunks]), full.revenues)
+
+    # The probe is a single combination, then as many as that footprint allows
+    probes = list(iter_vectorized_sweep(grid, _factory, 4, memory_budget=per_combo * 6))
+    assert len(probes[0].combos) == 1 and len(probes[1].combos) <= 6
+
+    sim = Simulator(simulation_period=4)
+    seen = []
+    assert sim.run_chunked_sweep(grid, _factory, sink=seen.append, chunk_size=7,
+                                 metrics=["npv", "profit"]) == 40
+    assert [len(c.combos) for c in seen] == [7, 7, 7, 7, 7, 5]
+    reference = Simulator(simulation_period=4)
+    reference.run_vectorized_sweep(grid, _factory, metrics=["npv", "profit"])
+    for metric in ("npv", "profit"):
+        np.testing.assert_allclose(sim.sweep_metrics["VectorModel"][metric],
+                                   reference.sweep_metrics["VectorModel"][metric])
+    assert sim.sweep_combo_keys == reference.sweep_combo_keys
+
+def test_float32_results_within_documented_bound(tmp_path):
+    """
+    float32 storage halves the result arrays, stays within the documented
+    bound of the float64 reference, and metrics still accumulate in float64.
+    """
+    reference = run_vectorized_sweep(PARAM_GRID, _factory, simulation_period=6)
+    narrow = run_vectorized_sweep(PARAM_GRID, _factory, simulation_period=6, dtype="float32")
+
+    assert narrow.costs.dtype == np.float32 and narrow.revenues.dtype == np.float32
+    assert narrow.costs.nbytes * 2 == reference.costs.nbytes
+    bound = ERROR_BOUNDS["float32"]
+    np.testing.assert_allclose(narrow.costs, reference.costs, rtol=bound)
+    np.testing.assert_allclose(narrow.revenues, reference.revenues, rtol=bound)
+    assert check_precision(PARAM_GRID, _factory, 6) <= bound
+
+    sim = Simulator(simulation_period=6)
+    sim.run_vectorized_sweep(PARAM_GRID, _factory, metrics=["total_profit"], dtype="float32")
+    totals = sim.sweep_metrics["VectorModel"]["total_profit"]
+    assert totals.dtype == np.float64
+    np.testing.assert_allclose(totals, (reference.revenues - reference.costs).sum(axis=1), rtol=1e-5)
+
+    # CSV output prints float32 values in their shortest form
+    path = tmp_path / "narrow.csv"
+    write_sweep_arrays_to_csv(narrow, str(path))
+    first_cost = path.read_text().splitlines()[1].split(",")[3]
+    assert first_cost == str(narrow.costs[0, 0])
+
+def test_check_precision_rejects_cancelling_terms():
+    """
+    Models whose operation terms cancel fall outside the documented bound.
+    """
+    def cancelling(combo_params):
+        ops = [
+            Operation(name="In", parameters={"base_revenue": 1e6 + combo_params["x"]}),
+            Operation(name="Out", parameters={"base_revenue": -1e6}),
+        ]
+        return BusinessModel(name="Cancel", transaction_model=TransactionModel(operations=ops))
+
+    with pytest.raises(ValueError, match="use float64"):
+        check_precision({"x": [0.1, 0.3]}, cancelling, 3)
+    with pytest.raises(ValueError, match="Unsupported dtype"):
+        run_vectorized_sweep(PARAM_GRID, _factory, simulation_period=3, dtype="float16")